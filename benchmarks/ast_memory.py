@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures memory and equality of the slotted AST nodes against replicas of
+the former __dict__ based nodes, which compared their whole __dict__.
+
+    python -m benchmarks.ast_memory --functions 5000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from krlparser.ast import AST, _restore_node
+from krlparser.parser import Parser
+
+
+FUNCTION = (
+    "DEF Foo{index}(bar:IN, foobar:OUT)\n"
+    "DECL INT foo, bar[10]\n"
+    "DECL REAL foobar\n"
+    "Bar(foo, bar)\n"
+    "FooBar()\n"
+    "END\n"
+)
+
+
+class DictNode:
+    """Replica of the former nodes, keeping their fields in a __dict__."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
+
+
+_REPLICAS = {}
+
+
+def to_dict_nodes(value):
+    if isinstance(value, AST):
+        cls = value.__class__
+        replica = _REPLICAS.setdefault(
+            cls, type(cls.__name__, (DictNode,), {}))
+        return replica(**{field: to_dict_nodes(getattr(value, field))
+                          for field in cls._fields})
+    if isinstance(value, tuple):
+        return [to_dict_nodes(item) for item in value]
+    return value
+
+
+def to_slotted_nodes(value):
+    if isinstance(value, AST):
+        return _restore_node(value.__class__,
+                             tuple(to_slotted_nodes(getattr(value, field))
+                                   for field in value._fields))
+    if isinstance(value, tuple):
+        return tuple(to_slotted_nodes(item) for item in value)
+    return value
+
+
+def parse(code):
+    parser = Parser()
+    parser.add_source_file("Foo", code)
+    return parser.ast[0]
+
+
+def retained(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def measure(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    code = "".join(FUNCTION.format(index=index)
+                   for index in range(arguments.functions))
+    head, _, tail = code.rpartition("FooBar()")
+    changed = head + "BarFoo()" + tail
+
+    slotted = parse(code)
+    trees = {
+        "slotted": (slotted, parse(code), parse(changed)),
+        "dict": (to_dict_nodes(slotted), to_dict_nodes(parse(code)),
+                 to_dict_nodes(parse(changed)))
+    }
+
+    # Both copies share the strings of the parsed tree
+    _, slotted_size = retained(lambda: to_slotted_nodes(slotted))
+    _, dict_size = retained(lambda: to_dict_nodes(slotted))
+    print(f"{'':>8}  {'memory':>10}  {'equal':>10}  {'unequal':>10}")
+    for name, size in (("slotted", slotted_size), ("dict", dict_size)):
+        tree, equal, unequal = trees[name]
+        equal_time = measure(lambda: tree == equal, arguments.repeat)
+        unequal_time = measure(lambda: tree == unequal, arguments.repeat)
+        print(f"{name:>8}  {size / 1024:8.0f} KiB  "
+              f"{equal_time * 1000:7.2f} ms  {unequal_time * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
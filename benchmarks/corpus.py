@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Deterministic generator of synthetic KRL projects following
+grammar/grammer. Every module is a .src/.dat pair, the same parameters and
+seed always give the same files.
+
+    python -m benchmarks.corpus OUTPUT_DIRECTORY --files 50 --lines 2000
+"""
+
+import argparse
+import os
+import random
+
+
+TYPES = ("INT", "REAL", "BOOL", "E6POS", "E6AXIS", "FRAME")
+FILE_ATTRIBUTES = ("&ACCESS RVP", "&REL 1", "&PARAM TEMPLATE = C:\\Template")
+STATEMENTS_PER_FUNCTION = 12
+POSITION_AXES = ("X", "Y", "Z")
+ORIENTATION_AXES = ("A", "B", "C")
+JOINT_AXES = ("A1", "A2", "A3", "A4", "A5", "A6")
+
+
+def generate_corpus(files=10, lines=1000, declarations=4, call_density=0.5,
+                    data_declarations=20, seed=0):
+    """
+    Returns (name, source, data) tuples of files modules, whose source
+    files have at least lines lines. Each function declares declarations
+    variables and call_density is the share of its statements which are
+    calls, the others are comments. Each data file declares
+    data_declarations scalars, points and arrays.
+    """
+    generator = random.Random(seed)
+    names = [f"Cell{index}" for index in range(files)]
+    exported = []
+    corpus = []
+
+    for name in names:
+        source, functions = _source_file(generator, name, lines, declarations,
+                                         call_density, exported)
+        corpus.append((name, source,
+                       _data_file(generator, name, data_declarations)))
+        exported.extend(functions)
+
+    return corpus
+
+
+def write_corpus(directory, corpus):
+    """Writes the modules of corpus into directory, returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for name, source, data in corpus:
+        for extension, code in ((".src", source), (".dat", data)):
+            path = os.path.join(directory, name + extension)
+            with open(path, "w", encoding="utf-8", newline="\n") as file:
+                file.write(code)
+            paths.append(path)
+    return paths
+
+
+def count_lines(corpus):
+    return sum(code.count("\n") + 1
+               for _, source, data in corpus for code in (source, data))
+
+
+def _source_file(generator, name, lines, declarations, call_density,
+                 exported):
+    code = list(FILE_ATTRIBUTES)
+    local = []
+    functions = [name]
+
+    index = 0
+    while index == 0 or len(code) < lines:
+        function = name if index == 0 else f"{name}_F{index}"
+        is_global = index > 0 and generator.random() < 0.3
+        # Calls go to functions defined above, so that every call resolves
+        targets = local + exported
+        code.extend(_definition(generator, function, is_global, declarations,
+                                call_density, targets))
+        if index:
+            local.append(function)
+        if is_global:
+            functions.append(function)
+        index += 1
+
+    return "\n".join(code) + "\n", functions
+
+
+def _definition(generator, name, is_global, declarations, call_density,
+                targets):
+    variables = [f"{name}_V{index}" for index in range(declarations)]
+    parameters = variables[:generator.randrange(min(3, declarations) + 1)]
+    is_function = generator.random() < 0.25
+
+    signature = ", ".join(
+        f"{parameter}:{generator.choice(('IN', 'OUT'))}"
+        for parameter in parameters)
+    prefix = "GLOBAL " if is_global else ""
+    if is_function:
+        lines = [f"{prefix}DEFFCT {generator.choice(TYPES)} "
+                 f"{name}({signature})"]
+    else:
+        lines = [f"{prefix}DEF {name}({signature})"]
+
+    for variable in variables[len(parameters):]:
+        array = (f"[{generator.randrange(1, 100)}]"
+                 if generator.random() < 0.2 else "")
+        lines.append(f"DECL {generator.choice(TYPES)} {variable}{array}")
+
+    for index in range(STATEMENTS_PER_FUNCTION):
+        if targets and generator.random() < call_density:
+            arguments = generator.sample(
+                variables, generator.randrange(min(3, len(variables)) + 1))
+            lines.append(f"{generator.choice(targets)}"
+                         f"({', '.join(arguments)})")
+        else:
+            lines.append(f"; Step {index} of {name}")
+
+    lines.append("ENDFCT" if is_function else "END")
+    lines.append("")
+    return lines
+
+
+def _data_file(generator, name, declarations):
+    lines = list(FILE_ATTRIBUTES[:2])
+    lines.append(f"DEFDAT {name} PUBLIC")
+
+    for index in range(declarations):
+        variable = f"{name}_D{index}"
+        kind = generator.random()
+        if kind < 0.4:
+            lines.append(_point(generator, variable))
+        elif kind < 0.6:
+            lines.extend(_array(generator, variable))
+        else:
+            lines.append(_scalar(generator, variable))
+
+    lines.append("ENDDAT")
+    return "\n".join(lines) + "\n"
+
+
+def _scalar(generator, name):
+    value = generator.choice((
+        str(generator.randrange(-1000, 1000)),
+        f"{generator.uniform(-1000, 1000):.3f}",
+        generator.choice(("TRUE", "FALSE"))))
+    symbol_type = ("BOOL" if value in ("TRUE", "FALSE") else
+                   "REAL" if "." in value else "INT")
+    return f"DECL {symbol_type} {name}={value}"
+
+
+def _point(generator, name):
+    if generator.random() < 0.5:
+        values = [f"{axis} {generator.uniform(-180, 180):.3f}"
+                  for axis in JOINT_AXES]
+        return f"DECL E6AXIS {name}={{{','.join(values)}}}"
+
+    values = [f"{axis} {generator.uniform(-2000, 2000):.3f}"
+              for axis in POSITION_AXES]
+    values.extend(f"{axis} {generator.uniform(-180, 180):.3f}"
+                  for axis in ORIENTATION_AXES)
+    values.extend((f"S {generator.randrange(8)}",
+                   f"T {generator.randrange(64)}"))
+    return f"DECL E6POS {name}={{{','.join(values)}}}"
+
+
+def _array(generator, name):
+    size = generator.randrange(1, 10)
+    lines = [f"DECL INT {name}[{size}]"]
+    for index in range(1, size + 1):
+        lines.append(f"{name}[{index}]={generator.randrange(-1000, 1000)}")
+    return lines
+
+
+def add_arguments(parser):
+    parser.add_argument("--files", type=int, default=10,
+                        help="number of modules")
+    parser.add_argument("--lines", type=int, default=1000,
+                        help="minimum number of lines per source file")
+    parser.add_argument("--declarations", type=int, default=4,
+                        help="declarations per function")
+    parser.add_argument("--call-density", type=float, default=0.5,
+                        help="share of statements which are calls")
+    parser.add_argument("--data-declarations", type=int, default=20,
+                        help="declarations per data file")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def corpus_from_arguments(arguments):
+    return generate_corpus(files=arguments.files,
+                           lines=arguments.lines,
+                           declarations=arguments.declarations,
+                           call_density=arguments.call_density,
+                           data_declarations=arguments.data_declarations,
+                           seed=arguments.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory")
+    add_arguments(parser)
+    arguments = parser.parse_args()
+
+    corpus = corpus_from_arguments(arguments)
+    paths = write_corpus(arguments.directory, corpus)
+    print(f"{len(paths)} files, {count_lines(corpus)} lines "
+          f"in {arguments.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures parsing and analysing a taught data file of many points, with
+and without the bulk scanner of point declarations.
+
+    python -m benchmarks.data_throughput --points 50000
+"""
+
+import argparse
+import random
+import time
+
+from krlparser.parser import Parser
+from krlparser.regex_lexer import RegexLexer
+from krlparser.semantic_analyzer import SemanticAnalyzer
+
+
+def generate_data_file(points, seed=0):
+    generator = random.Random(seed)
+    lines = ["&ACCESS RVP", "&REL 1", "DEFDAT Points PUBLIC",
+             ";FOLD EXTERNAL DECLARATIONS", "DECL INT counter=0",
+             ";ENDFOLD"]
+    for index in range(points):
+        x, y, z, a, b, c = (round(generator.uniform(-2000.0, 2000.0), 3)
+                            for _ in range(6))
+        lines.append(f"DECL E6POS XP{index}={{X {x},Y {y},Z {z},A {a},"
+                     f"B {b},C {c},S 6,T 27,E1 0.0,E2 0.0,E3 0.0,E4 0.0,"
+                     f"E5 0.0,E6 0.0}}")
+    lines.append("ENDDAT")
+    return "\n".join(lines) + "\n"
+
+
+def parse_scanned(parser, code):
+    parser.add_data_file("Points", code)
+    return parser.ast[-1]
+
+
+def parse_tokens(parser, code):
+    # The grammar alone, as used for lines the scanner leaves
+    return parser._parse(parser._data_file, "Points", code, ".dat")
+
+
+def measure(parse, code, repeat):
+    best_parse = best_analyze = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        node = parse(Parser(lexer=RegexLexer), code)
+        parsed = time.perf_counter()
+        SemanticAnalyzer().visit(node)
+        analyzed = time.perf_counter()
+
+        best_parse = min(best_parse, parsed - start)
+        best_analyze = min(best_analyze, analyzed - parsed)
+    return best_parse, best_analyze
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    text = generate_data_file(arguments.points)
+    inputs = (("str", text), ("bytes", text.encode("utf-8")))
+    modes = (("scanned", parse_scanned), ("tokens", parse_tokens))
+
+    for input_name, code in inputs:
+        for mode_name, parse in modes:
+            parse_time, analyze_time = measure(parse, code, arguments.repeat)
+            print(f"{input_name:>6} {mode_name:>8}: "
+                  f"parse {parse_time:7.3f} s, "
+                  f"analyze {analyze_time:7.3f} s "
+                  f"for {arguments.points} points")
+
+
+if __name__ == "__main__":
+    main()
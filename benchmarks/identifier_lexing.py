@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reports lexing time and retained token memory for identifier heavy code,
+such as point declarations and motion call lists.
+
+    python -m benchmarks.identifier_lexing --points 2000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from krlparser.token import TOKENS
+
+from .lexer_throughput import ENGINES
+
+
+def generate_code(points):
+    lines = ["DEF Motion()"]
+    lines.extend(f"DECL E6POS XP{index}, XP{index}_Approach"
+                 for index in range(points))
+    for _ in range(5):
+        lines.extend(f"PTP(XP{index}_Approach, Vel, Acc)\n"
+                     f"LIN(XP{index}, Vel, Acc)"
+                     for index in range(points))
+    lines.append("END")
+    return "\n".join(lines)
+
+
+def measure(engine, code, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine(code=code).generate_tokens()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    tokens = engine(code=code).generate_tokens()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, size, tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=2000,
+                        help="number of declared points")
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    code = generate_code(arguments.points)
+
+    for name, engine in ENGINES.items():
+        duration, size, tokens = measure(engine, code, arguments.repeat)
+        names = [token.value for token in tokens
+                 if token.token_type == TOKENS.NAME]
+        distinct = len({id(value) for value in names})
+        print(f"{name:>8}: {len(tokens) / duration:10.0f} tokens/s, "
+              f"{size / len(tokens):6.1f} bytes/token, "
+              f"{distinct} name objects for {len(names)} names")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lexes pathological inputs, single very long comments, file attributes,
+strings and names, at doubling lengths. The time per character stays
+flat for a lexer which scales linearly.
+
+    python -m benchmarks.lexer_scaling --length 20000 --steps 4
+"""
+
+import argparse
+import time
+
+from .lexer_throughput import ENGINES
+
+
+CASES = {
+    "comment": lambda length: ";" + "x" * length + "\nfoo\n",
+    "attribute": lambda length: "&" + "x" * length + "\nfoo\n",
+    "string": lambda length: "\"" + "x" * length + "\"\nfoo\n",
+    "name": lambda length: "x" * length + " = 1\nfoo\n",
+}
+
+
+def measure(engine, code, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine(code=code).generate_tokens()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--length", type=int, default=20000,
+                        help="length of the shortest input")
+    parser.add_argument("--steps", type=int, default=4,
+                        help="number of doublings of the length")
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    lengths = [arguments.length * 2 ** step
+               for step in range(arguments.steps + 1)]
+    for case, generate in CASES.items():
+        for name, engine in ENGINES.items():
+            timings = []
+            for length in lengths:
+                duration = measure(engine, generate(length), arguments.repeat)
+                timings.append(f"{duration / length * 1e9:8.1f}")
+            print(f"{case:>9} {name:>8}: ns/char " + " ".join(timings))
+    print(f"{'':>18}  lengths " +
+          " ".join(f"{length:>8}" for length in lengths))
+
+
+if __name__ == "__main__":
+    main()
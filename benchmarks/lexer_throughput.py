@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares the throughput of the available lexer engines in MB/s.
+
+    python -m benchmarks.lexer_throughput --size 2
+"""
+
+import argparse
+import time
+
+from krlparser.lexer import Lexer, SlicingLexer
+from krlparser.regex_lexer import RegexLexer
+
+
+SNIPPET = (
+    "&ACCESS RVP\n"
+    "GLOBAL DEF Foo(bar:IN, foobar:OUT)\n"
+    "; Move to the next taught point\n"
+    "DECL INT counter, points[10, 2]\n"
+    "DECL REAL speed\n"
+    "Bar(counter, speed)\n"
+    "FooBar()\n"
+    "END\n"
+    "\n"
+    "DEFFCT INT Bar(counter:IN, speed:OUT)\n"
+    "DECL E6POS target\n"
+    "foo = {X 1.0, Y -2.5E3, Z 'H1F'} \"Hello, World!\"\n"
+    "ENDFCT\n"
+)
+
+ENGINES = {
+    "lexer": Lexer,
+    "slicing": SlicingLexer,
+    "regex": RegexLexer
+}
+
+
+def generate_code(size_in_mb):
+    repetitions = int(size_in_mb * 1024 * 1024 / len(SNIPPET)) + 1
+    return SNIPPET * repetitions
+
+
+def measure(engine, code, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine(code=code).generate_tokens()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=float, default=1.0,
+                        help="size of the generated input in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    code = generate_code(arguments.size)
+    size_in_mb = len(code) / (1024 * 1024)
+
+    for name, engine in ENGINES.items():
+        duration = measure(engine, code, arguments.repeat)
+        print(f"{name:>8}: {size_in_mb / duration:8.2f} MB/s "
+              f"({duration:.3f} s for {size_in_mb:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
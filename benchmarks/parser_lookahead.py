@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures the recursive descent parser on pre-lexed tokens, comparing the
+current lookahead with the former exception based _try_eat.
+
+    python -m benchmarks.parser_lookahead --repetitions 2000
+"""
+
+import argparse
+import time
+
+from krlparser.exceptions import ParsingError
+from krlparser.lexer import Lexer
+from krlparser.parser import Parser
+
+
+# Definitions taken from tests/test_parser.py
+DEFINITIONS = (
+    "GLOBAL DEF Foo(bar:IN, foobar:OUT)\n"
+    "\n"
+    "END\n"
+    "\n"
+    "DEF Bar()\n"
+    "\n"
+    "END\n"
+    "DEF Foo()\n"
+    "Bar(foo, bar)\n"
+    "FooBar()\n"
+    "END\n"
+    "DEFFCT INT Foo(bar:IN, foobar:OUT)\n"
+    "\n"
+    "ENDFCT\n"
+    "DEF Foo()\n"
+    "DECL INT bar1[1, 1], bar2[10]\n"
+    "DECL INT foo\n"
+    "\n"
+    "FooBar()\n"
+    "END\n"
+)
+
+
+class ExceptionParser(Parser):
+    """Parser with the former exception based optional matching."""
+
+    def _try_eat(self, token_type):
+        try:
+            self._eat(token_type)
+            return True
+        except ParsingError:
+            return False
+
+
+def pre_lexed(tokens):
+    class PreLexed:
+        def __init__(self, *, code):
+            del code
+
+        @staticmethod
+        def iter_tokens():
+            return iter(tokens)
+
+    return PreLexed
+
+
+def measure(parser_class, lexer, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        parser = parser_class(lexer=lexer)
+        start = time.perf_counter()
+        parser.add_source_file("Foo", "")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repetitions", type=int, default=1000,
+                        help="how often the test definitions are repeated")
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    tokens = Lexer(code=DEFINITIONS * arguments.repetitions).generate_tokens()
+    lexer = pre_lexed(tokens)
+
+    print(f"{len(tokens)} tokens")
+    for name, parser_class in (("exception", ExceptionParser),
+                               ("lookahead", Parser)):
+        duration = measure(parser_class, lexer, arguments.repeat)
+        print(f"{name:>10}: {len(tokens) / duration:12.0f} tokens/s "
+              f"({duration:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures the columnar export of the points of many data files, into
+memory and into memory mapped files, against exporting them from the
+parsed files.
+
+    python -m benchmarks.point_export --points 200000 --files 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from krlparser.parser import Parser
+from krlparser.points import export_points, nodes_to_points
+from krlparser.regex_lexer import RegexLexer
+
+from .data_throughput import generate_data_file
+
+
+def write_files(directory, points, files):
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"Points{index}.dat")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(generate_data_file(points // files, seed=index))
+        paths.append(path)
+    return paths
+
+
+def parse_files(paths):
+    parser = Parser(lexer=RegexLexer)
+    for path in paths:
+        parser.add_data_path(path)
+    return parser.ast
+
+
+def measure(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=200000)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, arguments.points, arguments.files)
+        output = os.path.join(directory, "points")
+        modes = (("memory", lambda: export_points(paths)),
+                 ("mapped", lambda: export_points(paths, output)),
+                 ("parsed", lambda: nodes_to_points(parse_files(paths))))
+
+        for name, function in modes:
+            duration = measure(function, arguments.repeat)
+            points = arguments.points // arguments.files * arguments.files
+            print(f"{name:>6}: {points / duration:10.0f} points/s "
+                  f"({duration:.3f} s for {points} points)")
+
+
+if __name__ == "__main__":
+    main()
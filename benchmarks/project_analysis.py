@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures the project analysis for growing numbers of call sites, to check
+that it scales linearly.
+
+    python -m benchmarks.project_analysis --calls 25000 50000 100000
+"""
+
+import argparse
+import time
+
+from krlparser.parser import Parser
+from krlparser.semantic_analyzer import ProjectAnalyzer
+
+
+FUNCTIONS_PER_MODULE = 10
+CALLS_PER_FUNCTION = 10
+
+
+def generate_project(calls):
+    functions = max(1, calls // CALLS_PER_FUNCTION)
+    modules = max(1, functions // FUNCTIONS_PER_MODULE)
+
+    parser = Parser()
+    for module in range(modules):
+        lines = []
+        for function in range(FUNCTIONS_PER_MODULE):
+            lines.append(f"GLOBAL DEF F{module}_{function}()")
+            lines.append("DECL INT foo")
+            for call in range(CALLS_PER_FUNCTION):
+                target = (module * 7 + function * 3 + call) % modules
+                lines.append(f"F{target}_{call % FUNCTIONS_PER_MODULE}(foo)")
+            lines.append("END")
+        parser.add_source_file(f"Module{module}", "\n".join(lines))
+    return parser.ast
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, nargs="+",
+                        default=[25000, 50000, 100000])
+    arguments = parser.parse_args()
+
+    for calls in arguments.calls:
+        ast = generate_project(calls)
+
+        analyzer = ProjectAnalyzer()
+        start = time.perf_counter()
+        analyzer.analyze(ast)
+        duration = time.perf_counter() - start
+
+        assert not analyzer.diagnostics
+        print(f"{calls:>8} calls: {duration:7.3f} s "
+              f"({calls / duration:10.0f} calls/s)")
+
+
+if __name__ == "__main__":
+    main()
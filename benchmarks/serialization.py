@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares the binary AST format with pickle on an analyzed module: size,
+dumps and loads time.
+
+    python -m benchmarks.serialization --functions 2000
+"""
+
+import argparse
+import pickle
+import time
+
+from krlparser import serialization
+from krlparser.parser import Parser
+from krlparser.semantic_analyzer import SemanticAnalyzer
+
+
+FUNCTION = (
+    "DEF Foo{index}(bar:IN, foobar:OUT)\n"
+    "DECL INT foo, bar[10]\n"
+    "DECL REAL foobar\n"
+    "Bar(foo, bar)\n"
+    "FooBar()\n"
+    "END\n"
+)
+
+FORMATS = (
+    ("pickle",
+     lambda ast: pickle.dumps(ast, protocol=pickle.HIGHEST_PROTOCOL),
+     pickle.loads),
+    ("binary", serialization.dumps, serialization.loads)
+)
+
+
+def measure(function, argument, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    code = "".join(FUNCTION.format(index=index)
+                   for index in range(arguments.functions))
+    krl_parser = Parser()
+    krl_parser.add_module("Foo", code, "DEFDAT Foo\nENDDAT\n")
+    SemanticAnalyzer().visit(krl_parser.ast)
+    ast = krl_parser.ast
+
+    print(f"{'':>8}  {'size':>10}  {'dumps':>10}  {'loads':>10}")
+    for name, dumps, loads in FORMATS:
+        dumps_time, data = measure(dumps, ast, arguments.repeat)
+        loads_time, result = measure(loads, data, arguments.repeat)
+        assert result == ast
+        print(f"{name:>8}  {len(data) / 1024:6.0f} KiB  "
+              f"{dumps_time * 1000:7.1f} ms  {loads_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures how long a project session takes to pick up a change of one
+module for growing projects, next to the initial parse.
+
+    python -m benchmarks.session_latency --files 10 50 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from krlparser.session import ProjectSession
+
+from .corpus import generate_corpus, write_corpus
+
+
+def touch(path, text):
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(text)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, nargs="+",
+                        default=[10, 50, 200])
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=5)
+    arguments = parser.parse_args()
+
+    for files in arguments.files:
+        with tempfile.TemporaryDirectory() as directory:
+            corpus = generate_corpus(files=files, lines=arguments.lines)
+            write_corpus(directory, corpus)
+            session = ProjectSession(directory)
+
+            start = time.perf_counter()
+            session.refresh()
+            initial = time.perf_counter() - start
+
+            path = os.path.join(directory, corpus[files // 2][0] + ".src")
+            best = float("inf")
+            for change in range(arguments.changes):
+                touch(path, f"; Change {change}\n")
+                start = time.perf_counter()
+                result = session.refresh()
+                best = min(best, time.perf_counter() - start)
+                assert len(result["parsed"]) == 1
+
+            print(f"{files:>6} files: initial {initial:8.3f} s, "
+                  f"change {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures offset to node queries, as used for go-to-definition and hover,
+comparing the SpanIndex with a linear scan over all nodes.
+
+    python -m benchmarks.span_lookup --functions 5000 --queries 2000
+"""
+
+import argparse
+import random
+import time
+
+from krlparser.ast import walk
+from krlparser.parser import Parser
+from krlparser.span import SpanIndex, span_start, span_end
+
+
+FUNCTION = (
+    "DEF Foo{index}(bar:IN, foobar:OUT)\n"
+    "DECL INT foo, bar[10]\n"
+    "Bar(foo, bar)\n"
+    "FooBar()\n"
+    "END\n"
+)
+
+
+def linear_node_at(nodes, offset):
+    innermost = None
+    for node in nodes:
+        if span_start(node.span) <= offset < span_end(node.span):
+            innermost = node
+    return innermost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--functions", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    arguments = parser.parse_args()
+
+    code = "".join(FUNCTION.format(index=index)
+                   for index in range(arguments.functions))
+    krl_parser = Parser()
+    krl_parser.add_source_file("Foo", code)
+    source_file = krl_parser.ast[0]
+
+    random.seed(0)
+    offsets = [random.randrange(len(code)) for _ in range(arguments.queries)]
+
+    start = time.perf_counter()
+    index = SpanIndex(source_file)
+    build = time.perf_counter() - start
+
+    nodes = list(walk(source_file))
+    results = {}
+    for name, lookup in (("index", index.node_at),
+                         ("linear", lambda offset:
+                          linear_node_at(nodes, offset))):
+        start = time.perf_counter()
+        results[name] = [lookup(offset) for offset in offsets]
+        duration = time.perf_counter() - start
+        print(f"{name:>8}: {len(offsets) / duration:12.0f} queries/s")
+
+    assert all(first is second for first, second in
+               zip(results["index"], results["linear"]))
+    print(f"{len(index)} nodes, index built in {build * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares the parsing throughput of a large SPS-like submit file with a
+source file of the same statements.
+
+    python -m benchmarks.submit_throughput --statements 50000
+"""
+
+import argparse
+import time
+
+from krlparser.parser import Parser
+
+from .lexer_throughput import ENGINES
+
+
+def generate_body(statements):
+    lines = []
+    for index in range(statements):
+        if index % 4 == 3:
+            lines.append(f";FOLD Step {index}")
+        else:
+            lines.append(f"Check{index % 50}(counter, flag{index % 8})")
+    return lines
+
+
+def generate_submit_file(statements):
+    return "\n".join(["&ACCESS RVP", "DEF SPS()", "DECL INT counter",
+                      "Init()", "LOOP", ";FOLD USER PLC"] +
+                     generate_body(statements) +
+                     [";ENDFOLD", "ENDLOOP", "END"])
+
+
+def generate_source_file(statements):
+    return "\n".join(["&ACCESS RVP", "DEF SPS()", "DECL INT counter",
+                      "Init()", ";FOLD USER PLC"] +
+                     generate_body(statements) +
+                     [";ENDFOLD", "END"])
+
+
+def measure(add, code, engine, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        parser = Parser(lexer=engine)
+        start = time.perf_counter()
+        getattr(parser, add)("SPS", code)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--statements", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    files = (("sub", "add_submit_file",
+              generate_submit_file(arguments.statements)),
+             ("src", "add_source_file",
+              generate_source_file(arguments.statements)))
+
+    for engine_name, engine in ENGINES.items():
+        for name, add, code in files:
+            duration = measure(add, code, engine, arguments.repeat)
+            lines = code.count("\n") + 1
+            print(f"{engine_name:>8} {name}: {lines / duration:10.0f} "
+                  f"lines/s ({duration:.3f} s for {lines} lines)")
+
+
+if __name__ == "__main__":
+    main()
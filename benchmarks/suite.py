@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures lexing, parsing and the project analysis of a synthetic corpus.
+
+Every stage reports tokens/s and lines/s from the best of --repeat timed
+runs, then runs once more under tracemalloc for the peak of traced memory
+and the number of memory blocks it leaves allocated. Peak RSS is the high
+water mark of the process after the stage, so it includes earlier stages.
+With --json the results are written as JSON, which --compare reads back
+to print the change of every stage against an earlier run.
+
+    python -m benchmarks.suite --files 20 --lines 2000 --json new.json
+    python -m benchmarks.suite --files 20 --lines 2000 --compare old.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from krlparser.parser import Parser
+from krlparser.semantic_analyzer import ProjectAnalyzer
+
+from .corpus import add_arguments, corpus_from_arguments, count_lines
+from .lexer_throughput import ENGINES
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss():
+    """Returns the peak resident set size of the process in KiB."""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def lex(engine, corpus):
+    return sum(len(engine(code=code).generate_tokens())
+               for _, source, data in corpus for code in (source, data))
+
+
+def parse(engine, corpus):
+    parser = Parser(lexer=engine)
+    for name, source, data in corpus:
+        parser.add_module(name, source, data)
+    return parser.ast
+
+
+def analyze(ast):
+    analyzer = ProjectAnalyzer()
+    analyzer.analyze(ast)
+    assert not analyzer.diagnostics
+    return analyzer
+
+
+def measure(run, repeat, setup=tuple):
+    """Measures run(*setup()), setup gives fresh arguments for each run."""
+    best = float("inf")
+    for _ in range(repeat):
+        arguments = setup()
+        start = time.perf_counter()
+        run(*arguments)
+        best = min(best, time.perf_counter() - start)
+
+    arguments = setup()
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = run(*arguments)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+
+    return result, {
+        "seconds": best,
+        "peak_traced_bytes": peak,
+        "allocated_blocks": sys.getallocatedblocks() - blocks,
+        "peak_rss_kib": peak_rss()
+    }
+
+
+def run_suite(corpus, engine, repeat):
+    tokens = lex(engine, corpus)
+    lines = count_lines(corpus)
+    stages = {}
+
+    _, stages["lex"] = measure(lambda: lex(engine, corpus), repeat)
+    _, stages["parse"] = measure(lambda: parse(engine, corpus), repeat)
+    # The analysis annotates the nodes, every run needs a fresh AST
+    _, stages["analyze"] = measure(
+        analyze, repeat, lambda: (parse(engine, corpus),))
+
+    for stage in stages.values():
+        stage["tokens_per_second"] = tokens / stage["seconds"]
+        stage["lines_per_second"] = lines / stage["seconds"]
+
+    return {"tokens": tokens, "lines": lines, "stages": stages}
+
+
+def print_results(results, baseline=None):
+    print(f"{results['tokens']} tokens, {results['lines']} lines")
+    for name, stage in results["stages"].items():
+        line = (f"{name:>8}: {stage['tokens_per_second']:10.0f} tokens/s "
+                f"{stage['lines_per_second']:10.0f} lines/s "
+                f"{stage['peak_traced_bytes'] / 2 ** 20:8.1f} MiB peak "
+                f"{stage['allocated_blocks']:8d} blocks")
+        if stage["peak_rss_kib"] is not None:
+            line += f" {stage['peak_rss_kib'] / 1024:8.1f} MiB RSS"
+
+        if baseline is not None and name in baseline["stages"]:
+            change = (baseline["stages"][name]["seconds"] /
+                      stage["seconds"])
+            line += f" {change:6.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument("--lexer", choices=list(ENGINES), default="lexer")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH",
+                        help="write the results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="JSON results of an earlier run")
+    arguments = parser.parse_args()
+
+    corpus = corpus_from_arguments(arguments)
+    results = run_suite(corpus, ENGINES[arguments.lexer], arguments.repeat)
+    results["parameters"] = {
+        name: getattr(arguments, name)
+        for name in ("files", "lines", "declarations", "call_density",
+                     "seed", "lexer", "repeat")
+    }
+    results["python"] = platform.python_version()
+    results["platform"] = platform.platform()
+
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    print_results(results, baseline)
+
+    if arguments.json:
+        with open(arguments.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures name resolution in a project with many modules and functions,
+comparing the scope chain walk of SymbolTable.lookup with the flat
+SymbolIndex.
+
+    python -m benchmarks.symbol_lookup --modules 1000 --functions 20
+"""
+
+import argparse
+import time
+
+from krlparser.ast import FunctionSymbol, VariableSymbol
+from krlparser.symbol_table import SymbolTable
+
+
+def build_project(modules, functions):
+    global_scope = SymbolTable(name="GLOBAL", parent_scope=None)
+    function_scopes = []
+    for module in range(modules):
+        module_scope = SymbolTable(name=f"Module{module}",
+                                   parent_scope=global_scope)
+        global_scope.add(VariableSymbol(name=f"global{module}",
+                                        symbol_type="INT"))
+        for function in range(functions):
+            module_scope.add(FunctionSymbol(name=f"Function{function}"))
+            function_scope = SymbolTable(
+                name=f"Module{module}.Function{function}",
+                parent_scope=module_scope)
+            function_scope.add(VariableSymbol(name="counter",
+                                              symbol_type="INT"))
+            function_scopes.append(function_scope)
+    return global_scope, function_scopes
+
+
+def measure(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=1000)
+    parser.add_argument("--functions", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    global_scope, function_scopes = build_project(arguments.modules,
+                                                  arguments.functions)
+    index = global_scope.index
+    names = [f"global{module}" for module in range(arguments.modules)]
+    qualified = [f"Module{module}.Function{function}"
+                 for module in range(arguments.modules)
+                 for function in range(arguments.functions)]
+    scope = function_scopes[-1]
+
+    def chain_lookup():
+        for name in names:
+            scope.lookup(name)
+
+    def batch_lookup():
+        index.resolve_many(names, scope)
+
+    def qualified_index_lookup():
+        for name in qualified:
+            index.lookup(name)
+
+    print(f"{len(index)} symbols, {len(function_scopes)} function scopes")
+    for label, function, count in (
+            ("chain", chain_lookup, len(names)),
+            ("batch", batch_lookup, len(names)),
+            ("qualified index", qualified_index_lookup, len(qualified))):
+        duration = measure(function, arguments.repeat)
+        print(f"{label:>16}: {count / duration:12.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
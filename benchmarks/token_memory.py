@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reports the memory used per token by the different token representations.
+
+    python -m benchmarks.token_memory --size 1
+"""
+
+import argparse
+import tracemalloc
+
+from krlparser.regex_lexer import RegexLexer
+from krlparser.token import TokenBuffer
+
+from .lexer_throughput import generate_code
+
+
+class DictToken:
+    """Token as it was stored before it used __slots__."""
+
+    def __init__(self, *, token_type, value, line_number, column):
+        self.token_type = token_type
+        self.value = value
+        self.line_number = line_number
+        self.column = column
+
+
+def measure(factory):
+    tracemalloc.start()
+    result = factory()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=float, default=1.0,
+                        help="size of the generated input in MB")
+    arguments = parser.parse_args()
+
+    code = generate_code(arguments.size)
+    count = len(RegexLexer(code=code).generate_tokens())
+
+    def dict_tokens():
+        return [DictToken(token_type=token.token_type,
+                          value=token.value,
+                          line_number=token.line_number,
+                          column=token.column)
+                for token in RegexLexer(code=code).iter_tokens()]
+
+    def slot_tokens():
+        return RegexLexer(code=code).generate_tokens()
+
+    def token_buffer():
+        return TokenBuffer.from_tokens(code,
+                                       RegexLexer(code=code).iter_tokens())
+
+    print(f"{count} tokens")
+    for name, factory in (("dict", dict_tokens),
+                          ("slots", slot_tokens),
+                          ("buffer", token_buffer)):
+        _, size = measure(factory)
+        print(f"{name:>8}: {size / count:8.1f} bytes/token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures NodeVisitor dispatch in visits per second, comparing the cached
+dispatch table with the former per node name mangling.
+
+    python -m benchmarks.visitor_dispatch --nodes 100000
+"""
+
+import argparse
+import time
+
+from krlparser.ast import NodeVisitor, FunctionCall, Type, VariableSymbol
+from krlparser.helper import camel_to_snake
+
+
+class CountingVisitor(NodeVisitor):
+    def __init__(self):
+        self.visits = 0
+
+    def visit_function_call(self, node):
+        self.visits += 1
+
+    def visit_type(self, node):
+        self.visits += 1
+
+    def visit_variable_symbol(self, node):
+        self.visits += 1
+
+
+class ManglingVisitor(CountingVisitor):
+    """Visitor with the former dispatch, mangling the name of every node."""
+
+    def visit(self, nodes):
+        if hasattr(nodes, "__iter__"):
+            for node in nodes:
+                self.visit(node)
+        else:
+            method_name = "visit_" + camel_to_snake(type(nodes).__name__)
+            visitor = getattr(self, method_name, self.generic_visit)
+            return visitor(nodes)
+
+
+def generate_nodes(count):
+    nodes = []
+    for index in range(count):
+        kind = index % 3
+        if kind == 0:
+            nodes.append(FunctionCall(name=f"Foo{index}"))
+        elif kind == 1:
+            nodes.append(Type(name="INT"))
+        else:
+            nodes.append(VariableSymbol(name=f"bar{index}",
+                                        symbol_type="REAL"))
+    return nodes
+
+
+def measure(visitor_class, nodes, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        visitor = visitor_class()
+        start = time.perf_counter()
+        visitor.visit(nodes)
+        best = min(best, time.perf_counter() - start)
+        assert visitor.visits == len(nodes)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    nodes = generate_nodes(arguments.nodes)
+    for name, visitor_class in (("mangling", ManglingVisitor),
+                                ("table", CountingVisitor)):
+        duration = measure(visitor_class, nodes, arguments.repeat)
+        print(f"{name:>10}: {len(nodes) / duration:12.0f} visits/s "
+              f"({duration:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Asynchronous façade of the parser for asyncio applications.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .project import group_files, read_unit, parse_unit
+
+
+def parse_paths(unit, encoding=None):
+    """Reads and parses a unit of file paths as given by group_files."""
+    return parse_unit(read_unit(unit), encoding)
+
+
+class AsyncParser:
+    """
+    Parses files in an executor, keeping the event loop free.
+
+    executor can be any concurrent.futures executor; a ProcessPoolExecutor
+    parses in parallel, without one a thread pool is created and shut down
+    by close. At most max_concurrency files are read and parsed at once,
+    further requests wait for a free slot. Cancelling a request which has
+    not started yet removes it from the executor, a running one keeps its
+    slot until it has finished.
+    """
+
+    def __init__(self, *, executor=None, max_concurrency=4, encoding=None):
+        self.encoding = encoding
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        self.close()
+
+    def close(self):
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def parse_module(self, name, source_file, data_file):
+        return await self._run(parse_unit,
+                               (name, source_file, data_file, None),
+                               self.encoding)
+
+    async def parse_source_file(self, name, source_file):
+        return await self._run(parse_unit, (name, source_file, None, None),
+                               self.encoding)
+
+    async def parse_data_file(self, name, data_file):
+        return await self._run(parse_unit, (name, None, data_file, None),
+                               self.encoding)
+
+    async def parse_submit_file(self, name, submit_file):
+        return await self._run(parse_unit, (name, None, None, submit_file),
+                               self.encoding)
+
+    def submit_paths(self, paths):
+        """
+        Groups paths into modules like ProjectParser and returns a task per
+        module, which gives its AST.
+        """
+        return [asyncio.ensure_future(
+                    self._run(parse_paths, unit, self.encoding))
+                for unit in group_files(paths)]
+
+    async def parse_paths(self, paths):
+        return await asyncio.gather(*self.submit_paths(paths))
+
+    async def _run(self, function, *arguments):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore
+
+        await semaphore.acquire()
+        try:
+            future = self._executor.submit(function, *arguments)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # The slot is freed once the work has ended, even if the awaiting
+        # task was cancelled while it was running.
+        future.add_done_callback(
+            lambda _: _call_soon(loop, semaphore.release))
+        return await asyncio.wrap_future(future)
+
+
+def _call_soon(loop, callback):
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        # The loop has been closed meanwhile
+        pass
@@ -1,41 +1,270 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import inspect
 from abc import ABC
+from types import FunctionType
+from operator import attrgetter, itemgetter
 from enum import Enum, auto
 from .helper import camel_to_snake
+from .token import intern_name
 
 
 class NodeVisitor(ABC):
+    """
+    Dispatches nodes to the visit_<node class in snake case> method of the
+    visitor, or generic_visit if there is none. Iterables are visited node
+    by node and give the list of results.
+
+    Methods are resolved once per visitor class and node class and kept in a
+    dispatch table of the visitor class.
+    """
+
+    _dispatch_table = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch_table = {}
+
     def visit(self, nodes):
-        if hasattr(nodes, "__iter__"):
-            for node in nodes:
-                return self.visit(node)
-        else:
-            method_name = "visit_" + camel_to_snake(type(nodes).__name__)
-            visitor = getattr(self, method_name, self.generic_visit)
-            return visitor(nodes)
+        try:
+            visitor = self._dispatch_table[type(nodes)]
+        except KeyError:
+            visitor = self._resolve(type(nodes))
+        return visitor(self, nodes)
+
+    def visit_all(self, nodes):
+        return [self.visit(node) for node in nodes]
 
     @classmethod
     def generic_visit(cls, node):
         raise Exception(f"No visitor found for {type(node).__name__}")
 
+    @classmethod
+    def _resolve(cls, node_class):
+        if hasattr(node_class, "__iter__") and not issubclass(node_class,
+                                                               str):
+            method_name = "visit_all"
+        else:
+            method_name = "visit_" + camel_to_snake(node_class.__name__)
+            if not hasattr(cls, method_name):
+                method_name = "generic_visit"
+
+        method = inspect.getattr_static(cls, method_name)
+        if not isinstance(method, FunctionType):
+            def method(visitor, node):
+                return getattr(visitor, method_name)(node)
+
+        cls._dispatch_table[node_class] = method
+        return method
+
 
 class AST(ABC):
+    """
+    Base of all nodes. child_fields names the attributes holding child
+    nodes, either a single node (or None) or a sequence of nodes.
+
+    Nodes are slotted and immutable, except for the attributes listed in
+    mutable_fields. Lists passed to a constructor are stored as tuples. The
+    structural hash is computed once on construction from the immutable
+    fields, which makes nodes usable in sets and dicts and lets unequal
+    nodes be told apart without comparing their subtrees.
+
+    span holds the packed source location set by the parser, see
+    :mod:`krlparser.span`. Like all position_fields it is ignored when nodes
+    are compared.
+    """
+
+    __slots__ = ("_hash", "span")
+
+    child_fields = ()
+    mutable_fields = frozenset(("symbol_table", "span"))
+    position_fields = frozenset(("span",))
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(field
+                            for klass in reversed(cls.__mro__)
+                            for field in klass.__dict__.get("__slots__", ())
+                            if not field.startswith("_"))
+        hashed = [index for index, field in enumerate(cls._fields)
+                  if field not in cls.mutable_fields]
+        compared = [field for field in cls._fields
+                    if field not in cls.position_fields]
+        cls._values = _tuple_getter(attrgetter, cls._fields)
+        cls._compared_values = _tuple_getter(attrgetter, compared)
+        cls._hash_key = _tuple_getter(itemgetter, hashed)
+
+    def __init__(self, *, span=None, **fields):
+        object.__setattr__(self, "span", span)
+        for name, value in fields.items():
+            if isinstance(value, list):
+                value = tuple(value)
+            object.__setattr__(self, name, value)
+
+        cls = self.__class__
+        object.__setattr__(self, "_hash",
+                           hash((cls, cls._hash_key(cls._values(self)))))
+
+    def __setattr__(self, name, value):
+        if name not in self.mutable_fields:
+            raise AttributeError(
+                f"{self.__class__.__name__}.{name} is read-only")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__}.{name} is read-only")
+
+    def __hash__(self):
+        return self._hash
+
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        if self is other:
+            return True
+        cls = type(self)
+        if cls is not type(other) or self._hash != other._hash:
+            return False
+        values = cls._compared_values
+        return values(self) == values(other)
 
     def __ne_(self, other):
         return not self == other
 
+    def __reduce__(self):
+        return _restore_node, (self.__class__, self._values(self))
+
+    def replace(self, **fields):
+        """Returns a copy of the node with fields replaced."""
+        values = dict(zip(self._fields, self._values(self)))
+        values.update(fields)
+
+        node = object.__new__(self.__class__)
+        AST.__init__(node, **values)
+        return node
+
+
+def _tuple_getter(getter, keys):
+    """Returns a function giving a tuple of the keys, even for one key."""
+    if len(keys) > 1:
+        return staticmethod(getter(*keys))
+    if keys:
+        get_key = getter(*keys)
+        return staticmethod(lambda target: (get_key(target),))
+    return staticmethod(lambda target: ())
+
+
+def _restore_node(cls, values):
+    """
+    Creates a node from the values of all its fields in the order of
+    _fields, already normalized as AST.__init__ does.
+    """
+    node = object.__new__(cls)
+    set_field = object.__setattr__
+    for field, value in zip(cls._fields, values):
+        set_field(node, field, value)
+    set_field(node, "_hash", hash((cls, cls._hash_key(values))))
+    return node
+
+
+def iter_child_nodes(node):
+    for field in node.child_fields:
+        value = getattr(node, field)
+        if isinstance(value, AST):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for child in value:
+                if isinstance(child, AST):
+                    yield child
+
+
+def walk(nodes, prune=None):
+    """
+    Yields nodes and all of their descendants in depth first pre-order,
+    using an explicit stack instead of recursion. The children of nodes for
+    which prune returns True are skipped.
+    """
+    if isinstance(nodes, AST):
+        nodes = (nodes,)
+
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        yield node
+
+        if prune is None or not prune(node):
+            children = list(iter_child_nodes(node))
+            children.reverse()
+            stack.extend(children)
+
+
+class NodeTransformer(NodeVisitor):
+    """
+    Rewrites a tree bottom-up without recursion. The visit_* methods get
+    each node after its children were transformed and return the
+    replacement node, or None to drop a node from a sequence field. Nodes
+    without a visit_* method are kept.
+
+    The original tree is left untouched: only nodes on the path from a
+    replaced node up to the root are copied, all other subtrees are shared.
+    """
+
+    def transform(self, nodes):
+        if not isinstance(nodes, AST):
+            transformed = (self.transform(node) for node in nodes)
+            return [node for node in transformed if node is not None]
+
+        stack = [(nodes, False)]
+        results = {}
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                results[id(node)] = self.visit(self._rebuild(node, results))
+                continue
+
+            stack.append((node, True))
+            children = list(iter_child_nodes(node))
+            children.reverse()
+            stack.extend((child, False) for child in children)
+
+        return results[id(nodes)]
+
+    def generic_visit(self, node):
+        return node
+
+    @staticmethod
+    def _rebuild(node, results):
+        fields = {}
+        for field in node.child_fields:
+            value = getattr(node, field)
+            if isinstance(value, AST):
+                new_value = results[id(value)]
+                changed = new_value is not value
+            elif isinstance(value, (list, tuple)):
+                children = [results[id(child)] if isinstance(child, AST)
+                            else child for child in value]
+                new_value = type(value)(child for child in children
+                                        if child is not None)
+                changed = (len(new_value) != len(value) or
+                           any(new is not old
+                               for new, old in zip(new_value, value)))
+            else:
+                continue
+
+            if changed:
+                fields[field] = new_value
+
+        return node.replace(**fields) if fields else node
+
 
 class Module(AST):
-    def __init__(self, *, name, source_file, data_file):
-        super().__init__()
+    __slots__ = ("name", "source_file", "data_file")
 
-        self.name = name
-        self.source_file = source_file
-        self.data_file = data_file
+    child_fields = ("source_file", "data_file")
+
+    def __init__(self, *, name, source_file, data_file):
+        super().__init__(name=name,
+                         source_file=source_file,
+                         data_file=data_file)
 
     def __repr__(self):
         return (f"Module(name={self.name}, "
@@ -44,14 +273,16 @@ class Module(AST):
 
 
 class KrlFile(AST, ABC):
-    def __init__(self, *, name, file_attributes=[], statements=[],
-                 symbol_table=None):
-        super().__init__()
+    __slots__ = ("name", "file_attributes", "statements", "symbol_table")
+
+    child_fields = ("file_attributes", "statements")
 
-        self.name = name
-        self.file_attributes = file_attributes
-        self.statements = statements
-        self.symbol_table = symbol_table
+    def __init__(self, *, name, file_attributes=(), statements=(),
+                 symbol_table=None):
+        super().__init__(name=name,
+                         file_attributes=file_attributes,
+                         statements=statements,
+                         symbol_table=symbol_table)
 
     def __repr__(self):
         return (f"{self.__class__.__name__}("
@@ -60,38 +291,41 @@ class KrlFile(AST, ABC):
 
 
 class SourceFile(KrlFile):
-    pass
+    __slots__ = ()
 
 
 class DataFile(KrlFile):
-    pass
+    __slots__ = ()
 
 
 class SubmitFile(KrlFile):
-    pass
+    __slots__ = ()
 
 
 class FileAttribute(AST):
-    def __init__(self, *, value):
-        super().__init__()
+    __slots__ = ("value",)
 
-        self.value = value
+    def __init__(self, *, value):
+        super().__init__(value=value)
 
     def __repr__(self):
         return f"FileAttribute({self.value})"
 
 
 class FunctionDefinition(AST):
-    def __init__(self, *, name, parameters=[], body=[], returns=None,
-                 is_global=False, symbol_table=None):
-        super().__init__()
+    __slots__ = ("name", "parameters", "body", "returns", "is_global",
+                 "symbol_table")
 
-        self.name = name
-        self.parameters = parameters
-        self.body = body
-        self.returns = returns
-        self.is_global = is_global
-        self.symbol_table = symbol_table
+    child_fields = ("parameters", "returns", "body")
+
+    def __init__(self, *, name, parameters=(), body=(), returns=None,
+                 is_global=False, symbol_table=None):
+        super().__init__(name=name,
+                         parameters=parameters,
+                         body=body,
+                         returns=returns,
+                         is_global=is_global,
+                         symbol_table=symbol_table)
 
     def __repr__(self):
         return (f"FunctionDefinition("
@@ -104,13 +338,15 @@ class FunctionDefinition(AST):
 
 
 class DataDefinition(AST):
-    def __init__(self, *, name, body=[], is_public=False, symbol_table=None):
-        super().__init__()
+    __slots__ = ("name", "body", "is_public", "symbol_table")
 
-        self.name = name
-        self.body = body
-        self.is_public = is_public
-        self.symbol_table = symbol_table
+    child_fields = ("body",)
+
+    def __init__(self, *, name, body=(), is_public=False, symbol_table=None):
+        super().__init__(name=name,
+                         body=body,
+                         is_public=is_public,
+                         symbol_table=symbol_table)
 
     def __repr__(self):
         return (f"DataDefinition("
@@ -121,11 +357,10 @@ class DataDefinition(AST):
 
 
 class Parameter(AST):
-    def __init__(self, *, name, parameter_type):
-        super().__init__()
+    __slots__ = ("name", "parameter_type")
 
-        self.name = name
-        self.parameter_type = parameter_type
+    def __init__(self, *, name, parameter_type):
+        super().__init__(name=name, parameter_type=parameter_type)
 
     def __repr__(self):
         return (f"Parameter("
@@ -137,12 +372,23 @@ class Parameter(AST):
         OUT = auto()
 
 
+class Loop(AST):
+    __slots__ = ("body",)
+
+    child_fields = ("body",)
+
+    def __init__(self, *, body=()):
+        super().__init__(body=body)
+
+    def __repr__(self):
+        return f"Loop(body={self.body})"
+
+
 class FunctionCall(AST):
-    def __init__(self, *, name, parameters=[]):
-        super().__init__()
+    __slots__ = ("name", "parameters")
 
-        self.name = name
-        self.parameters = parameters
+    def __init__(self, *, name, parameters=()):
+        super().__init__(name=intern_name(name), parameters=parameters)
 
     def __repr__(self):
         return (f"FunctionCall("
@@ -151,53 +397,130 @@ class FunctionCall(AST):
 
 
 class Type(AST):
-    def __init__(self, *, name):
-        super().__init__()
+    __slots__ = ("name",)
 
-        self.name = name
+    def __init__(self, *, name):
+        super().__init__(name=intern_name(name))
 
     def __repr__(self):
         return f"Type(name={self.name})"
 
 
+class Aggregate(AST):
+    """
+    Structure value like {E6POS: X 1.0, Y 2.0}. names and values hold the
+    fields in their order, type_name the optional structure type.
+    """
+
+    __slots__ = ("type_name", "names", "values")
+
+    child_fields = ("values",)
+
+    def __init__(self, *, type_name=None, names=(), values=()):
+        super().__init__(
+            type_name=intern_name(type_name) if type_name else None,
+            names=names,
+            values=values)
+
+    @property
+    def fields(self):
+        return dict(zip(self.names, self.values))
+
+    def __repr__(self):
+        return (f"Aggregate("
+                f"type_name={self.type_name}, "
+                f"fields={self.fields})")
+
+
+class EnumValue(AST):
+    __slots__ = ("name",)
+
+    def __init__(self, *, name):
+        super().__init__(name=intern_name(name))
+
+    def __repr__(self):
+        return f"EnumValue(name={self.name})"
+
+
+class Assignment(AST):
+    """
+    Initial value of a declared variable, or of some of its elements.
+    indices is None for the whole variable, empty for "name[]".
+    """
+
+    __slots__ = ("name", "indices", "value")
+
+    child_fields = ("value",)
+
+    def __init__(self, *, name, indices=None, value):
+        super().__init__(name=intern_name(name), indices=indices,
+                         value=value)
+
+    def __repr__(self):
+        return (f"Assignment("
+                f"name={self.name}, "
+                f"indices={self.indices}, "
+                f"value={self.value})")
+
+
 class Symbol(AST, ABC):
-    def __init__(self, *, name, symbol_type):
-        self.name = name
-        self.type = symbol_type
+    __slots__ = ("name", "type")
+
+    def __init__(self, *, name, symbol_type, **fields):
+        super().__init__(name=name, type=symbol_type, **fields)
 
     def __repr__(self):
         return f"VariableSymbol(name={self.name}, type={self.type})"
 
 
 class VariableSymbol(Symbol):
-    def __init__(self, *, name, symbol_type, dimensions=[0]):
-        super().__init__(name=name, symbol_type=symbol_type)
+    """
+    Declared variable. value is the initial value given in a data file,
+    either a plain value or an Aggregate or EnumValue node.
+    """
+
+    __slots__ = ("dimensions", "value", "is_global")
 
-        self.dimensions = dimensions
+    child_fields = ("value",)
+
+    def __init__(self, *, name, symbol_type, dimensions=(0,), value=None,
+                 is_global=False):
+        super().__init__(name=intern_name(name),
+                         symbol_type=intern_name(symbol_type),
+                         dimensions=dimensions,
+                         value=value,
+                         is_global=is_global)
 
     @property
     def is_array(self):
-        return self.dimensions != [0]
+        return self.dimensions != (0,)
 
     def __repr__(self):
         return (f"VariableSymbol("
                 f"name={self.name}, "
                 f"symbol_type={self.type}, "
                 f"is_array={self.is_array}, "
-                f"dimensions={self.dimensions})")
+                f"dimensions={self.dimensions}, "
+                f"value={self.value}, "
+                f"is_global={self.is_global})")
 
 
 class FunctionSymbol(Symbol):
-    def __init__(self, *, name, parameters=[], returns=None):
-        super().__init__(name=name, symbol_type=returns)
+    __slots__ = ("parameters",)
+
+    child_fields = ("parameters", "type")
 
-        self.parameters = parameters
+    def __init__(self, *, name, parameters=(), returns=None):
+        super().__init__(name=name, symbol_type=returns,
+                         parameters=parameters)
 
     @staticmethod
     def create_from_definition(definition):
-        return FunctionSymbol(name=definition.name,
-                              parameters=definition.parameters.copy(),
-                              returns=definition.returns)
+        symbol = FunctionSymbol(name=definition.name,
+                                parameters=definition.parameters,
+                                returns=definition.returns)
+        symbol.span = definition.span
+        return symbol
 
     def __repr__(self):
         return (f"FunctionSymbol("
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import tempfile
+
+from . import __version__, serialization
+from .source import detect_encoding
+
+
+class AstCache:
+    """
+    Persistent cache for parsed files.
+
+    Entries are stored in the binary format of
+    :mod:`krlparser.serialization`, keyed on a hash of the parser version,
+    the file contents and their encoding, and are evicted least recently
+    used first once the cache directory grows beyond max_size bytes.
+    """
+
+    SUFFIX = ".ast"
+
+    def __init__(self, directory, *, max_size=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    @staticmethod
+    def key(kind, name, *contents, encoding=None):
+        """
+        Returns the key of a file parsed from contents, whose bytes are
+        decoded with encoding or the one detected.
+        """
+        parts = [__version__, kind, name]
+        for content in contents:
+            # Text is hashed as UTF-8, like the same text read from a file
+            if isinstance(content, str):
+                parts.extend((content, "utf-8"))
+            else:
+                parts.extend((content, encoding or detect_encoding(content)))
+
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode("utf-8", "surrogatepass")
+            digest.update(part)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                node = serialization.loads(file.read())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        os.utime(path)
+        self.hits += 1
+        return node
+
+    def put(self, key, node):
+        data = serialization.dumps(node)
+
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, self._path(key))
+
+        self._size += len(data)
+        if self._size > self.max_size:
+            self._evict()
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            os.remove(path)
+        self._size = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self._size = sum(size for _, _, size in entries)
+
+        for path, _, size in entries:
+            if self._size <= self.max_size:
+                break
+            os.remove(path)
+            self._size -= size
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk scanner for the declarations of data files.
+
+Taught data files consist mostly of one line point declarations like
+
+    DECL E6POS XP1={X 1.0,Y 2.0,Z 3.0,A 0.0,B 90.0,C 0.0,S 6,T 27}
+
+scan_declarations matches these lines with a single pattern each, builds
+their VariableSymbol nodes directly and removes the lines from the code
+left to lex and parse. The nodes are the ones the grammar of
+variable_declarations_data gives, spans included. Lines which do not fit
+the pattern, such as arrays, nested aggregates or values spread over
+several lines, stay in the code.
+
+scan_numbers and count_numbers find the declarations of points with
+plain numbers only, for their export without nodes.
+"""
+
+import codecs
+import json
+import re
+from functools import lru_cache
+
+from .ast import VariableSymbol, Aggregate, EnumValue, _restore_node
+from .source import detect_encoding
+from .span import make_span
+from .token import KEYWORD_TYPES, intern_name
+
+
+_NAME = r"[A-Za-z$_][A-Za-z0-9$_]*"
+
+# Only printable ASCII in strings, so that byte input decoded as latin-1
+# gives the same values and columns as its real encoding.
+_VALUE = (r"[+\-]?[0-9][0-9Ee.+\-]*|#" + _NAME +
+          r"|\"[ !#-~]*\"|(?i:TRUE|FALSE)")
+
+_FIELD = (r"[ \t]*(" + _NAME + r")(?:[ \t]*\[[ \t]*\])?[ \t]+(" + _VALUE +
+          r")[ \t]*")
+
+_FIELD_PATTERN = re.compile(_FIELD)
+
+_FIELDS = re.compile(r"(?:" + _FIELD + r"(?:," + _FIELD + r")*)?")
+
+_NUMBER_FIELD = (r"[ \t]*" + _NAME + r"[ \t]+[+\-]?[0-9][0-9Ee.+\-]*[ \t]*")
+
+_NUMBER_FIELDS = re.compile(
+    r"(?:" + _NUMBER_FIELD + r"(?:," + _NUMBER_FIELD + r")*)?")
+
+_FLOAT_FIELD = (r"[ \t]*" + _NAME +
+                r"[ \t]+[+\-]?[0-9]+(?:\.[0-9]*)?(?:[Ee][+\-]?[0-9]+)?")
+
+_FLOAT_FIELDS = (r"(?:" + _FLOAT_FIELD + r"(?:[ \t]*," + _FLOAT_FIELD +
+                 r")*)?")
+
+# Blanks at the end of a line take its newline with them in the lexers,
+# so such lines are left to the parser, which reports them.
+_LINE_END = r"(?:[ \t]*;[^\n]*)?\r?$"
+
+_DECLARATION = re.compile(
+    r"^[ \t]*(?i:DECL)[ \t]+(?:((?i:GLOBAL))[ \t]+)?"
+    r"(" + _NAME + r")[ \t]+(" + _NAME + r")"
+    r"(?:[ \t]*=[ \t]*(?:"
+    r"(\{[ \t]*(?:(" + _NAME + r")[ \t]*:)?"
+    r"([^{}\"\n;]*(?:\"[ !#-~]*\"[^{}\"\n;]*)*)\})"
+    r"|(" + _VALUE + r")))?"
+    + _LINE_END,
+    re.MULTILINE)
+
+# JSON reads numbers like the lexer does, whenever it accepts them, and a
+# whole list at once without a call per value.
+_scan_json = json.JSONDecoder().scan_once
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def scan_declarations(code, encoding=None):
+    """
+    Returns code without the scanned declaration lines, the declarations
+    and the removed runs of lines.
+
+    Declarations map the number of the line before each run to the
+    VariableSymbols of its lines. Runs hold, for each run in order, the
+    line number following it in the returned code together with the number
+    of lines and the length removed up to its end; restore_positions takes
+    them to move the tokens lexed from the returned code back to their
+    place.
+
+    Byte input is only scanned if its encoding agrees with ASCII, and is
+    returned as bytes.
+    """
+    declarations = {}
+    runs = []
+    pieces = []
+    last = 0
+    line_number = 0
+    removed_lines = 0
+    removed_length = 0
+    for base, source in _chunks(code, encoding):
+        line_start = 0
+        for found in _DECLARATION.finditer(source):
+            start = found.start()
+            line_number += source.count("\n", line_start, start)
+            line_start = start
+            # Only lines following another one can be found again by its end
+            if not line_number:
+                continue
+            symbol = _declaration(found, base, line_number)
+            if symbol is None:
+                continue
+
+            end = min(found.end() + 1, len(source))
+            removed_lines += 1
+            removed_length += end - start
+            start += base
+            end += base
+            if runs and start == last:
+                symbols.append(symbol)
+                runs[-1] = (runs[-1][0], removed_lines, removed_length)
+            else:
+                pieces.append(code[last:start])
+                symbols = declarations[line_number - 1] = [symbol]
+                runs.append((line_number - removed_lines + 1, removed_lines,
+                             removed_length))
+            last = end
+        line_number += source.count("\n", line_start)
+
+    if not declarations:
+        return code, {}, []
+
+    # Byte input is cut from the original, not encoded again
+    pieces.append(code[last:])
+    if isinstance(code, str):
+        return "".join(pieces), declarations, runs
+    return b"".join(pieces), declarations, runs
+
+
+def restore_positions(tokens, runs):
+    """
+    Moves tokens lexed from code returned by scan_declarations to their
+    line numbers and offsets in the original code.
+    """
+    runs = iter(runs)
+    run = next(runs, None)
+    lines = length = 0
+    for token in tokens:
+        while run is not None and token.line_number >= run[0]:
+            _, lines, length = run
+            run = next(runs, None)
+
+        if lines:
+            token.line_number += lines
+            if token.offset is not None:
+                token.offset += length
+                token.end += length
+        yield token
+
+
+def scan_numbers(code, types, encoding=None):
+    """
+    Yields type, name and fields of the one line declarations in code of
+    one of types whose aggregate holds plain numbers only, such as
+
+        ("E6POS", "XP1", "X 1.0,Y -2.5")
+
+    No nodes are built and every number is a valid float literal. The
+    types are matched ignoring case and returned as written.
+    """
+    pattern = _number_patterns(types)[0]
+    for _, source in _chunks(code, encoding):
+        yield from map(_groups, pattern.finditer(source))
+
+
+def count_numbers(code, types, encoding=None):
+    """
+    Returns the number of declarations scan_numbers yields for code and the
+    length of their longest name.
+    """
+    pattern = _number_patterns(types)[1]
+    count = length = 0
+    for _, source in _chunks(code, encoding):
+        names = pattern.findall(source)
+        count += len(names)
+        length = max(length, max(map(len, names), default=0))
+    return count, length
+
+
+_groups = re.Match.groups
+
+
+@lru_cache(maxsize=16)
+def _number_patterns(types):
+    """
+    Returns the patterns of number declarations of types capturing type,
+    name and fields, and capturing the name only, for findall.
+    """
+    pattern = (r"^[ \t]*(?i:DECL)[ \t]+(?:(?i:GLOBAL)[ \t]+)?"
+               r"({})[ \t]+(" + _NAME + r")[ \t]*=[ \t]*\{{[ \t]*"
+               r"(?:" + _NAME + r"[ \t]*:)?({})[ \t]*\}}" + _LINE_END)
+    types = "(?i:" + "|".join(map(re.escape, types)) + ")"
+    return (re.compile(pattern.format(types, _FLOAT_FIELDS), re.MULTILINE),
+            re.compile(pattern.format("?:" + types, "?:" + _FLOAT_FIELDS),
+                       re.MULTILINE))
+
+
+def _chunks(code, encoding):
+    """
+    Yields the offset and text of pieces of code of whole lines. Byte input
+    is decoded as latin-1 a piece at a time, so that memory mapped files
+    are not copied as a whole, and is skipped if its encoding does not
+    agree with ASCII.
+    """
+    if isinstance(code, str):
+        yield 0, code
+        return
+
+    encoding = encoding or detect_encoding(code)
+    if not _is_ascii_compatible(encoding):
+        return
+    start = 0
+    while start < len(code):
+        end = code.find(b"\n", start + CHUNK_SIZE) + 1 or len(code)
+        # Latin-1 maps every byte to one character, so offsets into the
+        # text are byte offsets.
+        yield start, codecs.decode(code[start:end], "latin-1")
+        start = end
+
+
+def _is_ascii_compatible(encoding):
+    try:
+        return "DECL {};".encode(encoding) == b"DECL {};"
+    except LookupError:
+        return False
+
+
+class _Line:
+    """
+    Position of a matched line, for the spans of its nodes. Offsets are
+    given into the piece of code at base.
+    """
+
+    __slots__ = ("base", "start", "line_number")
+
+    def __init__(self, base, start, line_number):
+        self.base = base
+        self.start = start
+        self.line_number = line_number
+
+    def span(self, start, end):
+        return make_span(self.base + start, self.base + end,
+                         self.line_number, start - self.start)
+
+
+def _declaration(found, base, line_number):
+    """
+    Returns the symbol of a matched line, or None if the line needs the
+    parser after all.
+    """
+    (is_global, symbol_type, name, aggregate, aggregate_type, fields,
+     scalar) = found.groups()
+    if symbol_type in KEYWORD_TYPES or name in KEYWORD_TYPES:
+        return None
+
+    line = _Line(base, found.start(), line_number)
+    try:
+        if aggregate is not None:
+            value = _aggregate(found, aggregate_type, fields, line)
+            end = found.end(4)
+        elif scalar is not None:
+            value = _value(scalar, found.start(7), line)
+            end = found.end(7)
+        else:
+            value = None
+            end = found.end(3)
+    except ValueError:
+        return None
+    if value is _INVALID:
+        return None
+
+    # Nodes are restored from their field values, in the order of _fields,
+    # which skips the keyword handling of their constructors.
+    return _restore_node(VariableSymbol, (
+        line.span(found.start(3), end), intern_name(name),
+        intern_name(symbol_type), (0,), value, is_global is not None))
+
+
+_INVALID = object()
+
+
+def _aggregate(found, aggregate_type, fields, line):
+    if aggregate_type in KEYWORD_TYPES:
+        return _INVALID
+
+    if _NUMBER_FIELDS.fullmatch(fields):
+        parts = fields.replace(",", " ").split()
+        names = tuple(parts[0::2])
+        values = _numbers(parts[1::2], line)
+    elif _FIELDS.fullmatch(fields):
+        start = found.start(6)
+        matches = list(_FIELD_PATTERN.finditer(fields))
+        names = tuple(field.group(1) for field in matches)
+        values = tuple(_value(field.group(2), start + field.start(2), line)
+                       for field in matches)
+    else:
+        return _INVALID
+
+    names = _interned_names(names)
+    if names is None or _INVALID in values:
+        return _INVALID
+
+    if aggregate_type is not None:
+        aggregate_type = intern_name(aggregate_type)
+    return _restore_node(Aggregate, (
+        line.span(found.start(4), found.end(4)), aggregate_type, names,
+        values))
+
+
+def _numbers(texts, line):
+    text = "[" + ",".join(texts) + "]"
+    try:
+        values, end = _scan_json(text, 0)
+    except (ValueError, StopIteration):
+        pass
+    else:
+        if end == len(text):
+            return tuple(values)
+    return tuple(_value(text, None, line) for text in texts)
+
+
+_NAME_TUPLES = {}
+
+
+def _interned_names(names):
+    """
+    Returns the field names interned, the same tuple for the same names,
+    or None if one of them is a keyword.
+    """
+    try:
+        return _NAME_TUPLES[names]
+    except KeyError:
+        pass
+
+    interned = None
+    if KEYWORD_TYPES.keys().isdisjoint(names):
+        interned = tuple(intern_name(name) for name in names)
+    if len(_NAME_TUPLES) < 1024:
+        _NAME_TUPLES[names] = interned
+    return interned
+
+
+def _value(text, start, line):
+    first = text[0]
+    if first == "#":
+        name = text[1:]
+        if name in KEYWORD_TYPES:
+            return _INVALID
+        node = EnumValue(name=name)
+        node.span = line.span(start, start + len(text))
+        return node
+    if first == "\"":
+        return text[1:-1]
+    if first.isalpha():
+        return text.upper() == "TRUE"
+    if "E" in text or "e" in text or "." in text:
+        return float(text)
+    return int(text)
@@ -1,11 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from functools import partial
+
 
 class ParsingError(Exception):
-    def __init__(self, *, line_number, column, message):
+    def __init__(self, *, line_number, column, message, file_name=None):
         super().__init__(message)
 
         self.line_number = line_number
         self.column = column
         self.message = message
+        self.file_name = file_name
+
+    def __reduce__(self):
+        return partial(self.__class__, **self.__dict__), ()
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}("
+                f"file_name={self.file_name}, "
+                f"line_number={self.line_number}, "
+                f"column={self.column}, "
+                f"message={self.message})")
+
+
+class SemanticError(ParsingError):
+    pass
@@ -6,3 +6,7 @@ import re
 
 def camel_to_snake(camel_string):
     return re.sub("([A-Z]+)", r"_\1", camel_string).lstrip("_").lower()
+
+
+def get_public_attributes(target):
+    return (name for name in dir(target) if not name.startswith("_"))
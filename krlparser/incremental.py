@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+from bisect import bisect_right
+
+from .lexer import Lexer
+from .parser import Parser
+from .token import TOKENS
+from .ast import SourceFile
+from .exceptions import ParsingError
+from .span import make_span, shift_spans, shifted
+
+
+DEFINITION_START = re.compile(
+    r"^[^\S\n]*(?:GLOBAL[^\S\n]+)?DEF(?:FCT)?(?![A-Za-z0-9$_])",
+    re.IGNORECASE | re.MULTILINE)
+
+
+class _Chunk:
+    __slots__ = ("start", "line_number", "nodes")
+
+    def __init__(self, start, line_number, nodes):
+        self.start = start
+        self.line_number = line_number
+        self.nodes = nodes
+
+
+class _Document:
+    def __init__(self, name, code, chunks):
+        self.name = name
+        self.code = code
+        self.chunks = chunks
+
+
+class IncrementalParser(Parser):
+    """
+    Parser which keeps the top level definitions of source files apart, so
+    that an edit only re-lexes and re-parses the definitions it touches.
+
+    The first chunk of every document holds the file attributes, every
+    following chunk starts with a "DEF" or "DEFFCT" line and ends right
+    before the next one.
+    """
+
+    def __init__(self, *, lexer=Lexer):
+        super().__init__(lexer=lexer)
+        self._documents = {}
+
+    def add_source_file(self, name, source_file):
+        self._file_name = name + ".src"
+        try:
+            chunks = self._parse_region(source_file, 0, 0)
+            node = self._build(name, chunks, source_file)
+        except ParsingError:
+            self._parse_whole(name, source_file)
+            raise
+        document = _Document(name, source_file, chunks)
+        self._documents[id(node)] = (node, document)
+        self.ast.append(node)
+
+    def update_source_file(self, source_file, offset, removed_length,
+                           inserted_text):
+        """
+        Applies the edit to the code of source_file and returns the updated
+        SourceFile, which also replaces source_file in the AST.
+        """
+        _, document = self._documents[id(source_file)]
+        code = document.code
+        chunks = document.chunks
+        starts = [chunk.start for chunk in chunks]
+
+        if not 0 <= offset <= offset + removed_length <= len(code):
+            raise ValueError("Edit is out of range!")
+
+        new_code = (code[:offset] + inserted_text +
+                    code[offset + removed_length:])
+        delta = len(inserted_text) - removed_length
+        line_delta = (inserted_text.count("\n") -
+                      code.count("\n", offset, offset + removed_length))
+
+        # An edit in the first line of a definition may turn it into a plain
+        # line which then belongs to the previous definition.
+        first = bisect_right(starts, offset) - 1
+        first_line_end = code.find("\n", starts[first])
+        if first and (first_line_end < 0 or offset <= first_line_end):
+            first -= 1
+        last = bisect_right(starts, offset + removed_length) - 1
+
+        region_start = chunks[first].start
+        region_end = (chunks[last + 1].start if last + 1 < len(chunks)
+                      else len(code))
+
+        self._file_name = document.name + ".src"
+        try:
+            region = self._parse_region(
+                new_code[region_start:region_end + delta],
+                region_start,
+                chunks[first].line_number)
+
+            # The nodes behind the edit are copied rather than moved, as
+            # they are still part of the SourceFile returned before.
+            following = [_Chunk(chunk.start + delta,
+                                chunk.line_number + line_delta,
+                                shifted(chunk.nodes, delta, line_delta))
+                         for chunk in chunks[last + 1:]]
+            new_chunks = chunks[:first] + region + following
+            node = self._build(document.name, new_chunks, new_code)
+        except ParsingError:
+            self._parse_whole(document.name, new_code)
+            raise
+
+        del self._documents[id(source_file)]
+        document.code = new_code
+        document.chunks = new_chunks
+        self._documents[id(node)] = (node, document)
+
+        for index, existing in enumerate(self.ast):
+            if existing is source_file:
+                self.ast[index] = node
+                break
+
+        return node
+
+    def _parse_whole(self, name, code):
+        """
+        Parses the whole code to raise the error the chunks would have
+        hidden: a chunk neither sees the code around it nor knows where the
+        full grammar would have stopped first.
+        """
+        self._parse(self._source_file, name, code, ".src")
+
+    def _build(self, name, chunks, code):
+        statements = [node for chunk in chunks[1:] for node in chunk.nodes]
+
+        if not statements:
+            raise ParsingError(line_number=code.count("\n"),
+                               column=0,
+                               message="No module or function definition "
+                                       "found",
+                               file_name=self._file_name)
+
+        node = SourceFile(name=name,
+                          file_attributes=chunks[0].nodes,
+                          statements=statements)
+        node.span = make_span(0, len(code), 0, 0)
+        return node
+
+    def _parse_region(self, code, start, line_number):
+        offsets = [match.start() for match in
+                   DEFINITION_START.finditer(code)]
+
+        if start == 0 or not offsets or offsets[0] != 0:
+            offsets.insert(0, 0)
+
+        chunks = []
+        for index, offset in enumerate(offsets):
+            end = offsets[index + 1] if index + 1 < len(offsets) else len(code)
+            if index:
+                line_number += code.count("\n", offsets[index - 1], offset)
+
+            is_header = start == 0 and index == 0
+            nodes = self._parse_chunk(code[offset:end], line_number,
+                                      is_header)
+            shift_spans(nodes, start + offset, line_number)
+            chunks.append(_Chunk(start + offset, line_number, nodes))
+
+        return chunks
+
+    def _parse_chunk(self, code, line_number, is_header):
+        self._initialize(self._lexer(code=code).iter_tokens())
+
+        try:
+            if is_header:
+                nodes = self._header()
+                self._eat(TOKENS.NEWLINE)
+            else:
+                definitions = (self._module_definition(),
+                               self._function_definition())
+                nodes = [definition for definition in definitions
+                         if definition]
+                if not nodes:
+                    self._error("Expected module or function definition")
+
+            self._eat(TOKENS.END_OF_FILE)
+        except ParsingError as error:
+            raise ParsingError(line_number=error.line_number + line_number,
+                               column=error.column,
+                               message=error.message,
+                               file_name=error.file_name) from error
+
+        return nodes
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in instrumentation of the parsing stages.
+
+An :class:`Instrumentation` passed to a parser receives one
+:class:`StageRecord` per file and stage: the scan of declarations per data
+file, lexing and parsing per file and the project analysis once per batch
+of files. Parsers without one only pay
+a check for None per file.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from .ast import walk
+
+
+SCAN = "scan"
+LEX = "lex"
+PARSE = "parse"
+ANALYZE = "analyze"
+
+
+class StageRecord:
+    """
+    Measurements of one stage. file_name is None for stages covering a
+    whole project, counts and peak_memory are None if they were not taken.
+    """
+
+    __slots__ = ("stage", "file_name", "seconds", "tokens", "nodes",
+                 "peak_memory")
+
+    def __init__(self, *, stage, file_name, seconds, tokens=None, nodes=None,
+                 peak_memory=None):
+        self.stage = stage
+        self.file_name = file_name
+        self.seconds = seconds
+        self.tokens = tokens
+        self.nodes = nodes
+        self.peak_memory = peak_memory
+
+    def __repr__(self):
+        return (f"StageRecord("
+                f"stage={self.stage}, "
+                f"file_name={self.file_name}, "
+                f"seconds={self.seconds})")
+
+    def __eq__(self, other):
+        return (isinstance(other, StageRecord) and
+                self.as_dict() == other.as_dict())
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _Timer:
+    __slots__ = ("_start", "_memory", "_owns_tracing", "_base", "_peak")
+
+    # Timers measuring memory, innermost last. tracemalloc has one peak only,
+    # which each new timer resets; the timers around it keep the peak they
+    # had reached so far.
+    _active = []
+
+    def __init__(self, memory):
+        self._memory = memory
+        self._owns_tracing = False
+        if memory:
+            self._owns_tracing = not tracemalloc.is_tracing()
+            if self._owns_tracing:
+                tracemalloc.start()
+            peak = tracemalloc.get_traced_memory()[1]
+            for timer in self._active:
+                timer._peak = max(timer._peak, peak)
+            tracemalloc.reset_peak()
+            self._base = self._peak = tracemalloc.get_traced_memory()[0]
+            self._active.append(self)
+        self._start = time.perf_counter()
+
+    def stop(self):
+        seconds = time.perf_counter() - self._start
+        peak_memory = None
+        if self._memory:
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            peak_memory = peak - self._base
+            self._active.remove(self)
+            if self._owns_tracing:
+                tracemalloc.stop()
+        return {"seconds": seconds, "peak_memory": peak_memory}
+
+
+class Instrumentation:
+    """
+    Collects the stage records of all files a parser handles.
+
+    With memory set, every stage is traced with tracemalloc for its peak
+    memory, which slows parsing down considerably. Subclasses can override
+    on_record to handle records as they arrive instead of keeping them.
+    """
+
+    def __init__(self, *, memory=False):
+        self.memory = memory
+        self.records = []
+
+    def on_record(self, record):
+        self.records.append(record)
+
+    def timer(self):
+        """Starts measuring a stage, stop() of the result ends it."""
+        return _Timer(self.memory)
+
+    def add(self, stage, file_name, **measurements):
+        self.on_record(StageRecord(stage=stage, file_name=file_name,
+                                   **measurements))
+
+    def extend(self, records):
+        """Adds records taken elsewhere, e.g. in a worker process."""
+        for record in records:
+            self.on_record(record)
+
+    @contextmanager
+    def stage(self, stage, file_name=None, **counts):
+        """Measures the body of the with statement as stage."""
+        timer = self.timer()
+        try:
+            yield
+        finally:
+            measurements = timer.stop()
+        self.add(stage, file_name, **counts, **measurements)
+
+    def summary(self):
+        """
+        Returns one record per stage, which sums up seconds and counts and
+        keeps the highest peak memory of the stage.
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.get(record.stage)
+            if total is None:
+                total = totals[record.stage] = StageRecord(
+                    stage=record.stage, file_name=None, seconds=0.0)
+
+            total.seconds += record.seconds
+            for name in ("tokens", "nodes"):
+                value = getattr(record, name)
+                if value is not None:
+                    setattr(total, name, (getattr(total, name) or 0) + value)
+            if record.peak_memory is not None:
+                total.peak_memory = max(total.peak_memory or 0,
+                                        record.peak_memory)
+        return totals
+
+    def as_dicts(self):
+        return [record.as_dict() for record in self.records]
+
+
+def count_nodes(nodes):
+    return sum(1 for _ in walk(nodes))
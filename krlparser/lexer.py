@@ -2,9 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import string
 
-from .token import Token, TOKENS, KEYWORDS
+from .token import Token, TOKENS, KEYWORD_TYPES, intern_name
 
 
 class Lexer:
@@ -53,17 +54,26 @@ class Lexer:
         self._current_token = None
         self._current_char = self._input[self._pos] if code else None
         self._error = []
+        self._line_starts = [0]
 
     def generate_tokens(self):
-        token_list = []
+        return list(self.iter_tokens())
 
+    def iter_tokens(self):
         while True:
-            next_token = self._get_next_token()
+            next_token = self._locate(self._get_next_token())
             if next_token.token_type == TOKENS.END_OF_FILE:
-                token_list.append(self._end_of_line())
-                token_list.append(next_token)
-                return token_list
-            token_list.append(next_token)
+                yield self._locate(self._end_of_line())
+                yield next_token
+                return
+            yield next_token
+
+    def _locate(self, token):
+        token.offset = self._line_starts[token.line_number] + token.column
+        token.end = token.offset
+        if token.token_type != TOKENS.ERROR_TOKEN:
+            token.end = max(token.offset, min(self._pos, len(self._input)))
+        return token
 
     def _get_next_token(self):
         token = None
@@ -138,6 +148,7 @@ class Lexer:
         self._advance()
         self._column = 0
         self._line_number += 1
+        self._line_starts.append(self._pos)
         return token
 
     def _skip_whitespace(self):
@@ -205,13 +216,8 @@ class Lexer:
             name += self._current_char
             self._advance()
 
-        if name.upper() in get_public_attributes(KEYWORDS):
-            return Token(token_type=name.upper(),
-                         value=name,
-                         line_number=self._line_number,
-                         column=start)
-
-        return Token(token_type=TOKENS.NAME,
+        name = intern_name(name)
+        return Token(token_type=KEYWORD_TYPES.get(name, TOKENS.NAME),
                      value=name,
                      line_number=self._line_number,
                      column=start)
@@ -248,16 +254,25 @@ class Lexer:
             value += self._current_char
             self._advance()
 
-        if any((char in ["E", "e", "."]) for char in value):
-            return Token(token_type=TOKENS.REAL,
-                         value=float(value),
+        return self._decimal_number(value, start)
+
+    def _decimal_number(self, value, start):
+        try:
+            if any((char in ["E", "e", "."]) for char in value):
+                return Token(token_type=TOKENS.REAL,
+                             value=float(value),
+                             line_number=self._line_number,
+                             column=start)
+
+            return Token(token_type=TOKENS.INTEGER,
+                         value=int(value),
+                         line_number=self._line_number,
+                         column=start)
+        except ValueError:
+            return Token(token_type=TOKENS.ERROR_TOKEN,
+                         value="Invalid syntax!",
                          line_number=self._line_number,
                          column=start)
-
-        return Token(token_type=TOKENS.INTEGER,
-                     value=int(value),
-                     line_number=self._line_number,
-                     column=start)
 
     def _equal(self):
         if self._peek() == "=":
@@ -293,5 +308,77 @@ class Lexer:
         return token
 
 
-def get_public_attributes(target):
-    return (name for name in dir(target) if not name.startswith("_"))
+class SlicingLexer(Lexer):
+    """
+    Lexer which finds the end of comments, file attributes, strings, names
+    and numbers with str.find or a precompiled pattern and slices their
+    value from the input at once, instead of reading them character by
+    character. The tokens are the same as those of Lexer.
+    """
+
+    _NAME = re.compile(r"[A-Za-z0-9$_]*")
+
+    _NUMBER = re.compile(r"[0-9Ee.+\-]*")
+
+    def _move_to(self, position):
+        """Moves to position, which must be on the current line."""
+        self._column += position - self._pos
+        self._pos = position
+        self._current_char = (self._input[position]
+                              if position < len(self._input) else None)
+
+    def _read_line(self):
+        self._advance()
+
+        start = self._pos
+        end = self._input.find(os.linesep, start)
+        if end < 0:
+            end = len(self._input)
+        self._move_to(end)
+        return self._input[start:end]
+
+    def _read_until(self, terminater):
+        # After a quote at the end of the input, start is already past it
+        start = min(self._pos, len(self._input))
+        end = len(self._input)
+        for char in terminater:
+            found = self._input.find(char, start, end)
+            if found >= 0:
+                end = found
+        newline = self._input.find(os.linesep, start, end)
+        if newline >= 0:
+            end = newline
+        value = self._input[start:end]
+
+        if end == len(self._input) or end == newline:
+            self._move_to(max(end, self._pos))
+            token = Token(token_type=TOKENS.ERROR_TOKEN,
+                          value="Unexpected newline!",
+                          line_number=self._line_number,
+                          column=self._column)
+            self._error.append(token)
+            return value
+
+        self._move_to(end + 1)
+        return value
+
+    def _name(self):
+        start = self._column
+        end = self._NAME.match(self._input, self._pos).end()
+        name = intern_name(self._input[self._pos:end])
+        self._move_to(end)
+
+        return Token(token_type=KEYWORD_TYPES.get(name, TOKENS.NAME),
+                     value=name,
+                     line_number=self._line_number,
+                     column=start)
+
+    def _number(self):
+        if self._current_char == "'":
+            return super()._number()
+
+        start = self._column
+        end = self._NUMBER.match(self._input, self._pos).end()
+        value = self._input[self._pos:end]
+        self._move_to(end)
+        return self._decimal_number(value, start)
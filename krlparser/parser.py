@@ -2,62 +2,319 @@
 # -*- coding: utf-8 -*-
 
 from .lexer import Lexer
+from .regex_lexer import RegexLexer
+from .source import open_source, module_name, detect_encoding
 from .token import TOKENS, KEYWORDS
-from .ast import (Module, SourceFile, DataFile, FileAttribute,
-                  FunctionDefinition, DataDefinition,
-                  Parameter, Type, FunctionCall, VariableSymbol)
+from .ast import (Module, SourceFile, DataFile, SubmitFile, FileAttribute,
+                  FunctionDefinition, DataDefinition, Loop,
+                  Parameter, Type, FunctionCall, VariableSymbol,
+                  Aggregate, EnumValue, Assignment)
+from .data_scanner import scan_declarations, restore_positions
 from .exceptions import ParsingError
+from .span import make_span, token_span
+from .instrumentation import SCAN, LEX, PARSE, count_nodes
 
 
 class Parser:
-    def __init__(self):
+    DEFINITION_STARTS = (KEYWORDS.GLOBAL, KEYWORDS.DEF, KEYWORDS.DEFFCT,
+                         KEYWORDS.DEFDAT)
+
+    BODY_ENDS = DEFINITION_STARTS + (KEYWORDS.END, KEYWORDS.ENDFCT,
+                                     KEYWORDS.ENDDAT, TOKENS.END_OF_FILE)
+
+    def __init__(self, *, lexer=Lexer, cache=None, recover=False,
+                 encoding=None, instrumentation=None):
+        self._lexer = lexer
+        self._encoding = encoding
+        self._cache = cache
+        self._instrumentation = instrumentation
+        self._recover = recover
+        self._diagnostics = []
+        self._file_name = None
         self._ast = []
         self._temp_ast = []
-        self._tokens = []
-        self._position = 0
+        self._tokens = iter(())
         self._current_token = None
+        self._next_token = None
+        self._previous_token = None
+        self._declarations = {}
+        self._runs = []
+        self._scanned_body = None
+        self._loop_depth = 0
+        self._stages = {}
 
     @property
     def ast(self):
         return self._ast
 
+    @property
+    def diagnostics(self):
+        return self._diagnostics
+
     def add_module(self, module_name, source_file, data_file):
-        source_tokens = Lexer(code=source_file).generate_tokens()
-        data_tokens = Lexer(code=data_file).generate_tokens()
+        self.ast.append(self._cached(self._parse_module, "module",
+                                     module_name, source_file, data_file))
+
+    def add_source_file(self, name, source_file):
+        self.ast.append(self._cached(self._parse_source_file, "source_file",
+                                     name, source_file))
+
+    def add_data_file(self, name, data_file):
+        self.ast.append(self._cached(self._parse_data_file, "data_file",
+                                     name, data_file))
+
+    def add_submit_file(self, name, submit_file):
+        self.ast.append(self._cached(self._parse_submit_file, "submit_file",
+                                     name, submit_file))
+
+    def add_module_path(self, source_path, data_path, name=None):
+        with open_source(source_path) as source_file, \
+                open_source(data_path) as data_file:
+            self.add_module(name or module_name(source_path),
+                            source_file, data_file)
+
+    def add_source_path(self, path, name=None):
+        with open_source(path) as source_file:
+            self.add_source_file(name or module_name(path), source_file)
+
+    def add_data_path(self, path, name=None):
+        with open_source(path) as data_file:
+            self.add_data_file(name or module_name(path), data_file)
+
+    def add_submit_path(self, path, name=None):
+        with open_source(path) as submit_file:
+            self.add_submit_file(name or module_name(path), submit_file)
+
+    def _cached(self, parse, kind, name, *contents):
+        if self._cache is None:
+            return self._recorded(parse, name, *contents)
+
+        key = self._cache.key(kind, name, *contents,
+                              encoding=self._encoding)
+        node = self._cache.get(key)
+        if node is None:
+            diagnostics = len(self._diagnostics)
+            node = self._recorded(parse, name, *contents)
+            if diagnostics == len(self._diagnostics):
+                self._cache.put(key, node)
+        return node
+
+    def _recorded(self, parse, *arguments):
+        # Data files can be lexed and parsed twice, so the stages of the
+        # files are recorded once they are done with.
+        if self._instrumentation is None:
+            return parse(*arguments)
+
+        try:
+            return parse(*arguments)
+        finally:
+            for (file_name, stage), measurements in self._stages.items():
+                # A failed parse has no nodes and is not recorded
+                if stage != PARSE or measurements["nodes"] is not None:
+                    self._instrumentation.add(stage, file_name,
+                                              **measurements)
+            self._stages = {}
+
+    def _measure(self, stage, measurements, **counts):
+        """
+        Adds the measurements of a pass over the current file to stage.
+        The counts are those of the last pass.
+        """
+        key = (self._file_name, stage)
+        total = self._stages.get(key)
+        if total is None:
+            self._stages[key] = dict(measurements, **counts)
+            return
+
+        total["seconds"] += measurements["seconds"]
+        if measurements["peak_memory"] is not None:
+            total["peak_memory"] = max(total["peak_memory"],
+                                       measurements["peak_memory"])
+        total.update(counts)
+
+    def _parse_module(self, module_name, source_file, data_file):
+        return Module(name=module_name,
+                      source_file=self._parse_source_file(module_name,
+                                                          source_file),
+                      data_file=self._parse_data_file(module_name,
+                                                      data_file))
+
+    def _parse_source_file(self, name, source_file):
+        return self._parse(self._source_file, name, source_file, ".src")
+
+    def _parse_data_file(self, name, data_file):
+        # The scanned bytes are lexed in the encoding of the whole file,
+        # which can differ from the one of the lines left.
+        encoding = self._encoding
+        if encoding is None and not isinstance(data_file, str):
+            encoding = detect_encoding(data_file)
+
+        if self._instrumentation is None:
+            scanned, declarations, runs = scan_declarations(data_file,
+                                                            encoding)
+        else:
+            self._file_name = name + ".dat"
+            timer = self._instrumentation.timer()
+            try:
+                scanned, declarations, runs = scan_declarations(data_file,
+                                                                encoding)
+            finally:
+                self._measure(SCAN, timer.stop())
+        if not declarations:
+            return self._parse(self._data_file, name, data_file, ".dat",
+                               encoding)
+
+        # The scanned lines are only taken into the body of a data
+        # definition. If some are left over or the file has errors, it is
+        # parsed again token by token, which reports them as usual.
+        first_diagnostic = len(self._diagnostics)
+        self._declarations = declarations
+        self._runs = runs
+        try:
+            node = self._parse(self._data_file, name, scanned, ".dat",
+                               encoding)
+        except ParsingError:
+            node = None
+        finally:
+            leftover = bool(self._declarations)
+            self._declarations = {}
+            self._runs = []
 
-        self._initialize(source_tokens)
-        source_file = self._source_file(module_name)
+        if (node is not None and not leftover and
+                first_diagnostic == len(self._diagnostics)):
+            return node
 
-        self._initialize(data_tokens)
-        data_file = self._data_file(module_name)
+        del self._diagnostics[first_diagnostic:]
+        return self._parse(self._data_file, name, data_file, ".dat",
+                           encoding)
 
-        self.ast.append(Module(name=module_name,
-                               source_file=source_file,
-                               data_file=data_file))
+    def _parse_submit_file(self, name, submit_file):
+        return self._parse(self._submit_file, name, submit_file, ".sub")
 
-    def add_source_file(self, name, source_file):
-        source_tokens = Lexer(code=source_file).generate_tokens()
-        self._initialize(source_tokens)
-        source_file = self._source_file(name)
-        self.ast.append(source_file)
+    def _parse(self, grammar, name, code, extension, encoding=None):
+        first_diagnostic = len(self._diagnostics)
+        self._file_name = name + extension
 
-    def add_data_file(self, name, data_file):
-        data_tokens = Lexer(code=data_file).generate_tokens()
-        self._initialize(data_tokens)
-        data_file = self._data_file(name)
-        self.ast.append(data_file)
+        if isinstance(code, str):
+            lexer = self._lexer(code=code)
+        else:
+            lexer = RegexLexer(code=code,
+                               encoding=encoding or self._encoding)
+
+        if self._instrumentation is None:
+            self._initialize(lexer.iter_tokens())
+            node = grammar(name)
+        else:
+            node = self._parse_instrumented(grammar, name, lexer)
+
+        self._diagnostics[first_diagnostic:] = sorted(
+            self._diagnostics[first_diagnostic:],
+            key=lambda error: (error.line_number, error.column))
+        return node
+
+    def _parse_instrumented(self, grammar, name, lexer):
+        # Lexing runs ahead of the parser to be measured on its own
+        instrumentation = self._instrumentation
+
+        timer = instrumentation.timer()
+        try:
+            tokens = lexer.generate_tokens()
+        finally:
+            measurements = timer.stop()
+        self._measure(LEX, measurements, tokens=len(tokens))
+
+        timer = instrumentation.timer()
+        try:
+            self._initialize(tokens)
+            node = grammar(name)
+        finally:
+            self._measure(PARSE, timer.stop(), tokens=len(tokens),
+                          nodes=None)
+        self._stages[self._file_name, PARSE]["nodes"] = count_nodes(node)
+        return node
 
     def _initialize(self, tokens):
-        self._tokens = tokens
+        if self._runs:
+            tokens = restore_positions(tokens, self._runs)
+        if self._recover:
+            tokens = self._collect_lexer_errors(tokens)
+
+        self._tokens = iter(tokens)
         self._temp_ast = []
-        self._position = 0
-        self._current_token = self._tokens[self._position]
+        self._current_token = next(self._tokens)
+        self._next_token = next(self._tokens, None)
+        self._previous_token = None
+        self._scanned_body = None
+
+    def _collect_lexer_errors(self, tokens):
+        for token in tokens:
+            if token.token_type == TOKENS.ERROR_TOKEN:
+                self._diagnostics.append(
+                    ParsingError(line_number=token.line_number,
+                                 column=token.column,
+                                 message=token.value,
+                                 file_name=self._file_name))
+            else:
+                yield token
 
     def _error(self, message):
         token = self._current_token
         raise ParsingError(line_number=token.line_number,
                            column=token.column,
-                           message=message)
+                           message=message,
+                           file_name=self._file_name)
+
+    def _report(self, message):
+        try:
+            self._error(message)
+        except ParsingError as error:
+            if not self._recover:
+                raise
+            self._diagnostics.append(error)
+
+    def _recoverable(self, parse, synchronize):
+        if not self._recover:
+            return parse()
+
+        try:
+            return parse()
+        except ParsingError as error:
+            self._diagnostics.append(error)
+            synchronize()
+            return None
+
+    def _skip_line(self):
+        while not self._is_current_token(TOKENS.NEWLINE,
+                                         TOKENS.END_OF_FILE):
+            self._advance()
+
+        while self._is_current_token(TOKENS.COMMENT, TOKENS.NEWLINE):
+            self._advance()
+
+    def _synchronize(self, *token_types):
+        """
+        Skips tokens until one of token_types has been eaten together with
+        the rest of its line, or until a line starts a new definition.
+        """
+        while not self._is_current_token(TOKENS.END_OF_FILE):
+            token_type = self._current_token.token_type
+            self._advance()
+
+            if token_type in token_types:
+                self._skip_line()
+                return
+
+            if (token_type == TOKENS.NEWLINE and
+                    self._is_current_token(*self.DEFINITION_STARTS)):
+                return
+
+    def _unexpected_token(self):
+        # The lexer terminates every file with a newline, which is only
+        # unexpected if there was no definition at all.
+        if not (self._is_current_token(TOKENS.NEWLINE) and
+                self._is_next_token(TOKENS.END_OF_FILE)):
+            self._report(f"Unexpected \"{self._current_token.token_type}\"")
+        self._skip_line()
 
     def _eat(self, token_type):
         token = self._current_token
@@ -68,30 +325,41 @@ class Parser:
         self._error(f"Expected \"{token_type}\", found \"{token.token_type}\"")
 
     def _try_eat(self, token_type):
-        try:
-            self._eat(token_type)
+        if self._current_token.token_type == token_type:
+            self._advance()
             return True
-        except ParsingError:
-            return False
+        return False
 
     def _peek(self):
-        if self._position > len(self._tokens) - 2:
-            return None
-        return self._tokens[self._position + 1]
+        return self._next_token
 
-    def _is_current_token(self, token_type):
-        return self._current_token.token_type == token_type
+    def _is_current_token(self, *token_types):
+        return self._current_token.token_type in token_types
 
     def _is_next_token(self, token_type):
         return self._peek().token_type == token_type
 
+    def _is_definition_start(self, keyword):
+        return (self._is_current_token(keyword) or
+                self._is_current_token(KEYWORDS.GLOBAL) and
+                self._is_next_token(keyword))
+
     def _advance(self):
-        self._position += 1
+        self._previous_token = self._current_token
+        self._current_token = self._next_token
+        self._next_token = next(self._tokens, None)
 
-        if self._position > len(self._tokens) - 1:
-            self._current_token = None
-        else:
-            self._current_token = self._tokens[self._position]
+    def _spanned(self, node, first, last=None):
+        """
+        Sets the span of node from the first token to the last one, by
+        default the last eaten token, and returns node.
+        """
+        node.span = token_span(first, last or self._previous_token)
+        return node
+
+    def _file_span(self):
+        end = self._current_token.end
+        return make_span(0, end, 0, 0) if end is not None else None
 
     # =========================================================================
     #                            Grammar definitions
@@ -102,24 +370,41 @@ class Parser:
         source_file = header
                       1*(module_definition / function_definition)
         """
+        return self._definitions_file(SourceFile, name)
+
+    def _submit_file(self, name):
+        """
+        submit_file = header
+                      1*(module_definition / function_definition)
+        """
+        return self._definitions_file(SubmitFile, name)
+
+    def _definitions_file(self, node_class, name):
         attributes = self._header()
 
         statements = []
-        while any(self._is_current_token(token) for token in
-                  (KEYWORDS.GLOBAL, KEYWORDS.DEF, KEYWORDS.DEFFCT)):
-            definitions = (self._module_definition(),
-                           self._function_definition())
-            for definition in filter(None, definitions):
-                statements.append(definition)
+        while not self._is_current_token(TOKENS.END_OF_FILE):
+            if self._is_current_token(KEYWORDS.GLOBAL, KEYWORDS.DEF,
+                                      KEYWORDS.DEFFCT):
+                self._recoverable(
+                    lambda: self._definitions(statements),
+                    lambda: self._synchronize(KEYWORDS.END, KEYWORDS.ENDFCT))
+            elif self._recover:
+                self._unexpected_token()
+            else:
+                break
 
         if not statements:
-            raise self._error("No module or function definition found")
+            self._report("No module or function definition found")
 
+        span = self._file_span()
         self._eat(TOKENS.END_OF_FILE)
 
-        return SourceFile(name=name,
+        node = node_class(name=name,
                           file_attributes=attributes,
                           statements=statements)
+        node.span = span
+        return node
 
     def _data_file(self, name):
         """
@@ -129,19 +414,31 @@ class Parser:
         attributes = self._header()
 
         statements = []
-        while self._is_current_token(KEYWORDS.DEFDAT):
-            statements.append(self._data_definition())
+        while not self._is_current_token(TOKENS.END_OF_FILE):
+            if self._is_current_token(KEYWORDS.DEFDAT):
+                definition = self._recoverable(
+                    self._data_definition,
+                    lambda: self._synchronize(KEYWORDS.ENDDAT))
+                if definition:
+                    statements.append(definition)
+            elif self._recover:
+                self._unexpected_token()
+            else:
+                break
 
         if not statements:
-            raise self._error("No data definition found")
+            self._report("No data definition found")
         if len(statements) > 1:
-            raise self._error("More than one data definition found")
+            self._report("More than one data definition found")
 
+        span = self._file_span()
         self._eat(TOKENS.END_OF_FILE)
 
-        return DataFile(name=name,
+        node = DataFile(name=name,
                         file_attributes=attributes,
                         statements=statements)
+        node.span = span
+        return node
 
     def _header(self):
         """
@@ -149,11 +446,28 @@ class Parser:
         """
         attributes = []
         while self._current_token.token_type == TOKENS.FILE_ATTRIBUTE:
+            token = self._eat(TOKENS.FILE_ATTRIBUTE)
             attributes.append(
-                FileAttribute(value=self._eat(TOKENS.FILE_ATTRIBUTE).value))
+                self._spanned(FileAttribute(value=token.value), token))
             self._eat(TOKENS.NEWLINE)
         return attributes
 
+    def _definitions(self, statements):
+        # Each definition is kept as soon as it is parsed, so that an error
+        # in the following one does not take it along in recover mode.
+        found = False
+        for definition in (self._module_definition,
+                            self._function_definition):
+            node = definition()
+            if node:
+                statements.append(node)
+                found = True
+
+        if not found:
+            self._advance()
+            self._error(f"Expected \"{KEYWORDS.DEF}\" or "
+                        f"\"{KEYWORDS.DEFFCT}\"")
+
     def _module_definition(self):
         """
         module_definition = ["GLOBAL"] "DEF" name
@@ -162,11 +476,11 @@ class Parser:
                             statements
                             "END" comment_or_newline
         """
-        global_definition = self._try_eat(KEYWORDS.GLOBAL)
-
-        if not self._is_current_token(KEYWORDS.DEF):
+        if not self._is_definition_start(KEYWORDS.DEF):
             return None
 
+        first = self._current_token
+        global_definition = self._try_eat(KEYWORDS.GLOBAL)
         self._eat(KEYWORDS.DEF)
         name = self._eat(TOKENS.NAME)
         self._eat(TOKENS.LEFT_BRACE)
@@ -178,13 +492,15 @@ class Parser:
 
         body = self._statements()
 
-        self._eat(KEYWORDS.END)
+        last = self._eat(KEYWORDS.END)
         self._comment_or_newline()
 
-        return FunctionDefinition(name=name.value,
-                                  parameters=parameters,
-                                  body=variable_declarations + body,
-                                  is_global=global_definition)
+        return self._spanned(
+            FunctionDefinition(name=name.value,
+                               parameters=parameters,
+                               body=variable_declarations + body,
+                               is_global=global_definition),
+            first, last)
 
     def _function_definition(self):
         """
@@ -194,11 +510,11 @@ class Parser:
                               statements
                               "END" comment_or_newline
         """
-        global_definition = self._try_eat(KEYWORDS.GLOBAL)
-
-        if not self._is_current_token(KEYWORDS.DEFFCT):
+        if not self._is_definition_start(KEYWORDS.DEFFCT):
             return None
 
+        first = self._current_token
+        global_definition = self._try_eat(KEYWORDS.GLOBAL)
         self._eat(KEYWORDS.DEFFCT)
         return_type = self._eat(TOKENS.NAME)
         name = self._eat(TOKENS.NAME)
@@ -211,29 +527,44 @@ class Parser:
 
         body = self._statements()
 
-        self._eat(KEYWORDS.ENDFCT)
+        last = self._eat(KEYWORDS.ENDFCT)
         self._comment_or_newline()
 
-        return FunctionDefinition(name=name.value,
-                                  parameters=parameters,
-                                  body=variable_declarations + body,
-                                  returns=Type(name=return_type.value),
-                                  is_global=global_definition)
+        return self._spanned(
+            FunctionDefinition(name=name.value,
+                               parameters=parameters,
+                               body=variable_declarations + body,
+                               returns=self._spanned(
+                                   Type(name=return_type.value),
+                                   return_type, return_type),
+                               is_global=global_definition),
+            first, last)
 
     def _data_definition(self):
         """
         data_definition = "DEFDAT" name ["PUBLIC"] comment_or_newline
+                          variable_declarations_data
                           "ENDDAT" comment_or_newline
         """
-        self._eat(KEYWORDS.DEFDAT)
+        first = self._eat(KEYWORDS.DEFDAT)
         name = self._eat(TOKENS.NAME)
         public_definition = self._try_eat(KEYWORDS.PUBLIC)
+
+        body = []
+        if self._declarations:
+            self._scanned_body = body
         self._comment_or_newline()
 
-        self._eat(KEYWORDS.ENDDAT)
+        self._variable_declarations_data(body)
+        self._scanned_body = None
+
+        last = self._eat(KEYWORDS.ENDDAT)
         self._comment_or_newline()
 
-        return DataDefinition(name=name.value, is_public=public_definition)
+        return self._spanned(
+            DataDefinition(name=name.value, body=body,
+                           is_public=public_definition),
+            first, last)
 
     def _parameter_definitions(self):
         """
@@ -267,7 +598,8 @@ class Parser:
         if not parameter_type:
             self._error(f"Expected \"{KEYWORDS.IN}\" or \"{KEYWORDS.OUT}\"")
 
-        return Parameter(name=name.value, parameter_type=parameter_type)
+        return self._spanned(
+            Parameter(name=name.value, parameter_type=parameter_type), name)
 
     def _variable_declarations_source(self):
         """
@@ -276,31 +608,39 @@ class Parser:
                                          comment_or_newline)
         """
         declarations = []
-        while True:
-            if (self._try_eat(KEYWORDS.DECL) or (
-                    self._is_current_token(TOKENS.NAME) and
-                    self._is_next_token(TOKENS.NAME))):
-                symbol_type = self._eat(TOKENS.NAME).value
-                symbol_name = self._eat(TOKENS.NAME).value
-                array_dimensions = self._array()
-                declarations.append(VariableSymbol(
-                    name=symbol_name,
-                    symbol_type=symbol_type,
-                    dimensions=array_dimensions
-                ))
+        while (self._try_eat(KEYWORDS.DECL) or (
+                self._is_current_token(TOKENS.NAME) and
+                self._is_next_token(TOKENS.NAME))):
+            declarations.extend(
+                self._recoverable(self._variable_declaration_source,
+                                  self._skip_line) or [])
 
-                while self._try_eat(TOKENS.COMMA):
-                    symbol_name = self._eat(TOKENS.NAME).value
-                    array_dimensions = self._array()
-                    declarations.append(VariableSymbol(
-                        name=symbol_name,
-                        symbol_type=symbol_type,
-                        dimensions=array_dimensions
-                    ))
+        return declarations
 
-                self._comment_or_newline()
-            else:
-                return declarations
+    def _variable_declaration_source(self):
+        declarations = []
+
+        symbol_type = self._eat(TOKENS.NAME).value
+        symbol_name = self._eat(TOKENS.NAME)
+        array_dimensions = self._array()
+        declarations.append(self._spanned(VariableSymbol(
+            name=symbol_name.value,
+            symbol_type=symbol_type,
+            dimensions=array_dimensions
+        ), symbol_name))
+
+        while self._try_eat(TOKENS.COMMA):
+            symbol_name = self._eat(TOKENS.NAME)
+            array_dimensions = self._array()
+            declarations.append(self._spanned(VariableSymbol(
+                name=symbol_name.value,
+                symbol_type=symbol_type,
+                dimensions=array_dimensions
+            ), symbol_name))
+
+        self._comment_or_newline()
+
+        return declarations
 
     def _array(self):
         """
@@ -322,23 +662,217 @@ class Parser:
 
         return [0]
 
+    def _variable_declarations_data(self, body):
+        """
+        variable_declarations_data = *(variable_declaration_data /
+                                       assignment / comment_or_newline)
+
+        Appends to body, which also gets the scanned declarations of the
+        lines passed by comment_or_newline.
+        """
+        while True:
+            if (self._try_eat(KEYWORDS.DECL) or (
+                    self._is_current_token(TOKENS.NAME) and
+                    self._is_next_token(TOKENS.NAME))):
+                self._recoverable(
+                    lambda: self._variable_declaration_data(body),
+                    self._skip_line)
+            elif (self._is_current_token(TOKENS.NAME) and (
+                    self._is_next_token(TOKENS.LEFT_SQUARE_BRACE) or
+                    self._is_next_token(TOKENS.EQUAL))):
+                self._recoverable(lambda: self._assignment(body),
+                                  self._skip_line)
+            elif self._is_current_token(TOKENS.COMMENT, TOKENS.NEWLINE):
+                self._comment_or_newline()
+            elif self._recover and not self._is_current_token(
+                    *self.BODY_ENDS):
+                self._unexpected_token()
+            else:
+                break
+
+    def _variable_declaration_data(self, body):
+        """
+        variable_declaration_data = [DECL ["GLOBAL"]] type
+                                    variable_data *("," variable_data)
+                                    comment_or_newline
+        """
+        global_declaration = self._try_eat(KEYWORDS.GLOBAL)
+        symbol_type = self._eat(TOKENS.NAME).value
+
+        declarations = [self._variable_data(symbol_type, global_declaration)]
+        while self._try_eat(TOKENS.COMMA):
+            declarations.append(
+                self._variable_data(symbol_type, global_declaration))
+
+        body.extend(declarations)
+        self._comment_or_newline()
+
+    def _variable_data(self, symbol_type, global_declaration):
+        """
+        variable_data = name [array] ["=" value]
+        """
+        symbol_name = self._eat(TOKENS.NAME)
+        array_dimensions = self._array()
+        value = self._value() if self._try_eat(TOKENS.EQUAL) else None
+
+        return self._spanned(VariableSymbol(
+            name=symbol_name.value,
+            symbol_type=symbol_type,
+            dimensions=array_dimensions,
+            value=value,
+            is_global=global_declaration
+        ), symbol_name)
+
+    def _assignment(self, body):
+        """
+        assignment = name ["[" [integer_number *("," integer_number)] "]"]
+                     "=" value comment_or_newline
+        """
+        name = self._eat(TOKENS.NAME)
+
+        indices = None
+        if self._try_eat(TOKENS.LEFT_SQUARE_BRACE):
+            indices = []
+            if self._is_current_token(TOKENS.INTEGER):
+                indices.append(self._eat(TOKENS.INTEGER).value)
+                while self._try_eat(TOKENS.COMMA):
+                    indices.append(self._eat(TOKENS.INTEGER).value)
+            self._eat(TOKENS.RIGHT_SQUARE_BRACE)
+
+        self._eat(TOKENS.EQUAL)
+        value = self._value()
+
+        body.append(self._spanned(
+            Assignment(name=name.value, indices=indices, value=value),
+            name))
+        self._comment_or_newline()
+
+    def _value(self):
+        """
+        value = aggregate / "#" name / ["+" / "-"] integer_number /
+                ["+" / "-"] floating_number / string / "TRUE" / "FALSE"
+        """
+        token = self._current_token
+
+        if token.token_type == TOKENS.LEFT_CURLY_BRACE:
+            return self._aggregate()
+
+        if token.token_type == TOKENS.HASH:
+            self._advance()
+            name = self._eat(TOKENS.NAME)
+            return self._spanned(EnumValue(name=name.value), token)
+
+        if token.token_type == TOKENS.STRING:
+            self._advance()
+            return token.value
+
+        if (token.token_type == TOKENS.NAME and
+                token.value.upper() in ("TRUE", "FALSE")):
+            self._advance()
+            return token.value.upper() == "TRUE"
+
+        negative = self._try_eat(TOKENS.MINUS)
+        if not negative:
+            self._try_eat(TOKENS.PLUS)
+        if self._is_current_token(TOKENS.INTEGER, TOKENS.REAL):
+            value = self._current_token.value
+            self._advance()
+            return -value if negative else value
+
+        self._error(f"Expected value, found "
+                    f"\"{self._current_token.token_type}\"")
+
+    def _aggregate(self):
+        """
+        aggregate = "{" [type ":"] [field *("," field)] "}"
+
+        field = name ["[" "]"] value
+        """
+        first = self._eat(TOKENS.LEFT_CURLY_BRACE)
+
+        type_name = None
+        if (self._is_current_token(TOKENS.NAME) and
+                self._is_next_token(TOKENS.COLON)):
+            type_name = self._eat(TOKENS.NAME).value
+            self._eat(TOKENS.COLON)
+
+        names = []
+        values = []
+        if self._is_current_token(TOKENS.NAME):
+            self._field(names, values)
+            while self._try_eat(TOKENS.COMMA):
+                self._field(names, values)
+
+        last = self._eat(TOKENS.RIGHT_CURLY_BRACE)
+
+        return self._spanned(
+            Aggregate(type_name=type_name, names=names, values=values),
+            first, last)
+
+    def _field(self, names, values):
+        names.append(self._eat(TOKENS.NAME).value)
+        if self._try_eat(TOKENS.LEFT_SQUARE_BRACE):
+            self._eat(TOKENS.RIGHT_SQUARE_BRACE)
+        values.append(self._value())
+
     def _statements(self):
         """
-        statements = *(module_call / comment_or_newline)
+        statements = *(module_call / loop_statement / comment_or_newline)
         """
         statements = []
         while True:
             if (self._is_current_token(TOKENS.NAME) and
                self._is_next_token(TOKENS.LEFT_BRACE)):
-                statements.append(self._module_call())
-            elif any(self._is_current_token(token) for token in
-                     (TOKENS.COMMENT, TOKENS.NEWLINE)):
+                statement = self._recoverable(self._module_call,
+                                              self._skip_line)
+                if statement:
+                    statements.append(statement)
+            elif self._is_current_token(KEYWORDS.LOOP):
+                statement = self._recoverable(
+                    self._loop_statement,
+                    lambda: self._synchronize(KEYWORDS.ENDLOOP))
+                if statement:
+                    statements.append(statement)
+            elif self._is_current_token(TOKENS.COMMENT, TOKENS.NEWLINE):
                 self._comment_or_newline()
+            elif self._loop_depth and self._is_current_token(
+                    KEYWORDS.ENDLOOP):
+                break
+            elif self._recover and not self._is_current_token(
+                    *self.BODY_ENDS):
+                self._unexpected_token()
             else:
                 break
 
         return statements
 
+    def _loop_statement(self):
+        """
+        loop_statement = "LOOP" comment_or_newline
+                         statements
+                         "ENDLOOP" comment_or_newline
+        """
+        first = self._eat(KEYWORDS.LOOP)
+        self._comment_or_newline()
+
+        # Only a loop ends at "ENDLOOP", a stray one is unexpected elsewhere
+        self._loop_depth += 1
+        try:
+            body = self._statements()
+        finally:
+            self._loop_depth -= 1
+
+        # A missing "ENDLOOP" must not take the end of the definition with it
+        if not self._is_current_token(KEYWORDS.ENDLOOP):
+            self._report(f"Expected \"{KEYWORDS.ENDLOOP}\", found "
+                         f"\"{self._current_token.token_type}\"")
+            return self._spanned(Loop(body=body), first)
+
+        last = self._eat(KEYWORDS.ENDLOOP)
+        self._comment_or_newline()
+
+        return self._spanned(Loop(body=body), first, last)
+
     def _module_call(self):
         """
         module_call = name "(" parameters ")"
@@ -347,7 +881,9 @@ class Parser:
         self._eat(TOKENS.LEFT_BRACE)
         parameters = self._parameters()
         self._eat(TOKENS.RIGHT_BRACE)
-        return FunctionCall(name=function.value, parameters=parameters)
+        return self._spanned(
+            FunctionCall(name=function.value, parameters=parameters),
+            function)
 
     def _parameters(self):
         """
@@ -369,9 +905,21 @@ class Parser:
         comment_or_newline = 1*([comment] newline)
         """
         self._try_eat(TOKENS.COMMENT)
-        self._eat(TOKENS.NEWLINE)
+        newline = self._eat(TOKENS.NEWLINE)
+        if self._scanned_body is not None:
+            self._take_scanned(newline)
 
-        while any(self._is_current_token(token) for token in
-                  (TOKENS.COMMENT, TOKENS.NEWLINE)):
+        while self._is_current_token(TOKENS.COMMENT, TOKENS.NEWLINE):
             self._try_eat(TOKENS.COMMENT)
-            self._eat(TOKENS.NEWLINE)
+            newline = self._eat(TOKENS.NEWLINE)
+            if self._scanned_body is not None:
+                self._take_scanned(newline)
+
+    def _take_scanned(self, newline):
+        """
+        Adds the declarations scanned from the lines following newline,
+        which the lexer never saw, to the data definition body.
+        """
+        symbols = self._declarations.pop(newline.line_number, None)
+        if symbols is not None:
+            self._scanned_body.extend(symbols)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Columnar export of the taught points of data files to NumPy arrays.
+
+export_points reads the E6POS, E6AXIS and FRAME declarations of data files
+with the bulk scanner, without building nodes, and writes them straight
+into one array per column:
+
+    file    index of the data file in PointArrays.files
+    name    name of the point
+    type    index of its type in POINT_TYPES
+    X ...   one float column per field in COLUMNS, NaN where a point has
+            no such field, for example the A1 to A6 of a position
+
+The files are read twice, once to count the points and once to fill the
+arrays, which are allocated in full up front. Given a directory, the
+columns are memory mapped .npy files there, so projects with millions of
+points need not fit into memory; load_points opens them again.
+
+Only declarations on one line whose aggregate holds plain numbers are
+exported, as written by the controller. Points of already parsed files
+are exported by nodes_to_points.
+"""
+
+import json
+import os
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import numpy
+    from numpy.lib.format import open_memmap
+except ImportError:
+    numpy = None
+
+from .ast import (DataFile, DataDefinition, VariableSymbol, Aggregate,
+                  walk)
+from .data_scanner import scan_numbers, count_numbers
+from .source import open_source
+
+
+POINT_TYPES = ("E6POS", "E6AXIS", "FRAME")
+
+COLUMNS = ("X", "Y", "Z", "A", "B", "C", "S", "T",
+           "A1", "A2", "A3", "A4", "A5", "A6",
+           "E1", "E2", "E3", "E4", "E5", "E6")
+
+CHUNK_SIZE = 65536
+
+_TYPE_CODES = {point_type: code for code, point_type
+               in enumerate(POINT_TYPES)}
+
+
+class PointArrays:
+    """
+    Columns of exported points, each an array with an entry per point,
+    looked up by column name.
+    """
+
+    def __init__(self, files, columns):
+        self.files = files
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["name"])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}("
+                f"files={len(self.files)}, "
+                f"points={len(self)})")
+
+    def flush(self):
+        """Writes memory mapped columns back to their files."""
+        for array in self.columns.values():
+            flush = getattr(array, "flush", None)
+            if flush is not None:
+                flush()
+
+
+def export_points(paths, directory=None, *, encoding=None,
+                  chunk_size=CHUNK_SIZE):
+    """
+    Returns the points of the data files at paths as PointArrays, memory
+    mapped in directory if given.
+
+    The files are decoded as latin-1 for scanning; files in an encoding
+    which does not agree with ASCII, like UTF-16, have no points.
+    """
+    _require_numpy()
+    paths = list(paths)
+
+    count = name_length = 0
+    for path in paths:
+        with open_source(path) as code:
+            points, length = count_numbers(code, POINT_TYPES, encoding)
+        count += points
+        name_length = max(name_length, length)
+
+    points = _allocate(paths, count, name_length, directory)
+    row = 0
+    for file_index, path in enumerate(paths):
+        with open_source(path) as code:
+            declarations = scan_numbers(code, POINT_TYPES, encoding)
+            while True:
+                chunk = list(islice(declarations, chunk_size))
+                if not chunk:
+                    break
+                row = _write(points.columns, row, file_index,
+                             *_split_fields(chunk))
+
+    if row != count:
+        raise RuntimeError(f"{count} points counted, but {row} read; "
+                           f"were the data files changed meanwhile?")
+    points.flush()
+    return points
+
+
+def nodes_to_points(nodes, directory=None):
+    """
+    Returns the points declared in parsed nodes, such as DataFiles,
+    DataDefinitions or Modules, as PointArrays. The files of the points
+    are the names of the DataFiles, or DataDefinitions given on their own,
+    they are found in.
+    """
+    _require_numpy()
+
+    files = []
+    chunks = []
+    for node in nodes:
+        for data_file in _data_files(node):
+            symbols = list(_declared_points(data_file))
+            if symbols:
+                chunks.append((len(files), symbols))
+            files.append(data_file.name)
+
+    count = sum(len(symbols) for _, symbols in chunks)
+    name_length = max((len(symbol.name) for _, symbols in chunks
+                       for symbol in symbols), default=0)
+    points = _allocate(files, count, name_length, directory)
+    row = 0
+    for file_index, symbols in chunks:
+        row = _write(points.columns, row, file_index,
+                     [symbol.type for symbol in symbols],
+                     [symbol.name for symbol in symbols],
+                     [symbol.value.names for symbol in symbols],
+                     [value for symbol in symbols
+                      for value in symbol.value.values])
+    points.flush()
+    return points
+
+
+def load_points(directory, mmap_mode="r"):
+    """Opens the PointArrays exported to directory."""
+    _require_numpy()
+
+    with open(os.path.join(directory, "files.json"),
+              encoding="utf-8") as file:
+        files = json.load(file)
+    columns = {column: numpy.load(os.path.join(directory, column + ".npy"),
+                                  mmap_mode=mmap_mode)
+               for column in _COLUMN_NAMES}
+    return PointArrays(files, columns)
+
+
+_COLUMN_NAMES = ("file", "name", "type") + COLUMNS
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("The export of points needs NumPy")
+
+
+def _allocate(files, count, name_length, directory):
+    dtypes = {"file": numpy.uint32, "name": f"<U{max(name_length, 1)}",
+              "type": numpy.uint8}
+    if directory is None:
+        columns = {column: numpy.empty(count, dtypes.get(column,
+                                                         numpy.float64))
+                   for column in _COLUMN_NAMES}
+    else:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "files.json"), "w",
+                  encoding="utf-8") as file:
+            json.dump(files, file)
+        columns = {column: open_memmap(
+            os.path.join(directory, column + ".npy"), mode="w+",
+            dtype=dtypes.get(column, numpy.float64), shape=(count,))
+                   for column in _COLUMN_NAMES}
+
+    for column in COLUMNS:
+        columns[column].fill(numpy.nan)
+    return PointArrays(files, columns)
+
+
+def _split_fields(chunk):
+    """
+    Returns types, names, field names and values of a chunk of
+    declarations as given by scan_numbers, the values of all of them in
+    one list.
+    """
+    types, names, fields = zip(*chunk)
+    parts = " ".join(fields).replace(",", " ").split()
+    field_names = parts[0::2]
+    layouts = []
+    offset = 0
+    for text in fields:
+        count = text.count(",") + 1 if text else 0
+        layouts.append(tuple(field_names[offset:offset + count]))
+        offset += count
+    return types, names, layouts, parts[1::2]
+
+
+def _write(columns, start, file_index, types, names, layouts, values):
+    """
+    Writes points to the columns from row start on and returns the row
+    following them. The values of all points are given in one list.
+    """
+    if not names:
+        return start
+    end = start + len(names)
+    columns["file"][start:end] = file_index
+    columns["name"][start:end] = names
+    columns["type"][start:end] = [_TYPE_CODES[point_type.upper()]
+                                  for point_type in types]
+
+    # Points with the same fields are converted at once and stored one
+    # column at a time.
+    values = numpy.array(values, dtype=numpy.float64)
+    groups = {}
+    offset = 0
+    for row, layout in enumerate(layouts, start):
+        group = groups.get(layout)
+        if group is None:
+            group = groups[layout] = ([], [])
+        group[0].append(row)
+        group[1].append(offset)
+        offset += len(layout)
+
+    for layout, (rows, offsets) in groups.items():
+        if len(groups) == 1:
+            rows = slice(start, end)
+            block = values.reshape(end - start, len(layout))
+        else:
+            block = values[numpy.add.outer(offsets, numpy.arange(len(layout)))]
+        for index, column in _layout_columns(layout):
+            columns[column][rows] = block[:, index]
+    return end
+
+
+@lru_cache(maxsize=1024)
+def _layout_columns(layout):
+    """Returns index and column of the fields in layout with a column."""
+    return tuple((index, field.upper())
+                 for index, field in enumerate(layout)
+                 if field.upper() in COLUMNS)
+
+
+def _data_files(node):
+    for child in walk(node, prune=_is_leaf):
+        if isinstance(child, (DataFile, DataDefinition)):
+            yield child
+
+
+def _declared_points(node):
+    for child in walk(node, prune=_is_symbol):
+        if (isinstance(child, VariableSymbol) and
+                child.type.upper() in _TYPE_CODES and
+                isinstance(child.value, Aggregate) and
+                all(type(value) in (int, float)
+                    for value in child.value.values)):
+            yield child
+
+
+def _is_leaf(node):
+    return isinstance(node, (DataFile, DataDefinition, VariableSymbol))
+
+
+def _is_symbol(node):
+    return isinstance(node, VariableSymbol)
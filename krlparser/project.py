@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .parser import Parser
+from .semantic_analyzer import ProjectAnalyzer
+from .instrumentation import Instrumentation, ANALYZE, count_nodes
+
+
+SOURCE_EXTENSION = ".src"
+DATA_EXTENSION = ".dat"
+SUBMIT_EXTENSION = ".sub"
+
+
+def group_files(paths):
+    """
+    Groups source and data files with the same name in the same directory
+    into modules, submit files form units of their own. Units are tuples of
+    name, source, data and submit file path. The order of the units follows
+    the first appearance of each of them in paths.
+    """
+    units = {}
+    for path in paths:
+        name, extension = os.path.splitext(os.path.basename(path))
+        extension = extension.lower()
+        if extension not in (SOURCE_EXTENSION, DATA_EXTENSION,
+                             SUBMIT_EXTENSION):
+            raise ValueError(f"Unsupported file type: {path}")
+
+        key = unit_key(path)
+        unit = units.setdefault(key, {"name": name})
+        unit[extension] = path
+
+    return [(unit["name"],
+             unit.get(SOURCE_EXTENSION),
+             unit.get(DATA_EXTENSION),
+             unit.get(SUBMIT_EXTENSION))
+            for unit in units.values()]
+
+
+def unit_key(path):
+    """Returns the key of the unit path belongs to."""
+    directory, file_name = os.path.split(path)
+    name, extension = os.path.splitext(file_name)
+    return (os.path.normcase(directory), name.lower(),
+            extension.lower() == SUBMIT_EXTENSION)
+
+
+def read_file(path):
+    if path is None:
+        return None
+
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def read_unit(unit):
+    name, *paths = unit
+    return (name,) + tuple(read_file(path) for path in paths)
+
+
+def unit_kind(unit):
+    _, source_file, data_file, submit_file = unit
+    if submit_file is not None:
+        return "submit_file"
+    if source_file is not None and data_file is not None:
+        return "module"
+    if source_file is not None:
+        return "source_file"
+    return "data_file"
+
+
+def parse_unit(unit, encoding=None, instrumentation=None):
+    name, source_file, data_file, submit_file = unit
+
+    parser = Parser(encoding=encoding, instrumentation=instrumentation)
+    kind = unit_kind(unit)
+    if kind == "module":
+        parser.add_module(name, source_file, data_file)
+    elif kind == "source_file":
+        parser.add_source_file(name, source_file)
+    elif kind == "data_file":
+        parser.add_data_file(name, data_file)
+    else:
+        parser.add_submit_file(name, submit_file)
+
+    return parser.ast[0]
+
+
+def parse_unit_instrumented(unit, encoding=None, memory=False):
+    """Returns the parsed unit together with its stage records."""
+    instrumentation = Instrumentation(memory=memory)
+    return parse_unit(unit, encoding, instrumentation), \
+        instrumentation.records
+
+
+class ProjectParser:
+    """
+    Parses all modules of a project, optionally in parallel, and runs the
+    project analysis once over the merged AST.
+    """
+
+    def __init__(self, *, workers=None, encoding=None, cache=None,
+                 instrumentation=None):
+        self.workers = workers
+        self.encoding = encoding
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.analyzer = ProjectAnalyzer()
+        self._ast = []
+
+    @property
+    def ast(self):
+        return self._ast
+
+    @property
+    def symbol_table(self):
+        return self.analyzer.symbol_table
+
+    @property
+    def symbol_index(self):
+        return self.analyzer.symbol_table.index
+
+    def add_project(self, paths):
+        units = [read_unit(unit) for unit in group_files(paths)]
+        nodes = self._parse_units(units)
+
+        if self.instrumentation is None:
+            self.analyzer.analyze(nodes)
+        else:
+            with self.instrumentation.stage(ANALYZE,
+                                            nodes=count_nodes(nodes)):
+                self.analyzer.analyze(nodes)
+
+        self._ast.extend(nodes)
+        return nodes
+
+    def _parse_units(self, units):
+        nodes = [None] * len(units)
+        keys = [None] * len(units)
+
+        if self.cache is not None:
+            for index, unit in enumerate(units):
+                keys[index] = self.cache.key(
+                    unit_kind(unit),
+                    *(part for part in unit if part is not None),
+                    encoding=self.encoding)
+                nodes[index] = self.cache.get(keys[index])
+
+        missing = [index for index, node in enumerate(nodes) if node is None]
+        parsed = self._parse_missing([units[index] for index in missing])
+
+        for index, node in zip(missing, parsed):
+            nodes[index] = node
+            if self.cache is not None:
+                self.cache.put(keys[index], node)
+
+        return nodes
+
+    def _parse_missing(self, units):
+        encodings = [self.encoding] * len(units)
+        if self.instrumentation is None:
+            return self._map(parse_unit, units, encodings)
+
+        # Workers record into their own instrumentation, merge it back
+        results = self._map(parse_unit_instrumented, units, encodings,
+                            [self.instrumentation.memory] * len(units))
+        for _, records in results:
+            self.instrumentation.extend(records)
+        return [node for node, _ in results]
+
+    def _map(self, function, *iterables):
+        if self.workers == 1 or len(iterables[0]) < 2:
+            return list(map(function, *iterables))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(function, *iterables))
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import codecs
+import mmap
+import os
+import re
+from functools import partial
+
+from .source import detect_encoding
+from .token import Token, TOKENS, KEYWORD_TYPES, intern_name
+
+
+class RegexLexer:
+    """
+    Single pass lexer driven by one compiled master pattern.
+
+    Produces the same token stream as :class:`krlparser.lexer.Lexer`,
+    including line numbers, columns and error tokens. Besides str it also
+    lexes bytes, bytearray and mmap input, which is decoded token by token.
+    """
+
+    _OPERATORS = {
+        "(": TOKENS.LEFT_BRACE,
+        ")": TOKENS.RIGHT_BRACE,
+        "[": TOKENS.LEFT_SQUARE_BRACE,
+        "]": TOKENS.RIGHT_SQUARE_BRACE,
+        "{": TOKENS.LEFT_CURLY_BRACE,
+        "}": TOKENS.RIGHT_CURLY_BRACE,
+        "+": TOKENS.PLUS,
+        "-": TOKENS.MINUS,
+        "*": TOKENS.STAR,
+        "/": TOKENS.SLASH,
+        ".": TOKENS.DOT,
+        ",": TOKENS.COMMA,
+        ":": TOKENS.COLON,
+        "#": TOKENS.HASH,
+        "=": TOKENS.EQUAL,
+        "==": TOKENS.EQUAL_EQUAL,
+        "<>": TOKENS.NOT_EQUAL,
+        ">": TOKENS.GREATER,
+        "<": TOKENS.LESS,
+        ">=": TOKENS.GREATER_EQUAL,
+        "<=": TOKENS.LESS_EQUAL
+    }
+
+    _PATTERNS = (
+        r"(?P<WHITESPACE>\s+)",
+        r"(?P<NAME>[A-Za-z$_][A-Za-z0-9$_]*)",
+        r"(?P<OPERATOR>==|<>|>=|<=|[()\[\]{}+\-*/.,:#=<>])",
+        r"(?P<NUMBER>[0-9][0-9Ee.+\-]*)",
+        r"(?P<COMMENT>;)",
+        r"(?P<STRING>\")",
+        r"(?P<BASED_NUMBER>')",
+        r"(?P<FILE_ATTRIBUTE>&)",
+        r"(?P<ERROR>.)"
+    )
+
+    _TEXT_PATTERN = re.compile(
+        "|".join((f"(?P<NEWLINE>{re.escape(os.linesep)})",) + _PATTERNS),
+        re.DOTALL)
+
+    # Byte input accepts both "\r\n" and "\n" line endings
+    _BYTES_PATTERN = re.compile(
+        "|".join((r"(?P<NEWLINE>\r?\n)",) + _PATTERNS).encode("ascii"),
+        re.DOTALL)
+
+    _NON_ASCII = re.compile(b"[\x80-\xff]")
+
+    def __init__(self, *, code, encoding=None):
+        if isinstance(code, str):
+            self._decode = None
+            self._wide = False
+        elif isinstance(code, (bytes, bytearray, mmap.mmap)):
+            encoding = encoding or detect_encoding(code)
+            self._decode = partial(str, encoding=encoding, errors="replace")
+            self._wide = codecs.lookup(encoding).name.startswith("utf-8")
+        else:
+            raise ValueError("Invalid input!")
+
+        self._input = code
+
+    def generate_tokens(self):
+        return list(self.iter_tokens())
+
+    def iter_tokens(self):
+        source = self._input
+        length = len(source)
+        newline = os.linesep
+        keywords = KEYWORD_TYPES
+        intern = intern_name
+        operators = self._OPERATORS
+        decode = self._decode
+
+        if decode is None:
+            match = self._TEXT_PATTERN.match
+            quote, apostrophe, hexadecimal, binary = \
+                "\"", "'", ("H", "h"), ("B", "b")
+        else:
+            match = self._BYTES_PATTERN.match
+            quote, apostrophe, hexadecimal, binary = \
+                b"\"", b"'", (b"H", b"h"), (b"B", b"b")
+
+        position = 0
+        if decode and source[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            position = len(codecs.BOM_UTF8)
+
+        line_number = 0
+        line_start = position
+        wide_line = self._is_wide_line(line_start)
+        while position < length:
+            found = match(source, position)
+            kind = found.lastgroup
+            start = position
+            position = found.end()
+
+            if kind == "WHITESPACE":
+                continue
+
+            column = start - line_start
+            if wide_line:
+                column = self._column(line_start, start)
+
+            if kind == "NAME":
+                value = found.group()
+                if decode:
+                    value = decode(value)
+                value = intern(value)
+                yield Token(token_type=keywords.get(value, TOKENS.NAME),
+                            value=value,
+                            line_number=line_number,
+                            column=column,
+                            offset=start,
+                            end=position)
+
+            elif kind == "OPERATOR":
+                value = found.group()
+                if decode:
+                    value = decode(value)
+                yield Token(token_type=operators[value],
+                            value=value,
+                            line_number=line_number,
+                            column=column,
+                            offset=start,
+                            end=position)
+
+            elif kind == "NEWLINE":
+                yield Token(token_type=TOKENS.NEWLINE,
+                            value=newline,
+                            line_number=line_number,
+                            column=column,
+                            offset=start,
+                            end=position)
+                line_number += 1
+                line_start = position
+                wide_line = self._is_wide_line(line_start)
+
+            elif kind == "NUMBER":
+                value = found.group()
+                if decode:
+                    value = decode(value)
+                try:
+                    if "E" in value or "e" in value or "." in value:
+                        token = Token(token_type=TOKENS.REAL,
+                                      value=float(value),
+                                      line_number=line_number,
+                                      column=column,
+                                      offset=start,
+                                      end=position)
+                    else:
+                        token = Token(token_type=TOKENS.INTEGER,
+                                      value=int(value),
+                                      line_number=line_number,
+                                      column=column,
+                                      offset=start,
+                                      end=position)
+                except ValueError:
+                    token = Token(token_type=TOKENS.ERROR_TOKEN,
+                                  value="Invalid syntax!",
+                                  line_number=line_number,
+                                  column=column,
+                                  offset=start,
+                                  end=position)
+                yield token
+
+            elif kind in ("COMMENT", "FILE_ATTRIBUTE"):
+                end = self._line_end(position)
+                value = source[position:end]
+                yield Token(token_type=kind,
+                            value=decode(value) if decode else value,
+                            line_number=line_number,
+                            column=column,
+                            offset=start,
+                            end=end)
+                position = end
+
+            elif kind == "STRING":
+                value, position, error = self._read_until(quote, position)
+                yield Token(token_type=TOKENS.STRING,
+                            value=decode(value) if decode else value,
+                            line_number=line_number,
+                            column=column,
+                            offset=start,
+                            end=position)
+                if error is not None:
+                    yield self._unexpected_newline(error, line_number,
+                                                   line_start, wide_line)
+
+            elif kind == "BASED_NUMBER":
+                base = 10
+                if source[position:position + 1] in hexadecimal:
+                    base = 16
+                elif source[position:position + 1] in binary:
+                    base = 2
+                position += 1
+
+                value, position, error = \
+                    self._read_until(apostrophe, position)
+                try:
+                    token = Token(token_type=TOKENS.INTEGER,
+                                  value=int(value, base),
+                                  line_number=line_number,
+                                  column=column,
+                                  offset=start,
+                                  end=position)
+                except ValueError:
+                    token = Token(token_type=TOKENS.ERROR_TOKEN,
+                                  value="Invalid syntax!",
+                                  line_number=line_number,
+                                  column=column,
+                                  offset=start,
+                                  end=position)
+                yield token
+                if error is not None:
+                    yield self._unexpected_newline(error, line_number,
+                                                   line_start, wide_line)
+
+            else:
+                yield Token(token_type=TOKENS.ERROR_TOKEN,
+                            value="Unknown character sequence!",
+                            line_number=line_number,
+                            column=column + 1,
+                            offset=start,
+                            end=position)
+
+        column = position - line_start
+        if wide_line:
+            column = self._column(line_start, position)
+        yield Token(token_type=TOKENS.NEWLINE,
+                    value=newline,
+                    line_number=line_number,
+                    column=column,
+                    offset=position,
+                    end=position)
+        yield Token(token_type=TOKENS.END_OF_FILE,
+                    value=None,
+                    line_number=line_number,
+                    column=column,
+                    offset=position,
+                    end=position)
+
+    def _is_wide_line(self, line_start):
+        """Whether columns of the line differ from its byte offsets."""
+        if not self._wide:
+            return False
+
+        end = self._input.find(b"\n", line_start)
+        if end < 0:
+            end = len(self._input)
+        return self._NON_ASCII.search(self._input, line_start, end) is not None
+
+    def _column(self, line_start, position):
+        return len(self._decode(self._input[line_start:position]))
+
+    def _line_end(self, position):
+        source = self._input
+
+        if self._decode is None:
+            end = source.find(os.linesep, position)
+            return end if end >= 0 else max(len(source), position)
+
+        end = source.find(b"\n", position)
+        if end < 0:
+            return max(len(source), position)
+        if end > position and source[end - 1:end] == b"\r":
+            return end - 1
+        return end
+
+    def _unexpected_newline(self, position, line_number, line_start,
+                            wide_line):
+        column = position - line_start
+        if wide_line:
+            column = self._column(line_start, position)
+
+        return Token(token_type=TOKENS.ERROR_TOKEN,
+                     value="Unexpected newline!",
+                     line_number=line_number,
+                     column=column,
+                     offset=position,
+                     end=position)
+
+    def _read_until(self, terminator, position):
+        """
+        Returns the value up to terminator, the position after it and, if the
+        line ended before the terminator, the position of the line end.
+        """
+        source = self._input
+
+        end = self._line_end(position)
+        found = source.find(terminator, position, end)
+        if found >= 0:
+            return source[position:found], found + 1, None
+
+        return source[position:end], end, end
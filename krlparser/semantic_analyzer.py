@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from .ast import NodeVisitor, FunctionSymbol
-from .symbol_table import SymbolTable
+from .ast import (NodeVisitor, Module, SourceFile, SubmitFile,
+                  FunctionDefinition, FunctionCall, FunctionSymbol,
+                  VariableSymbol, walk)
+from .exceptions import SemanticError
+from .span import unpack_span
+from .symbol_table import SymbolTable, fold_name
+
+
+_EXTENSIONS = {SourceFile: ".src", SubmitFile: ".sub"}
 
 
 class SemanticAnalyzer(NodeVisitor):
@@ -35,8 +42,7 @@ class SemanticAnalyzer(NodeVisitor):
 
         file.symbol_table = self._current_module_table
 
-        for statement in file.statements:
-            self.visit(statement)
+        self.visit(file.statements)
 
     def visit_function_definition(self, definition):
         self._current_module_table.add(
@@ -49,8 +55,22 @@ class SemanticAnalyzer(NodeVisitor):
             SymbolTable(name=smybol_table_name,
                         parent_scope=self._current_module_table)
 
-        for statement in definition.body:
-            self.visit(statement)
+        self._current_function_table = definition.symbol_table
+        self.visit(definition.body)
+        self._current_function_table = None
+
+    def visit_variable_symbol(self, symbol):
+        scope = self._current_function_table or self._current_module_table
+        scope.add(symbol)
+
+    def visit_loop(self, loop):
+        self.visit(loop.body)
+
+    def visit_function_call(self, call):
+        pass
+
+    def visit_assignment(self, assignment):
+        pass
 
     def visit_data_definition(self, definition):
         if (not self._current_module_table or
@@ -61,5 +81,237 @@ class SemanticAnalyzer(NodeVisitor):
 
         definition.symbol_table = self._current_module_table
 
-        for statement in definition.body:
-            self.visit(statement)
+        # Data files declare thousands of variables, which are added at once
+        self._current_module_table.add_many(
+            statement for statement in definition.body
+            if type(statement) is VariableSymbol)
+        self.visit([statement for statement in definition.body
+                    if type(statement) is not VariableSymbol])
+
+
+class ProjectAnalyzer:
+    """
+    Analyses all modules of a project at once.
+
+    After building the symbol tables of every file, all GLOBAL functions and
+    the main functions of modules, which share the module name, are
+    registered in the GLOBAL scope. Then every call site is resolved in a
+    single sweep. The result is a call graph between qualified function
+    names ("Module.Function") and a diagnostic for each call which does not
+    resolve to a function. Names are matched ignoring case, the call graph
+    uses the qualified names as spelled by the definitions.
+
+    Files can be removed and analysed again later. Besides the new files
+    only the calls of names whose GLOBAL definition changed are resolved
+    again, so the cost follows the size of the change.
+    """
+
+    def __init__(self):
+        self._analyzer = SemanticAnalyzer()
+        self._qualified_names = {}
+        self._exports = {}
+        self._duplicates = {}
+        self._definitions = {}
+        self._calls = {}
+        self._callers = {}
+        self._call_diagnostics = {}
+        self._caller_graph = {}
+        self.call_graph = {}
+
+    @property
+    def symbol_table(self):
+        return self._analyzer.symbol_table
+
+    @property
+    def diagnostics(self):
+        return ([error for errors in self._duplicates.values()
+                 for error in errors] +
+                [error for errors in self._call_diagnostics.values()
+                 for error in errors])
+
+    def analyze(self, nodes):
+        nodes = list(nodes)
+        self._analyzer.visit(nodes)
+
+        definitions = [(file, statement)
+                       for node in nodes
+                       for file in _source_files(node)
+                       for statement in file.statements
+                       if isinstance(statement, FunctionDefinition)]
+
+        names = {}
+        for file, definition in definitions:
+            name = self._register(file, definition)
+            if name is not None:
+                names[name] = None
+        changed = [name for name in names if self._update_export(name)]
+
+        for file, definition in definitions:
+            self._resolve_calls(file, definition)
+
+        self._resolve_callers(
+            changed, {definition.symbol_table.name
+                      for _, definition in definitions})
+
+    def callers_of(self, name):
+        """
+        Returns the qualified names of the functions calling the function
+        name, the reverse of call_graph.
+        """
+        return list(self._caller_graph.get(name, ()))
+
+    def remove(self, nodes):
+        """Removes the symbols, calls and diagnostics of nodes."""
+        files = [file for node in nodes for file in _files(node)]
+        removed = {id(file) for file in files}
+
+        tables = {}
+        for file in files:
+            tables[id(file.symbol_table)] = file.symbol_table
+            for statement in file.statements:
+                tables[id(statement.symbol_table)] = statement.symbol_table
+
+        names = {}
+        for file in files:
+            for definition in file.statements:
+                if not isinstance(definition, FunctionDefinition):
+                    continue
+                self._forget_calls(definition.symbol_table.name)
+                name = fold_name(definition.name)
+                if name in self._exports:
+                    names[name] = None
+
+        for name in names:
+            self._exports[name] = [entry for entry in self._exports[name]
+                                   if id(entry[0]) not in removed]
+
+        for table in tables.values():
+            if table is None:
+                continue
+            for symbol in table.symbols():
+                table.remove(symbol.name)
+                self._qualified_names.pop(id(symbol), None)
+
+        changed = [name for name in names if self._update_export(name)]
+        self._resolve_callers(changed)
+
+    def _register(self, file, definition):
+        """
+        Returns the key of the name of definition if it is visible globally.
+        """
+        module_table = definition.symbol_table.parent_scope
+        symbol = module_table.lookup(definition.name, current_scope_only=True)
+        self._qualified_names[id(symbol)] = definition.symbol_table.name
+
+        name = fold_name(definition.name)
+        if not (definition.is_global or name == fold_name(module_table.name)):
+            return None
+
+        self._exports.setdefault(name, []).append((file, definition, symbol))
+        return name
+
+    def _update_export(self, name):
+        """
+        Registers the first definition exporting name in the GLOBAL scope and
+        reports the others. Returns whether the GLOBAL symbol changed.
+        """
+        entries = self._exports.get(name)
+        existing = self.symbol_table.lookup(name, current_scope_only=True)
+        self._duplicates.pop(name, None)
+
+        if not entries:
+            self._exports.pop(name, None)
+            self.symbol_table.remove(name)
+            return existing is not None
+
+        _, _, symbol = entries[0]
+        if existing is not symbol:
+            self.symbol_table.add(symbol)
+
+        for file, definition, duplicate in entries[1:]:
+            if duplicate is not symbol:
+                self._duplicates.setdefault(name, []).append(self._error(
+                    file, definition,
+                    f"Duplicate global definition of "
+                    f"\"{definition.name}\", already defined in "
+                    f"\"{self._qualified_names.get(id(symbol))}\""))
+        return existing is not symbol
+
+    def _resolve_calls(self, file, definition):
+        calls = [node for node in walk(definition.body)
+                 if isinstance(node, FunctionCall)]
+        scope = definition.symbol_table
+        resolved = scope.index.resolve_many(
+            (call.name for call in calls), scope)
+
+        self._forget_calls(scope.name)
+        self._definitions[scope.name] = (file, definition)
+        self._calls[scope.name] = names = set(map(fold_name, resolved))
+        for name in names:
+            self._callers.setdefault(name, set()).add(scope.name)
+
+        callees = {}
+        diagnostics = []
+        for call in calls:
+            symbol = resolved[call.name]
+            if isinstance(symbol, FunctionSymbol):
+                callees[self._qualified_names.get(id(symbol),
+                                                  symbol.name)] = None
+            elif symbol is None:
+                diagnostics.append(self._error(
+                    file, call, f"Unresolved call of \"{call.name}\""))
+            else:
+                diagnostics.append(self._error(
+                    file, call, f"\"{call.name}\" is not a function"))
+
+        self.call_graph[scope.name] = list(callees)
+        for callee in callees:
+            self._caller_graph.setdefault(callee, {})[scope.name] = None
+        if diagnostics:
+            self._call_diagnostics[scope.name] = diagnostics
+
+    def _resolve_callers(self, names, skip=()):
+        scopes = {scope for name in names
+                  for scope in self._callers.get(name, ())
+                  if scope not in skip}
+        for scope in sorted(scopes):
+            self._resolve_calls(*self._definitions[scope])
+
+    def _forget_calls(self, scope):
+        for name in self._calls.pop(scope, ()):
+            callers = self._callers[name]
+            callers.discard(scope)
+            if not callers:
+                del self._callers[name]
+        for callee in self.call_graph.pop(scope, ()):
+            callers = self._caller_graph[callee]
+            del callers[scope]
+            if not callers:
+                del self._caller_graph[callee]
+        self._call_diagnostics.pop(scope, None)
+        self._definitions.pop(scope, None)
+
+    @staticmethod
+    def _error(file, node, message):
+        line_number = column = None
+        if node.span is not None:
+            _, _, line_number, column = unpack_span(node.span)
+
+        return SemanticError(line_number=line_number,
+                             column=column,
+                             message=message,
+                             file_name=file.name + _EXTENSIONS[type(file)])
+
+
+def _files(node):
+    if isinstance(node, Module):
+        return tuple(file for file in (node.source_file, node.data_file)
+                     if file is not None)
+    return (node,)
+
+
+def _source_files(node):
+    """Returns the files of node which define functions."""
+    if isinstance(node, Module):
+        node = node.source_file
+    return (node,) if type(node) in _EXTENSIONS else ()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compact binary format for ASTs.
+
+Layout:
+
+    magic, version, varint byte length of the string blob, string blob,
+    varint number of floats, floats as little endian doubles,
+    varints: number of strings, their lengths, number of spans, their
+    start and line number relative to the span before, length and column,
+    value records
+
+All strings are interned: the blob holds every distinct string once, UTF-8
+encoded, and records refer to them by index. Records are written in
+post-order, children before their parent, and start with a tag, which for
+nodes and strings is their class code, another one for nodes with a span,
+or string index. This lets the decoder rebuild a tree with a value stack
+in one loop, without recursion. Integers are zigzag encoded varints.
+Spans and floats are read in bulk from their own sections and taken in
+order by their nodes and records. Nodes and symbol tables are written
+once and referenced afterwards, so shared ones stay shared.
+"""
+
+import re
+import struct
+from enum import Enum
+from itertools import accumulate
+from operator import add
+
+from .ast import (AST, Module, SourceFile, DataFile, SubmitFile,
+                  FileAttribute, FunctionDefinition, DataDefinition,
+                  Parameter, FunctionCall, Type, VariableSymbol,
+                  FunctionSymbol, Loop, Aggregate, EnumValue, Assignment,
+                  _restore_node)
+from .span import make_span, unpack_span
+from .symbol_table import SymbolTable
+from .token import intern_name
+
+
+MAGIC = b"KRLA"
+VERSION = 4
+
+# Codes are part of the format, only append to these tuples
+NODE_CLASSES = (Module, SourceFile, DataFile, SubmitFile, FileAttribute,
+                FunctionDefinition, DataDefinition, Parameter, FunctionCall,
+                Type, VariableSymbol, FunctionSymbol, Loop, Aggregate,
+                EnumValue, Assignment)
+ENUMS = (Parameter.TYPE,)
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_TUPLE = 5
+_LIST = 6
+_ENUM = 7
+_TABLE = 8
+_TABLE_REFERENCE = 9
+_NODE_REFERENCE = 10
+_FIRST_NODE = 16
+_FIRST_SPANNED_NODE = 40
+_FIRST_STRING = 64
+
+_VARINT = re.compile(rb"[\x80-\xff]*[\x00-\x7f]")
+
+_LONG_VARINT = re.compile(rb"([\x80-\xff]+[\x00-\x7f])")
+
+
+def dumps(value):
+    """Serializes a node, a list of nodes or a plain value to bytes."""
+    return _Encoder().dumps(value)
+
+
+def loads(data):
+    """Deserializes bytes written by dumps."""
+    return _Decoder(data).loads()
+
+
+def _encode_varints(values):
+    data = bytearray()
+    append = data.append
+    for value in values:
+        while value > 0x7F:
+            append(value & 0x7F | 0x80)
+            value >>= 7
+        append(value)
+    return data
+
+
+def _decode_varint(raw):
+    value = 0
+    for shift, byte in enumerate(raw):
+        value |= (byte & 0x7F) << (7 * shift)
+    return value
+
+
+def _decode_varints(data):
+    """
+    Returns the varints in data. Most are a single byte, runs of which are
+    taken as they are.
+    """
+    parts = _LONG_VARINT.split(data)
+    values = list(parts[0])
+    extend = values.extend
+    append = values.append
+    for index in range(1, len(parts), 2):
+        raw = parts[index]
+        append(raw[0] & 0x7F | raw[1] << 7 if len(raw) == 2 else
+               _decode_varint(raw))
+        extend(parts[index + 1])
+    return values
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else (~value << 1) | 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else ~(value >> 1)
+
+
+class _Encoder:
+    def __init__(self):
+        self._strings = {}
+        self._tables = {}
+        self._nodes = {}
+        self._floats = []
+        self._spans = []
+        self._records = []
+        self._node_codes = {cls: _FIRST_NODE + code
+                            for code, cls in enumerate(NODE_CLASSES)}
+        self._enum_codes = {enum: code for code, enum in enumerate(ENUMS)}
+
+    def dumps(self, value):
+        self._write(value)
+
+        strings = list(self._strings)
+        blob = "".join(strings).encode("utf-8", "surrogatepass")
+        header = [len(blob)]
+        lengths = [len(strings)] + [len(string) for string in strings]
+        floats = self._floats
+        spans = self._spans
+
+        return b"".join((MAGIC, bytes((VERSION,)),
+                         _encode_varints(header),
+                         blob,
+                         _encode_varints((len(floats),)),
+                         struct.pack(f"<{len(floats)}d", *floats),
+                         _encode_varints(lengths),
+                         _encode_varints([len(spans) // 4]),
+                         _encode_varints(spans),
+                         _encode_varints(self._records)))
+
+    def _write(self, value):
+        """
+        Writes value in post-order without recursion. The stack holds, for
+        each compound value being written, the value, the iterator over its
+        remaining items, the records following them and its span.
+        """
+        records = self._records
+        strings = self._strings
+        spans = self._spans
+        nodes = self._nodes
+        node_codes = self._node_codes
+        stack = []
+        items = iter((value,))
+        compound = trailer = span = None
+        previous_start = previous_line = 0
+
+        while True:
+            for item in items:
+                cls = type(item)
+                # Strings make up most items, writing them inline saves a
+                # call each
+                if cls is str:
+                    index = strings.get(item)
+                    if index is None:
+                        index = strings[item] = len(strings)
+                    records.append(_FIRST_STRING + index)
+                elif item is None:
+                    records.append(_NONE)
+                elif cls in node_codes:
+                    index = nodes.get(id(item))
+                    if index is not None:
+                        records.append(_NODE_REFERENCE)
+                        records.append(index)
+                        continue
+                    stack.append((compound, items, trailer, span))
+                    compound = item
+                    # Every node starts with its span
+                    items = iter(cls._values(item))
+                    span = next(items)
+                    trailer = (node_codes[cls] if span is None else
+                               node_codes[cls] + _FIRST_SPANNED_NODE -
+                               _FIRST_NODE,)
+                    break
+                elif cls is tuple or cls is list:
+                    stack.append((compound, items, trailer, span))
+                    compound = item
+                    items = iter(item)
+                    trailer = (_TUPLE if cls is tuple else _LIST, len(item))
+                    span = None
+                    break
+                elif isinstance(item, SymbolTable) and \
+                        id(item) not in self._tables:
+                    stack.append((compound, items, trailer, span))
+                    compound = item
+                    symbols = item.symbols()
+                    items = iter((item.parent_scope,) + symbols)
+                    trailer = (_TABLE, None, len(symbols))
+                    span = None
+                    break
+                else:
+                    self._write_value(item)
+            else:
+                if not stack:
+                    return
+                # Nodes and tables are numbered in the order the decoder
+                # completes them, after their items.
+                if type(compound) in node_codes:
+                    nodes[id(compound)] = len(nodes)
+                    if span is not None:
+                        start, end, line_number, column = unpack_span(span)
+                        spans.extend((_zigzag(start - previous_start),
+                                      _zigzag(line_number - previous_line),
+                                      end - start, column))
+                        previous_start = start
+                        previous_line = line_number
+                elif trailer[0] == _TABLE:
+                    self._tables[id(compound)] = len(self._tables)
+                    trailer = (_TABLE, self._string(compound.name),
+                               trailer[2])
+                records.extend(trailer)
+                compound, items, trailer, span = stack.pop()
+
+    def _write_value(self, value):
+        """Writes a value without items."""
+        records = self._records
+        cls = type(value)
+
+        if value is None:
+            records.append(_NONE)
+        elif cls is bool:
+            records.append(_TRUE if value else _FALSE)
+        elif cls is int:
+            records.append(_INT)
+            records.append(_zigzag(value))
+        elif cls is float:
+            records.append(_FLOAT)
+            self._floats.append(value)
+        elif isinstance(value, Enum) and cls in self._enum_codes:
+            records.append(_ENUM)
+            records.append(self._enum_codes[cls])
+            records.append(self._string(value.name))
+        elif isinstance(value, SymbolTable):
+            records.append(_TABLE_REFERENCE)
+            records.append(self._tables[id(value)])
+        else:
+            raise ValueError(f"Unsupported type: {cls.__name__}")
+
+    def _string(self, string):
+        index = self._strings.get(string)
+        if index is None:
+            index = self._strings[string] = len(self._strings)
+        return index
+
+
+class _Decoder:
+    def __init__(self, data):
+        data = bytes(data)
+        if data[:len(MAGIC)] != MAGIC or data[len(MAGIC):len(MAGIC) + 1] \
+                != bytes((VERSION,)):
+            raise ValueError("Invalid AST data!")
+
+        position = len(MAGIC) + 1
+        header = _VARINT.match(data, position)
+        if not header:
+            raise ValueError("Invalid AST data!")
+        blob_start = header.end()
+        blob_end = blob_start + _decode_varint(header.group())
+
+        floats = _VARINT.match(data, blob_end)
+        if not floats:
+            raise ValueError("Invalid AST data!")
+        count = _decode_varint(floats.group())
+        try:
+            self._floats = struct.unpack_from(f"<{count}d", data,
+                                              floats.end())
+        except struct.error as error:
+            raise ValueError("Invalid AST data!") from error
+
+        values = _decode_varints(data[floats.end() + 8 * count:])
+        strings_end = values[0] + 1 if values else 0
+        spans_end = strings_end + 1
+        if len(values) >= spans_end:
+            spans_end += 4 * values[strings_end]
+        if not values or len(values) < spans_end:
+            raise ValueError("Invalid AST data!")
+
+        blob = data[blob_start:blob_end].decode("utf-8", "surrogatepass")
+        self._strings = strings = []
+        start = 0
+        for length in values[1:strings_end]:
+            strings.append(intern_name(blob[start:start + length]))
+            start += length
+
+        fields = values[strings_end + 1:spans_end]
+        starts = list(accumulate(map(_unzigzag, fields[0::4])))
+        lines = accumulate(map(_unzigzag, fields[1::4]))
+        self._spans = list(map(make_span, starts,
+                               map(add, starts, fields[2::4]), lines,
+                               fields[3::4]))
+        self._records = iter(values[spans_end:])
+        self._next = self._records.__next__
+        self._tables = []
+
+    def loads(self):
+        strings = self._strings
+        tables = self._tables
+        read_next = self._next
+        read_span = iter(self._spans).__next__
+        read_float = iter(self._floats).__next__
+        nodes = []
+        add_node = nodes.append
+        stack = []
+        push = stack.append
+        # The most frequent tags as locals
+        first_string, first_spanned_node, first_node = \
+            _FIRST_STRING, _FIRST_SPANNED_NODE, _FIRST_NODE
+        tuple_tag, list_tag = _TUPLE, _LIST
+        none_tag, false_tag, true_tag = _NONE, _FALSE, _TRUE
+
+        try:
+            for tag in self._records:
+                if tag >= first_string:
+                    push(strings[tag - first_string])
+                elif tag >= first_node:
+                    if tag >= first_spanned_node:
+                        cls = NODE_CLASSES[tag - first_spanned_node]
+                        values = (read_span(),)
+                    else:
+                        cls = NODE_CLASSES[tag - first_node]
+                        values = (None,)
+                    start = len(stack) - len(cls._fields) + 1
+                    values += tuple(stack[start:])
+                    del stack[start:]
+                    node = _restore_node(cls, values)
+                    add_node(node)
+                    push(node)
+                elif tag == tuple_tag or tag == list_tag:
+                    count = read_next()
+                    items = stack[len(stack) - count:]
+                    del stack[len(stack) - count:]
+                    push(tuple(items) if tag == tuple_tag else items)
+                elif tag == none_tag:
+                    push(None)
+                elif tag == false_tag:
+                    push(False)
+                elif tag == true_tag:
+                    push(True)
+                elif tag == _INT:
+                    push(_unzigzag(read_next()))
+                elif tag == _FLOAT:
+                    push(read_float())
+                elif tag == _ENUM:
+                    enum = ENUMS[read_next()]
+                    push(enum[strings[read_next()]])
+                elif tag == _TABLE:
+                    push(self._table(stack, strings[read_next()],
+                                     read_next()))
+                elif tag == _NODE_REFERENCE:
+                    push(nodes[read_next()])
+                elif tag == _TABLE_REFERENCE:
+                    push(tables[read_next()])
+                else:
+                    raise ValueError("Invalid AST data!")
+        except (StopIteration, IndexError, KeyError, AttributeError,
+                TypeError) as error:
+            # Corrupt records put values of the wrong kind anywhere
+            raise ValueError("Invalid AST data!") from error
+
+        if len(stack) != 1:
+            raise ValueError("Invalid AST data!")
+        return stack[0]
+
+    def _table(self, stack, name, count):
+        symbols = stack[len(stack) - count:]
+        del stack[len(stack) - count:]
+
+        parent_scope = stack.pop()
+        if parent_scope is not None and \
+                not isinstance(parent_scope, SymbolTable) or \
+                not all(isinstance(symbol, AST) for symbol in symbols):
+            raise ValueError("Invalid AST data!")
+
+        table = SymbolTable(name=name, parent_scope=parent_scope)
+        table.add_many(symbols)
+
+        self._tables.append(table)
+        return table
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Long running project session keeping the parsed files of a directory tree
+in memory.
+
+    python -m krlparser.session ROOT
+
+reads one JSON request per line from stdin and writes one JSON response per
+line to stdout. Every request first picks up the changes on disk. Requests
+are objects with a "command" and its arguments:
+
+    {"command": "refresh"}
+    {"command": "modules"}
+    {"command": "lookup", "name": "Module.Function"}
+    {"command": "calls", "name": "Module.Function"}
+    {"command": "callers", "name": "Module.Function"}
+    {"command": "diagnostics"}
+    {"command": "shutdown"}
+
+Responses are {"ok": true, "result": ...} or {"ok": false, "error": ...}.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from .ast import FunctionSymbol, VariableSymbol
+from .exceptions import ParsingError
+from .project import (SOURCE_EXTENSION, DATA_EXTENSION, SUBMIT_EXTENSION,
+                      group_files, unit_key, read_file, parse_unit)
+from .semantic_analyzer import ProjectAnalyzer
+from .span import unpack_span
+
+
+EXTENSIONS = (SOURCE_EXTENSION, DATA_EXTENSION, SUBMIT_EXTENSION)
+
+
+class _FileState:
+    __slots__ = ("mtime", "size", "digest")
+
+    def __init__(self, mtime, size, digest):
+        self.mtime = mtime
+        self.size = size
+        self.digest = digest
+
+
+class ProjectSession:
+    """
+    Keeps the ASTs and the project analysis of all files below root.
+
+    refresh only reads files whose modification time or size changed and
+    only parses the modules whose content hash changed. Their nodes are
+    replaced in ast and their symbols in the symbol tables, everything else
+    stays in place. The state of the files is only updated once their
+    modules were replaced, so a failed refresh is repeated by the next one.
+    """
+
+    def __init__(self, root, *, encoding=None):
+        self.root = root
+        self.encoding = encoding
+        self.analyzer = ProjectAnalyzer()
+        self.errors = {}
+        self._files = {}
+        self._units = {}
+
+    @property
+    def ast(self):
+        """The nodes of all modules, in the order they were first parsed."""
+        return list(self._units.values())
+
+    @property
+    def symbol_table(self):
+        return self.analyzer.symbol_table
+
+    @property
+    def symbol_index(self):
+        return self.analyzer.symbol_table.index
+
+    def refresh(self):
+        """
+        Applies the changes on disk and returns the changed and removed paths
+        together with the names of the parsed modules.
+        """
+        paths = self._scan()
+        states = {}
+        contents = {}
+        for path in list(paths):
+            try:
+                state, content = self._check_file(path)
+            except FileNotFoundError:
+                # Removed since the scan
+                del paths[path]
+                continue
+            if state is not None:
+                states[path] = state
+            if content is not None:
+                contents[path] = content
+        changed = list(contents)
+
+        keys = {unit_key(path): None for path in changed}
+        keys.update((unit_key(path), None) for path in self._files
+                    if path not in paths)
+        # The other files of changed modules are read up front as well, so
+        # that nothing is replaced unless all of them could be read.
+        for path in list(paths):
+            if unit_key(path) in keys and path not in contents:
+                try:
+                    contents[path] = read_file(path)
+                except FileNotFoundError:
+                    del paths[path]
+        removed = [path for path in self._files if path not in paths]
+
+        units = {unit_key(next(path for path in unit[1:] if path)): unit
+                 for unit in group_files([path for path in paths
+                                          if unit_key(path) in keys])}
+        parsed = self._update_units(keys, units, contents)
+
+        for path in removed:
+            del self._files[path]
+        self._files.update(states)
+        return {"changed": changed, "removed": removed, "parsed": parsed}
+
+    def handle(self, request):
+        """Answers a request of the JSON protocol."""
+        try:
+            command = request["command"]
+            refreshed = self.refresh()
+            if command == "refresh":
+                result = refreshed
+            elif command == "modules":
+                result = [node.name for node in self.ast]
+            elif command == "lookup":
+                result = _describe(self.symbol_index.lookup(request["name"]))
+            elif command == "calls":
+                result = self.analyzer.call_graph.get(request["name"])
+            elif command == "callers":
+                result = self.analyzer.callers_of(request["name"])
+            elif command == "diagnostics":
+                result = [_describe_error(error)
+                          for error in self.analyzer.diagnostics] + \
+                    [_describe_error(error) for error in self.errors.values()]
+            elif command == "shutdown":
+                result = None
+            else:
+                raise ValueError(f"Unknown command: {command}")
+        except (KeyError, TypeError, ValueError, OSError) as error:
+            return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+        return {"ok": True, "result": result}
+
+    def serve(self, requests, responses):
+        """Answers JSON requests line by line until shutdown or EOF."""
+        for line in requests:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                request = None
+                response = {"ok": False, "error": f"Invalid request: {error}"}
+            else:
+                response = self.handle(request)
+
+            responses.write(json.dumps(response) + "\n")
+            responses.flush()
+            if isinstance(request, dict) and \
+                    request.get("command") == "shutdown":
+                break
+
+    def _scan(self):
+        paths = {}
+        for directory, _, file_names in os.walk(self.root):
+            for file_name in sorted(file_names):
+                if os.path.splitext(file_name)[1].lower() in EXTENSIONS:
+                    paths[os.path.join(directory, file_name)] = None
+        return paths
+
+    def _check_file(self, path):
+        """
+        Returns the new state of path, or None if its modification time and
+        size are unchanged, and its content if that changed, else None.
+        """
+        stat = os.stat(path)
+        state = self._files.get(path)
+        if (state is not None and state.mtime == stat.st_mtime_ns and
+                state.size == stat.st_size):
+            return None, None
+
+        content = read_file(path)
+        digest = hashlib.sha256(content).digest()
+
+        new_state = _FileState(stat.st_mtime_ns, stat.st_size, digest)
+        if state is not None and state.digest == digest:
+            return new_state, None
+        return new_state, content
+
+    def _update_units(self, keys, units, contents):
+        old_nodes = [self._units[key] for key in keys
+                     if self._units.get(key) is not None]
+        self.analyzer.remove(old_nodes)
+
+        parsed = []
+        new_nodes = []
+        for key in keys:
+            unit = units.get(key)
+            node = None
+            self.errors.pop(key, None)
+            if unit is not None:
+                try:
+                    node = parse_unit(_contents(unit, contents),
+                                      self.encoding)
+                except ParsingError as error:
+                    self.errors[key] = error
+                else:
+                    parsed.append(unit[0])
+                    new_nodes.append(node)
+            # Replacing the node of a key keeps its place in ast
+            if node is None:
+                self._units.pop(key, None)
+            else:
+                self._units[key] = node
+
+        self.analyzer.analyze(new_nodes)
+        return parsed
+
+
+def _contents(unit, contents):
+    name, *paths = unit
+    return (name,) + tuple(contents.get(path) for path in paths)
+
+
+def _describe(symbol):
+    if symbol is None:
+        return None
+
+    description = {"name": symbol.name}
+    if isinstance(symbol, FunctionSymbol):
+        description["kind"] = "function"
+        description["parameters"] = [parameter.name
+                                     for parameter in symbol.parameters]
+        description["returns"] = (symbol.type.name
+                                  if symbol.type is not None else None)
+    elif isinstance(symbol, VariableSymbol):
+        description["kind"] = "variable"
+        description["type"] = symbol.type
+        description["dimensions"] = list(symbol.dimensions)
+
+    if symbol.span is not None:
+        _, _, line_number, column = unpack_span(symbol.span)
+        description["line_number"] = line_number
+        description["column"] = column
+    return description
+
+
+def _describe_error(error):
+    return {"file_name": error.file_name,
+            "line_number": error.line_number,
+            "column": error.column,
+            "message": error.message}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root")
+    parser.add_argument("--encoding")
+    arguments = parser.parse_args()
+
+    session = ProjectSession(arguments.root, encoding=arguments.encoding)
+    session.serve(sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import codecs
+import mmap
+import os
+from contextlib import contextmanager
+
+
+FALLBACK_ENCODING = "cp1252"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def detect_encoding(data):
+    """
+    Returns "utf-8-sig" for data with a UTF-8 byte order mark, "utf-8" for
+    valid UTF-8 and the usual encoding of KUKA controllers otherwise. The
+    data is validated in chunks, so no decoded copy of it is kept.
+    """
+    if data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+        return "utf-8-sig"
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for start in range(0, len(data), _CHUNK_SIZE):
+            decoder.decode(data[start:start + _CHUNK_SIZE])
+        decoder.decode(b"", True)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+    return "utf-8"
+
+
+@contextmanager
+def open_source(path):
+    """
+    Memory maps the file at path read only. Empty files, which can not be
+    mapped, are returned as empty bytes.
+    """
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            yield b""
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def module_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
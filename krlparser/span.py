@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Source spans of AST nodes.
+
+A span packs the start and end offset of a node in its file together with
+the line number and column of its start into a single int. Offsets index
+the parsed input: characters for str, bytes for bytes and memory mapped
+files. Columns count characters.
+"""
+
+from bisect import bisect_right
+
+from .ast import NodeTransformer, walk
+
+
+_BITS = 40
+_MASK = (1 << _BITS) - 1
+
+_COLUMN_SHIFT = 0
+_LINE_SHIFT = _BITS
+_START_SHIFT = 2 * _BITS
+_END_SHIFT = 3 * _BITS
+
+
+def make_span(start, end, line_number, column):
+    return (end << _END_SHIFT | start << _START_SHIFT |
+            line_number << _LINE_SHIFT | column << _COLUMN_SHIFT)
+
+
+def token_span(first, last):
+    """
+    Returns the span from the first to the last token, or None if the lexer
+    did not locate them.
+    """
+    if first.offset is None or last.end is None:
+        return None
+    return make_span(first.offset, max(first.offset, last.end),
+                     first.line_number, first.column)
+
+
+def unpack_span(span):
+    """Returns start, end, line number and column of span."""
+    return (span >> _START_SHIFT & _MASK,
+            span >> _END_SHIFT,
+            span >> _LINE_SHIFT & _MASK,
+            span >> _COLUMN_SHIFT & _MASK)
+
+
+def span_start(span):
+    return span >> _START_SHIFT & _MASK
+
+
+def span_end(span):
+    return span >> _END_SHIFT
+
+
+def shift_span(span, offset, lines):
+    """Moves span by offset and lines, keeping its column."""
+    return (span + (offset << _END_SHIFT) + (offset << _START_SHIFT) +
+            (lines << _LINE_SHIFT))
+
+
+def shift_spans(nodes, offset, lines):
+    """Moves the spans of nodes and all of their descendants in place."""
+    if not offset and not lines:
+        return
+
+    for node in walk(nodes):
+        if node.span is not None:
+            node.span = shift_span(node.span, offset, lines)
+
+
+class _SpanShifter(NodeTransformer):
+    def __init__(self, offset, lines):
+        self._offset = offset
+        self._lines = lines
+
+    def generic_visit(self, node):
+        if node.span is None:
+            return node
+        return node.replace(
+            span=shift_span(node.span, self._offset, self._lines))
+
+
+def shifted(nodes, offset, lines):
+    """
+    Returns copies of nodes and all of their descendants with moved spans,
+    leaving the nodes themselves untouched.
+    """
+    if not offset and not lines:
+        return nodes
+    return _SpanShifter(offset, lines).transform(nodes)
+
+
+class SpanIndex:
+    """
+    Maps offsets of one file to the innermost node containing them.
+
+    Nodes are kept sorted by start offset together with the position of
+    their closest spanned ancestor, so that a lookup is a binary search
+    followed by a walk up the usually short ancestor chain.
+    """
+
+    def __init__(self, root):
+        self._starts = []
+        self._ends = []
+        self._nodes = []
+        self._parents = []
+
+        # Pre-order keeps parents in front of children starting at the same
+        # offset, so the children win the binary search.
+        ancestors = []
+        for node in walk(root):
+            if node.span is None:
+                continue
+
+            start, end = span_start(node.span), span_end(node.span)
+            while ancestors and not (start >= self._starts[ancestors[-1]] and
+                                     end <= self._ends[ancestors[-1]]):
+                ancestors.pop()
+
+            self._parents.append(ancestors[-1] if ancestors else None)
+            ancestors.append(len(self._nodes))
+            self._starts.append(start)
+            self._ends.append(end)
+            self._nodes.append(node)
+
+        order = sorted(range(len(self._nodes)),
+                       key=self._starts.__getitem__)
+        if order != list(range(len(order))):
+            self._reorder(order)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def node_at(self, offset):
+        """Returns the innermost node containing offset, or None."""
+        index = self._find(offset)
+        return self._nodes[index] if index is not None else None
+
+    def nodes_at(self, offset):
+        """Returns all nodes containing offset, innermost first."""
+        nodes = []
+        index = self._find(offset)
+        while index is not None:
+            nodes.append(self._nodes[index])
+            index = self._parents[index]
+        return nodes
+
+    def _find(self, offset):
+        index = bisect_right(self._starts, offset) - 1
+        if index < 0:
+            return None
+
+        while index is not None and not (
+                self._starts[index] <= offset < self._ends[index]):
+            index = self._parents[index]
+        return index
+
+    def _reorder(self, order):
+        position = {old: new for new, old in enumerate(order)}
+        self._starts = [self._starts[old] for old in order]
+        self._ends = [self._ends[old] for old in order]
+        self._nodes = [self._nodes[old] for old in order]
+        self._parents = [position[self._parents[old]]
+                         if self._parents[old] is not None else None
+                         for old in order]
@@ -2,23 +2,150 @@
 # -*- coding: utf-8 -*-
 
 
+class SymbolIndex:
+    """
+    Flat index over all symbol tables sharing the same root scope.
+
+    Symbols are keyed by their qualified name, the name of the defining
+    scope and the symbol name joined by a dot (e.g. "Foo.Bar" for the
+    function Bar of module Foo), so that they are found without walking the
+    scope chain. The index also maps every plain name to the scopes defining
+    it. It is kept up to date by :meth:`SymbolTable.add` and
+    :meth:`SymbolTable.remove`. Like in KRL, names are compared ignoring
+    case.
+    """
+
+    def __init__(self):
+        self._qualified = {}
+        self._scopes = {}
+
+    def __len__(self):
+        return len(self._qualified)
+
+    def add(self, scope, symbol):
+        self._qualified[fold_name(f"{scope.name}.{symbol.name}")] = symbol
+
+        self._scopes.setdefault(fold_name(symbol.name), {})[id(scope)] = scope
+
+    def add_many(self, scope, symbols):
+        prefix = fold_name(scope.name) + "."
+        names = [fold_name(symbol.name) for symbol in symbols]
+        self._qualified.update(
+            (prefix + name, symbol) for name, symbol in zip(names, symbols))
+
+        scopes = self._scopes
+        key = id(scope)
+        for name in names:
+            defining = scopes.get(name)
+            if defining is None:
+                scopes[name] = {key: scope}
+            else:
+                defining[key] = scope
+
+    def remove(self, scope, symbol):
+        qualified_name = fold_name(f"{scope.name}.{symbol.name}")
+        if self._qualified.get(qualified_name) is symbol:
+            del self._qualified[qualified_name]
+
+        name = fold_name(symbol.name)
+        scopes = self._scopes.get(name)
+        if scopes is not None and scopes.pop(id(scope), None) is not None \
+                and not scopes:
+            del self._scopes[name]
+
+    def lookup(self, qualified_name):
+        return self._qualified.get(fold_name(qualified_name))
+
+    def scopes_defining(self, name):
+        """Returns all scopes defining name, in the order they did so."""
+        return tuple(self._scopes.get(fold_name(name), {}).values())
+
+    def scopes_shadowing(self, name):
+        """Returns the scopes defining name which hide an enclosing one."""
+        defining = self._scopes.get(fold_name(name), {})
+        return tuple(scope for scope in defining.values()
+                     if any(id(parent) in defining
+                            for parent in _enclosing_scopes(scope)))
+
+    def resolve_many(self, names, scope):
+        """
+        Resolves every name as seen from scope, like scope.lookup(name), and
+        returns a dict mapping each name to its symbol or None.
+        """
+        chain = (scope,) + tuple(_enclosing_scopes(scope))
+        resolved = {}
+        for name in names:
+            if name in resolved:
+                continue
+            resolved[name] = None
+            if fold_name(name) not in self._scopes:
+                continue
+            for table in chain:
+                symbol = table.get_local(name)
+                if symbol:
+                    resolved[name] = symbol
+                    break
+        return resolved
+
+
+def fold_name(name):
+    """Returns the key of name, the same for all spellings of it."""
+    return name.lower()
+
+
+def _enclosing_scopes(scope):
+    scope = scope.parent_scope
+    while scope:
+        yield scope
+        scope = scope.parent_scope
+
+
 class SymbolTable:
     def __init__(self, *, name, parent_scope):
         self.name = name
         self.parent_scope = parent_scope
+        self.index = parent_scope.index if parent_scope else SymbolIndex()
         self._symbols = {}
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        return (self.name == other.name and
+                self.parent_scope == other.parent_scope and
+                self._symbols == other._symbols)
 
     def __ne_(self, other):
         return not self == other
 
     def add(self, symbol):
-        self._symbols[symbol.name] = symbol
+        self._symbols[fold_name(symbol.name)] = symbol
+        self.index.add(self, symbol)
+
+    def add_many(self, symbols):
+        """
+        Adds all symbols at once, like add for each of them in order. Used
+        for the thousands of declarations of data files.
+        """
+        symbols = list(symbols)
+        self._symbols.update((fold_name(symbol.name), symbol)
+                             for symbol in symbols)
+        self.index.add_many(self, symbols)
+
+    def remove(self, name):
+        """Removes and returns the symbol name, or None if not defined."""
+        symbol = self._symbols.pop(fold_name(name), None)
+        if symbol is not None:
+            self.index.remove(self, symbol)
+        return symbol
+
+    def get_local(self, name):
+        """Returns the symbol name of this scope only, or None."""
+        return self._symbols.get(fold_name(name))
+
+    def symbols(self):
+        """Returns the symbols of this scope only, in the order added."""
+        return tuple(self._symbols.values())
 
     def lookup(self, name, current_scope_only=False):
-        symbol = self._symbols.get(name)
+        symbol = self._symbols.get(fold_name(name))
 
         if symbol:
             return symbol
@@ -1,13 +1,35 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import sys
+from array import array
+from itertools import product
+
+from .helper import get_public_attributes
+
 
 class Token:
-    def __init__(self, *, token_type, value, line_number, column):
+    """
+    Lexed token. offset and end optionally locate the token in the lexer
+    input, as index of its first element and the one following it; they
+    are not compared.
+    """
+
+    __slots__ = ("token_type", "value", "line_number", "column", "offset",
+                 "end")
+
+    def __init__(self, *, token_type, value, line_number, column,
+                 offset=None, end=None):
         self.token_type = token_type
         self.value = value
         self.line_number = line_number
         self.column = column
+        self.offset = offset
+        self.end = end
+
+    @property
+    def kind(self):
+        return KIND_CODES[self.token_type]
 
     def __repr__(self):
         value = (self.value
@@ -43,6 +65,8 @@ class _Keywords:
     ENDFCT = "ENDFCT"
     ENDDAT = "ENDDAT"
     DECL = "DECL"
+    LOOP = "LOOP"
+    ENDLOOP = "ENDLOOP"
 
     def __setattr__(self, *_):
         raise TypeError("Attribute is readonly!")
@@ -51,6 +75,25 @@ class _Keywords:
 KEYWORDS = _Keywords()
 
 
+# Pool of identifier and type names shared by tokens and nodes, so that
+# repeated names keep a single string.
+intern_name = sys.intern
+
+
+def _spellings(word):
+    return ("".join(letters) for letters in
+            product(*({letter.upper(), letter.lower()} for letter in word)))
+
+
+# Keywords are case insensitive, the table maps every spelling of each
+# keyword to its token type so names need neither upper-casing nor a scan.
+KEYWORD_TYPES = {
+    intern_name(spelling): getattr(KEYWORDS, name)
+    for name in get_public_attributes(KEYWORDS)
+    for spelling in _spellings(getattr(KEYWORDS, name))
+}
+
+
 class _Tokens:
     NAME = "NAME"
     INTEGER = "INTEGER"
@@ -88,3 +131,98 @@ class _Tokens:
 
 
 TOKENS = _Tokens()
+
+
+TOKEN_TYPES = tuple(
+    [getattr(TOKENS, name) for name in get_public_attributes(TOKENS)] +
+    [getattr(KEYWORDS, name) for name in get_public_attributes(KEYWORDS)])
+
+KIND_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+
+class TokenBuffer:
+    """
+    Columnar token store.
+
+    Keeps kind code, value offsets, line number and column of every token
+    in typed arrays. Values which are a plain slice of the source are only
+    sliced when they are requested, all others are stored separately.
+    Tokens have to be appended in the order they were lexed from source.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._kinds = array("B")
+        self._starts = array("I")
+        self._ends = array("I")
+        self._line_numbers = array("I")
+        self._columns = array("I")
+        self._values = {}
+        self._line_starts = [0]
+
+    @classmethod
+    def from_tokens(cls, source, tokens):
+        buffer = cls(source)
+        for token in tokens:
+            buffer.append(token)
+        return buffer
+
+    def append(self, token):
+        index = len(self._kinds)
+        value = token.value
+        start = self._line_starts[token.line_number] + token.column
+        end = start
+
+        if isinstance(value, str) and value:
+            if self.source.startswith(value, start):
+                end = start + len(value)
+            elif self.source.startswith(value, start + 1):
+                start += 1
+                end = start + len(value)
+            else:
+                self._values[index] = value
+        else:
+            self._values[index] = value
+
+        if token.token_type == TOKENS.NEWLINE:
+            self._line_starts.append(start + len(value))
+
+        self._kinds.append(KIND_CODES[token.token_type])
+        self._starts.append(start)
+        self._ends.append(end)
+        self._line_numbers.append(token.line_number)
+        self._columns.append(token.column)
+
+    def kind(self, index):
+        return self._kinds[index]
+
+    def value(self, index):
+        if index < 0:
+            index += len(self)
+
+        if index in self._values:
+            return self._values[index]
+
+        return self.source[self._starts[index]:self._ends[index]]
+
+    @property
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in (
+            self._kinds, self._starts, self._ends,
+            self._line_numbers, self._columns))
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+
+        return Token(token_type=TOKEN_TYPES[self._kinds[index]],
+                     value=self.value(index),
+                     line_number=self._line_numbers[index],
+                     column=self._columns[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
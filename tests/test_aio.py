@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from krlparser import aio
+from krlparser.aio import AsyncParser
+from krlparser.exceptions import ParsingError
+from krlparser.parser import Parser
+
+
+SOURCE_FILE = (
+    "GLOBAL DEF {name}(bar:IN)\n"
+    "DECL INT foo\n"
+    "Bar(foo)\n"
+    "END\n"
+)
+
+DATA_FILE = (
+    "DEFDAT {name}\n"
+    "ENDDAT\n"
+)
+
+
+def parse(name):
+    parser = Parser()
+    parser.add_module(name, SOURCE_FILE.format(name=name),
+                      DATA_FILE.format(name=name))
+    return parser.ast[0]
+
+
+def test_parse_module():
+    async def main():
+        async with AsyncParser() as parser:
+            return await parser.parse_module(
+                "Foo", SOURCE_FILE.format(name="Foo"),
+                DATA_FILE.format(name="Foo"))
+
+    assert asyncio.run(main()) == parse("Foo")
+
+
+def test_parse_errors_are_raised():
+    async def main():
+        async with AsyncParser() as parser:
+            await parser.parse_source_file("Foo", "DEF")
+
+    with pytest.raises(ParsingError):
+        asyncio.run(main())
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_parse_paths(tmp_path, workers):
+    paths = []
+    for name in ("Foo", "Bar"):
+        source_path = tmp_path / f"{name}.src"
+        source_path.write_text(SOURCE_FILE.format(name=name))
+        data_path = tmp_path / f"{name}.dat"
+        data_path.write_text(DATA_FILE.format(name=name))
+        paths.extend((str(source_path), str(data_path)))
+
+    async def main(executor):
+        async with AsyncParser(executor=executor) as parser:
+            return await parser.parse_paths(paths)
+
+    if workers is None:
+        nodes = asyncio.run(main(None))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            nodes = asyncio.run(main(executor))
+    assert [node.name for node in nodes] == ["Foo", "Bar"]
+    assert [node.source_file for node in nodes] == \
+        [parse("Foo").source_file, parse("Bar").source_file]
+
+
+def test_back_pressure(monkeypatch):
+    lock = threading.Lock()
+    running = []
+    highest = []
+
+    def parse_unit(unit, encoding=None):
+        with lock:
+            running.append(unit)
+            highest.append(len(running))
+        threading.Event().wait(0.01)
+        with lock:
+            running.remove(unit)
+        return unit[0]
+
+    monkeypatch.setattr(aio, "parse_unit", parse_unit)
+
+    async def main():
+        async with AsyncParser(max_concurrency=2) as parser:
+            return await asyncio.gather(*(
+                parser.parse_source_file(f"Foo{index}", "")
+                for index in range(8)))
+
+    assert asyncio.run(main()) == [f"Foo{index}" for index in range(8)]
+    assert max(highest) == 2
+
+
+def test_cancellation(monkeypatch):
+    release = threading.Event()
+    parsed = []
+
+    def parse_unit(unit, encoding=None):
+        release.wait(5)
+        parsed.append(unit[0])
+        return unit[0]
+
+    monkeypatch.setattr(aio, "parse_unit", parse_unit)
+
+    async def main():
+        async with AsyncParser(max_concurrency=1) as parser:
+            running = asyncio.ensure_future(
+                parser.parse_source_file("Running", ""))
+            waiting = asyncio.ensure_future(
+                parser.parse_source_file("Waiting", ""))
+            await asyncio.sleep(0.01)
+
+            running.cancel()
+            waiting.cancel()
+            await asyncio.sleep(0.01)
+            release.set()
+
+            with pytest.raises(asyncio.CancelledError):
+                await running
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            return await parser.parse_source_file("Next", "")
+
+    assert asyncio.run(main()) == "Next"
+    assert parsed == ["Running", "Next"]
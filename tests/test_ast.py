@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import copy
+import pickle
+
+import pytest
+
+from krlparser.ast import (NodeVisitor, NodeTransformer, FunctionCall,
+                           FunctionDefinition, DataDefinition, Module,
+                           SourceFile, DataFile, Type, walk)
+from krlparser.parser import Parser
+
+
+SOURCE_FILE = (
+    "DEF Foo(bar:IN)\n"
+    "Bar()\n"
+    "END\n"
+    "DEFFCT INT Bar()\n"
+    "Foo(foo)\n"
+    "ENDFCT"
+)
+
+
+class NameVisitor(NodeVisitor):
+    def visit_function_call(self, call):
+        return call.name
+
+    @staticmethod
+    def visit_type(node):
+        return node.name
+
+
+class UpperNameVisitor(NameVisitor):
+    def visit_function_call(self, call):
+        return call.name.upper()
+
+
+def test_visit_node():
+    assert "Foo" == NameVisitor().visit(FunctionCall(name="Foo"))
+    assert "INT" == NameVisitor().visit(Type(name="INT"))
+
+
+def test_visit_all_nodes():
+    nodes = [FunctionCall(name="Foo"), Type(name="INT"),
+             (FunctionCall(name="Bar"),)]
+    assert ["Foo", "INT", ["Bar"]] == NameVisitor().visit(nodes)
+
+
+def test_dispatch_per_visitor_class():
+    call = FunctionCall(name="Foo")
+    assert "Foo" == NameVisitor().visit(call)
+    assert "FOO" == UpperNameVisitor().visit(call)
+    assert "Foo" == NameVisitor().visit(call)
+    assert "INT" == UpperNameVisitor().visit(Type(name="INT"))
+
+
+def test_no_visitor_found():
+    with pytest.raises(Exception, match="FunctionDefinition"):
+        NameVisitor().visit(FunctionDefinition(name="Foo"))
+
+    with pytest.raises(Exception, match="str"):
+        NameVisitor().visit("Foo")
+
+
+class RenameTransformer(NodeTransformer):
+    def visit_function_call(self, call):
+        if call.name == "Bar":
+            return None
+        return call.replace(name=call.name.upper())
+
+
+def parse_module():
+    parser = Parser()
+    parser.add_module("Foo", SOURCE_FILE, "DEFDAT Foo\nENDDAT")
+    return parser.ast[0]
+
+
+def test_walk():
+    module = parse_module()
+    names = [type(node).__name__ for node in walk(module)]
+
+    assert ["Module", "SourceFile", "FunctionDefinition", "Parameter",
+            "FunctionCall", "FunctionDefinition", "Type", "FunctionCall",
+            "DataFile", "DataDefinition"] == names
+
+
+def test_walk_prune():
+    module = parse_module()
+    nodes = list(walk([module.source_file, module.data_file],
+                      prune=lambda node: isinstance(node,
+                                                    FunctionDefinition)))
+
+    assert [SourceFile, FunctionDefinition, FunctionDefinition, DataFile,
+            DataDefinition] == [type(node) for node in nodes]
+
+
+def test_walk_deep_tree():
+    node = DataDefinition(name="Foo")
+    for _ in range(10000):
+        node = DataDefinition(name="Foo", body=[node])
+
+    assert 10001 == sum(1 for _ in walk(node))
+    assert node is NodeTransformer().transform(node)
+
+
+def test_transformer_rebuilds_changed_spine():
+    module = parse_module()
+    original = parse_module()
+
+    result = RenameTransformer().transform(module)
+
+    assert original == module
+    assert result is not module
+    assert result.data_file is module.data_file
+
+    foo, bar = result.source_file.statements
+    old_foo, old_bar = module.source_file.statements
+    assert () == foo.body
+    assert foo.parameters is old_foo.parameters
+    assert (FunctionCall(name="FOO", parameters=["foo"]),) == bar.body
+    assert bar.returns is old_bar.returns
+
+
+def test_transform_sequence():
+    nodes = [FunctionCall(name="Bar"), FunctionCall(name="Foo"),
+             Module(name="Foo", source_file=None, data_file=None)]
+    result = RenameTransformer().transform(nodes)
+
+    assert [FunctionCall(name="FOO"), nodes[2]] == result
+    assert nodes[2] is result[1]
+
+
+def test_nodes_are_immutable():
+    call = FunctionCall(name="Foo", parameters=["bar"])
+
+    assert ("bar",) == call.parameters
+    with pytest.raises(AttributeError):
+        call.name = "Bar"
+    with pytest.raises(AttributeError):
+        call.foo = "Bar"
+
+    definition = FunctionDefinition(name="Foo")
+    definition.symbol_table = "Foo"
+    assert "Foo" == definition.symbol_table
+
+
+def test_structural_hash():
+    first = parse_module()
+    second = parse_module()
+    second.source_file.symbol_table = "Foo"
+
+    assert hash(first) == hash(second)
+    assert 1 == len({first, second.replace(source_file=first.source_file)})
+    assert FunctionCall(name="Foo") != FunctionCall(name="Bar")
+    assert FunctionCall(name="Foo") != Type(name="Foo")
+    assert 2 == len({FunctionCall(name="Foo"), FunctionCall(name="Bar"),
+                     FunctionCall(name="Foo", parameters=[])})
+
+
+def test_pickle_and_copy():
+    module = parse_module()
+
+    assert module == pickle.loads(pickle.dumps(module))
+    assert hash(module) == hash(pickle.loads(pickle.dumps(module)))
+    assert module == copy.deepcopy(module)
+    assert not hasattr(module, "__dict__")
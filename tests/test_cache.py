@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+from krlparser.cache import AstCache
+from krlparser.lexer import Lexer
+from krlparser.parser import Parser
+from krlparser.project import ProjectParser
+
+
+SOURCE_FILE = (
+    "GLOBAL DEF Foo(bar:IN)\n"
+    "DECL INT foo\n"
+    "Bar(foo)\n"
+    "END"
+)
+
+DATA_FILE = (
+    "DEFDAT Foo\n"
+    "ENDDAT"
+)
+
+
+class CountingLexer(Lexer):
+    instances = 0
+
+    def __init__(self, *, code):
+        super().__init__(code=code)
+        CountingLexer.instances += 1
+
+
+def test_cache_hit_skips_lexer(tmp_path):
+    cache = AstCache(str(tmp_path))
+
+    first = Parser(lexer=CountingLexer, cache=cache)
+    first.add_module("Foo", SOURCE_FILE, DATA_FILE)
+    assert (0, 1) == (cache.hits, cache.misses)
+    lexed = CountingLexer.instances
+
+    second = Parser(lexer=CountingLexer, cache=cache)
+    second.add_module("Foo", SOURCE_FILE, DATA_FILE)
+    assert (1, 1) == (cache.hits, cache.misses)
+    assert lexed == CountingLexer.instances
+
+    assert first.ast == second.ast
+
+
+def test_changed_content_misses(tmp_path):
+    cache = AstCache(str(tmp_path))
+
+    parser = Parser(cache=cache)
+    parser.add_source_file("Foo", SOURCE_FILE)
+    parser.add_source_file("Foo", SOURCE_FILE.replace("foo", "bar"))
+    parser.add_data_file("Foo", DATA_FILE)
+    parser.add_data_file("Foo", DATA_FILE)
+
+    assert (1, 3) == (cache.hits, cache.misses)
+
+
+def test_encoding_is_part_of_the_key(tmp_path):
+    cache = AstCache(str(tmp_path))
+    code = "DEFDAT Foo\nDECL CHAR s[4]\ns[]=\"é\"\nENDDAT\n".encode("utf-8")
+
+    detected = Parser(cache=cache)
+    detected.add_data_file("Foo", code)
+    explicit = Parser(cache=cache, encoding="cp1252")
+    explicit.add_data_file("Foo", code)
+    same = Parser(cache=cache, encoding="utf-8")
+    same.add_data_file("Foo", code)
+
+    assert (1, 2) == (cache.hits, cache.misses)
+    assert "é" == detected.ast[0].statements[0].body[-1].value
+    assert "Ã©" == explicit.ast[0].statements[0].body[-1].value
+    assert same.ast == detected.ast
+
+
+def test_corrupt_entry_is_parsed_again(tmp_path):
+    cache = AstCache(str(tmp_path))
+    parser = Parser(cache=cache)
+    parser.add_source_file("Foo", SOURCE_FILE)
+
+    for entry in tmp_path.iterdir():
+        data = bytearray(entry.read_bytes())
+        data[-1] ^= 0x5A
+        entry.write_bytes(bytes(data))
+
+    parser.add_source_file("Foo", SOURCE_FILE)
+    assert (0, 2) == (cache.hits, cache.misses)
+    assert parser.ast[0] == parser.ast[1]
+
+
+def test_lru_eviction(tmp_path):
+    directory = str(tmp_path)
+
+    cache = AstCache(directory, max_size=1)
+    parser = Parser(cache=cache)
+    parser.add_source_file("Foo", SOURCE_FILE)
+    assert not os.listdir(directory)
+
+    cache = AstCache(directory)
+    parser = Parser(cache=cache)
+    parser.add_source_file("Foo", SOURCE_FILE)
+    parser.add_source_file("Bar", SOURCE_FILE)
+
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    os.utime(paths[0], (0, 0))
+    cache.max_size = sum(os.path.getsize(path) for path in paths)
+
+    parser.add_data_file("Foo", DATA_FILE)
+
+    remaining = os.listdir(directory)
+    assert 2 == len(remaining)
+    assert os.path.basename(paths[0]) not in remaining
+
+
+def test_project_parser_uses_cache(tmp_path):
+    cache_directory = tmp_path / "cache"
+    source_path = tmp_path / "Foo.src"
+    source_path.write_text(SOURCE_FILE)
+    data_path = tmp_path / "Foo.dat"
+    data_path.write_text(DATA_FILE)
+    paths = [str(source_path), str(data_path)]
+
+    cache = AstCache(str(cache_directory))
+    first = ProjectParser(workers=1, cache=cache)
+    first.add_project(paths)
+
+    second = ProjectParser(workers=1, cache=cache)
+    second.add_project(paths)
+
+    assert (1, 1) == (cache.hits, cache.misses)
+    assert first.ast == second.ast
+
+    parser = Parser(cache=cache)
+    parser.add_module("Foo", SOURCE_FILE, DATA_FILE)
+    assert 2 == cache.hits
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tracemalloc
+
+import pytest
+
+from krlparser import data_scanner, parser as parser_module
+from krlparser.ast import walk
+from krlparser.data_scanner import scan_declarations
+from krlparser.exceptions import ParsingError
+from krlparser.lexer import Lexer
+from krlparser.parser import Parser
+from krlparser.regex_lexer import RegexLexer
+
+
+DATA_FILE = (
+    "&ACCESS RVP\n"
+    "DEFDAT Foo PUBLIC\n"
+    ";FOLD Points\n"
+    "DECL E6POS XP1={X 1.0,Y -2.5,Z 3E2,A 0.0,B 90.0,C 0.0,S 6,T 27}\n"
+    "  decl global E6AXIS XA1={A1 1,A2 -90, A3 +90 } ; Axis\n"
+    "DECL FDAT FP1={TOOL_NO 1,IPO_FRAME #BASE,POINT2[] \" \",TQ_STATE FALSE}\n"
+    ";ENDFOLD\n"
+    "DECL INT counter=5\n"
+    "DECL REAL speed\n"
+    "DECL CHAR name[8]\n"
+    "name[]=\"abc\"\n"
+    "DECL FRAME base={FRAME: X 1}\n"
+    "DECL INT table[2,3]\n"
+    "table[1,2]=-7\n"
+    "ENDDAT\n"
+)
+
+TRAILING_BLANKS = (DATA_FILE
+                   .replace("S 6,T 27}", "S 6,T 27} ")
+                   .replace("TQ_STATE FALSE}", "TQ_STATE FALSE}\t")
+                   .replace("counter=5", "counter=5 ; Blanks  ")
+                   .replace("DECL REAL speed", "DECL REAL speed  "))
+
+
+def parse(code, lexer=RegexLexer, **options):
+    parser = Parser(lexer=lexer, **options)
+    parser.add_data_file("Foo", code)
+    return parser
+
+
+def parse_tokens(code, monkeypatch, lexer=RegexLexer, **options):
+    with monkeypatch.context() as patch:
+        patch.setattr(parser_module, "scan_declarations",
+                      lambda code, encoding: (code, {}, []))
+        return parse(code, lexer, **options)
+
+
+def spans(nodes):
+    return [(type(node), node.span) for node in walk(nodes)]
+
+
+@pytest.mark.parametrize("code, lexer", [
+    (DATA_FILE, RegexLexer),
+    (DATA_FILE, Lexer),
+    (DATA_FILE.encode("utf-8"), RegexLexer),
+    (DATA_FILE.replace("\n", "\r\n").encode("cp1252"), RegexLexer),
+    ("DEFDAT Foo ; Ä\nDECL INT foo=1 ; Ä\nENDDAT\n".encode("utf-8"),
+     RegexLexer),
+    (TRAILING_BLANKS, RegexLexer),
+    (TRAILING_BLANKS, Lexer),
+    (TRAILING_BLANKS.replace("\n", "\r\n").encode("cp1252"), RegexLexer)
+])
+def test_scanned_like_parsed(code, lexer, monkeypatch):
+    scanned = parse(code, lexer, recover=True)
+    parsed = parse_tokens(code, monkeypatch, lexer, recover=True)
+
+    assert parsed.ast == scanned.ast
+    assert spans(parsed.ast) == spans(scanned.ast)
+    assert [str(error) for error in parsed.diagnostics] == \
+        [str(error) for error in scanned.diagnostics]
+
+
+def test_scanned_lines():
+    code, declarations, runs = scan_declarations(DATA_FILE)
+
+    assert {2: ["XP1", "XA1", "FP1"], 6: ["counter", "speed"],
+            10: ["base"]} == {line_number: [symbol.name for symbol in symbols]
+                             for line_number, symbols
+                             in declarations.items()}
+    assert [(3, 3, 189), (4, 5, 224), (6, 6, 253)] == runs
+    assert code.splitlines() == [
+        "&ACCESS RVP", "DEFDAT Foo PUBLIC", ";FOLD Points", ";ENDFOLD",
+        "DECL CHAR name[8]", "name[]=\"abc\"", "DECL INT table[2,3]",
+        "table[1,2]=-7", "ENDDAT"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 200])
+def test_bytes_are_scanned_in_chunks(chunk_size, monkeypatch):
+    code = DATA_FILE.replace("\n", "\r\n").encode("cp1252")
+    expected = scan_declarations(code)
+
+    monkeypatch.setattr(data_scanner, "CHUNK_SIZE", chunk_size)
+    scanned, declarations, runs = scan_declarations(code)
+
+    assert (scanned, runs) == (expected[0], expected[2])
+    assert declarations == expected[1]
+    assert [spans(symbols) for symbols in declarations.values()] == \
+        [spans(symbols) for symbols in expected[1].values()]
+
+
+def test_bytes_without_declarations_are_not_copied():
+    code = b"DEFDAT Foo\n" + b"; Comment\n" * (1024 * 1024) + b"ENDDAT\n"
+
+    tracemalloc.start()
+    try:
+        assert scan_declarations(code)[0] is code
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak < len(code) / 2
+
+
+def test_only_ascii_compatible_bytes_are_scanned():
+    code = DATA_FILE.encode("utf-16")
+
+    assert (code, {}, []) == scan_declarations(code)
+    assert (code, {}, []) == scan_declarations(code, encoding="utf-16")
+    assert scan_declarations(DATA_FILE.encode("cp1252"))[1]
+
+
+@pytest.mark.parametrize("line", [
+    "DECL INT LOOP=1",
+    "DECL E6POS foo={X 1.0,IN 2}",
+    "DECL E6POS foo={X 1.0,Y 1_0}",
+    "DECL E6POS foo={X 1.0 Y 2.0}",
+    "DECL FDAT foo={IPO_FRAME #END}",
+])
+def test_irregular_lines_are_left_to_the_parser(line):
+    code = f"DEFDAT Foo\n{line}\nENDDAT\n"
+
+    assert (code, {}, []) == scan_declarations(code)
+
+
+def test_declaration_outside_of_definition(monkeypatch):
+    code = "DEFDAT Foo\nENDDAT\nDECL INT foo=1\n"
+
+    with pytest.raises(ParsingError) as scanned:
+        parse(code)
+    with pytest.raises(ParsingError) as parsed:
+        parse_tokens(code, monkeypatch)
+
+    assert str(parsed.value) == str(scanned.value)
+
+
+def test_errors_are_reported_at_their_place(monkeypatch):
+    code = DATA_FILE.replace("DECL INT table[2,3]", "DECL INT table[2,3")
+
+    scanned = parse(code, recover=True)
+    parsed = parse_tokens(code, monkeypatch, recover=True)
+
+    assert parsed.ast == scanned.ast
+    assert [(12, 18)] == [(error.line_number, error.column)
+                          for error in scanned.diagnostics]
+
+
+def test_bytes_are_lexed_in_the_encoding_of_the_whole_file(monkeypatch):
+    # The only byte which is not UTF-8 is in a scanned line
+    code = (b"DEFDAT Foo\n"
+            b"DECL INT x=1 ;\xe9\n"
+            b"DECL CHAR s[4]\n"
+            b"s[]=\"\xc3\xa9\"\n"
+            b"ENDDAT\n")
+
+    scanned = parse(code).ast
+    parsed = parse_tokens(code, monkeypatch).ast
+
+    assert parsed == scanned
+    assert scanned[0].statements[0].body[-1].value == "Ã©"
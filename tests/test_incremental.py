@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from krlparser.ast import walk
+from krlparser.incremental import IncrementalParser
+from krlparser.parser import Parser
+from krlparser.exceptions import ParsingError
+
+
+SOURCE_FILE = (
+    "&COMMENT Hello\n"
+    "GLOBAL DEF Foo(bar:IN, foobar:OUT)\n"
+    "DECL INT foo\n"
+    "Bar(foo)\n"
+    "END\n"
+    "\n"
+    "DEF Bar(foo:IN)\n"
+    "FooBar()\n"
+    "END\n"
+    "DEFFCT INT FooBar()\n"
+    "ENDFCT"
+)
+
+
+def full_parse(code):
+    parser = Parser()
+    parser.add_source_file("Foo", code)
+    return parser.ast[0]
+
+
+def apply_edit(code, offset, removed_length, inserted_text):
+    return code[:offset] + inserted_text + code[offset + removed_length:]
+
+
+def test_initial_parse_matches_parser():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+    assert [full_parse(SOURCE_FILE)] == parser.ast
+
+
+@pytest.mark.parametrize("old,new", [
+    ("FooBar()", "FooBar(foo)"),
+    ("DECL INT foo\n", ""),
+    ("DECL INT foo\n", "DECL INT foo, bar\nDECL REAL x\n"),
+    ("COMMENT Hello", "COMMENT World"),
+    ("END\n\nDEF Bar", "END\n\nDEF Baz"),
+    ("END\n\n", "END\nDEF New()\nEND\n\n"),
+    ("\nDEF Bar(foo:IN)\nFooBar()\nEND\n", "\n"),
+    ("ENDFCT", "ENDFCT\n"),
+])
+def test_edit_matches_full_parse(old, new):
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+    previous = parser.ast[0]
+
+    offset = SOURCE_FILE.index(old)
+    updated = parser.update_source_file(previous, offset, len(old), new)
+
+    assert full_parse(apply_edit(SOURCE_FILE, offset, len(old), new)) == \
+        updated
+    assert [updated] == parser.ast
+
+
+def test_untouched_definitions_are_reused():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+    previous = parser.ast[0]
+
+    offset = SOURCE_FILE.index("FooBar()")
+    updated = parser.update_source_file(previous, offset, 6, "BarFoo")
+
+    assert updated.statements[0] is previous.statements[0]
+    assert updated.statements[1] is not previous.statements[1]
+    assert updated.statements[2] is previous.statements[2]
+
+
+def test_previous_tree_is_left_untouched():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+    previous = parser.ast[0]
+    spans = [node.span for node in walk(previous)]
+
+    offset = SOURCE_FILE.index("DECL INT foo")
+    updated = parser.update_source_file(previous, offset, 0, "DECL INT x\n")
+
+    code = apply_edit(SOURCE_FILE, offset, 0, "DECL INT x\n")
+    assert spans == [node.span for node in walk(previous)]
+    assert [node.span for node in walk(full_parse(code))] == \
+        [node.span for node in walk(updated)]
+
+
+def test_sequence_of_edits():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+    code = SOURCE_FILE
+
+    for old, new in (("Bar(foo)", "Bar(foo, bar)"),
+                     ("DEF Bar", "DEF Baz"),
+                     ("ENDFCT", "ENDFCT\nDEF Last()\nEND"),
+                     ("DECL INT foo", "DECL INT foo[2]")):
+        offset = code.index(old)
+        parser.update_source_file(parser.ast[0], offset, len(old), new)
+        code = apply_edit(code, offset, len(old), new)
+
+    assert full_parse(code) == parser.ast[0]
+
+
+def test_error_reports_absolute_line():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+    previous = parser.ast[0]
+
+    offset = SOURCE_FILE.index("FooBar()")
+    with pytest.raises(ParsingError) as error:
+        parser.update_source_file(previous, offset, 8, "FooBar(")
+    assert 7 == error.value.line_number
+
+    updated = parser.update_source_file(previous, offset, 0, "")
+    assert full_parse(SOURCE_FILE) == updated
+
+
+def parsing_error(parser, code):
+    with pytest.raises(ParsingError) as error:
+        parser.add_source_file("Foo", code)
+    return (error.value.line_number, error.value.column,
+            error.value.message, error.value.file_name)
+
+
+@pytest.mark.parametrize("code", [
+    "",
+    "&ACCESS RVP\n",
+    "&ACCESS RVP\n\nDECL INT a\nDEF Foo()\nEND\n",
+    "Foo()\nDEF Foo()\nEND\n",
+    "DEF Foo()\nFoo(\nEND\nDEF Bar()\nEND\n",
+    "DEF Foo()\nEND\nDEF Bar(\nEND\n",
+    "DEF Foo()\nEND\nDECL INT a\n",
+])
+def test_errors_match_parser(code):
+    assert parsing_error(Parser(), code) == \
+        parsing_error(IncrementalParser(), code)
+
+
+def test_edit_errors_match_parser():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+
+    offset = SOURCE_FILE.index("DEF Bar")
+    with pytest.raises(ParsingError) as error:
+        parser.update_source_file(parser.ast[0], offset, 3, "DECL INT a\n")
+
+    code = apply_edit(SOURCE_FILE, offset, 3, "DECL INT a\n")
+    assert parsing_error(Parser(), code) == \
+        (error.value.line_number, error.value.column,
+         error.value.message, error.value.file_name)
+
+
+def test_edit_out_of_range():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+
+    with pytest.raises(ValueError):
+        parser.update_source_file(parser.ast[0], len(SOURCE_FILE), 1, "")
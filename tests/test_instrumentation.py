@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import tracemalloc
+
+import pytest
+
+from krlparser.ast import walk
+from krlparser.exceptions import ParsingError
+from krlparser.instrumentation import (Instrumentation, StageRecord, SCAN,
+                                       LEX, PARSE, ANALYZE)
+from krlparser.lexer import Lexer
+from krlparser.parser import Parser
+from krlparser.project import ProjectParser
+
+
+SOURCE_FILE = (
+    "&ACCESS RVP\n"
+    "GLOBAL DEF {name}(bar:IN)\n"
+    "DECL INT foo\n"
+    "Bar(foo)\n"
+    "END\n"
+)
+
+DATA_FILE = (
+    "DEFDAT {name}\n"
+    "ENDDAT\n"
+)
+
+
+def test_records_per_file_and_stage():
+    instrumentation = Instrumentation()
+    parser = Parser(instrumentation=instrumentation)
+    parser.add_module("Foo", SOURCE_FILE.format(name="Foo"),
+                      DATA_FILE.format(name="Foo"))
+    parser.add_source_file("Bar", SOURCE_FILE.format(name="Bar"))
+    parser.add_data_file("Baz", DATA_FILE.format(name="Baz"))
+
+    assert [(record.stage, record.file_name)
+            for record in instrumentation.records] == [
+                (LEX, "Foo.src"), (PARSE, "Foo.src"),
+                (SCAN, "Foo.dat"), (LEX, "Foo.dat"), (PARSE, "Foo.dat"),
+                (LEX, "Bar.src"), (PARSE, "Bar.src"),
+                (SCAN, "Baz.dat"), (LEX, "Baz.dat"), (PARSE, "Baz.dat")]
+
+    source = SOURCE_FILE.format(name="Bar")
+    lex, parse = instrumentation.records[5:7]
+    assert lex.tokens == parse.tokens == len(
+        Lexer(code=source).generate_tokens())
+    assert parse.nodes == sum(1 for _ in walk(parser.ast[1]))
+    assert lex.nodes is None
+    assert all(record.seconds >= 0 and record.peak_memory is None
+               for record in instrumentation.records)
+
+
+def test_data_file_parsed_again_is_recorded_once():
+    code = ("DEFDAT Foo\n"
+            "DECL E6POS XP1={X 1.0,Y 2.0}\n"
+            "DECL INT table[2\n"
+            "ENDDAT\n")
+    instrumentation = Instrumentation()
+    parser = Parser(recover=True, instrumentation=instrumentation)
+    parser.add_data_file("Foo", code)
+
+    scan, lex, parse = instrumentation.records
+    assert [(SCAN, "Foo.dat"), (LEX, "Foo.dat"), (PARSE, "Foo.dat")] == \
+        [(record.stage, record.file_name) for record in (scan, lex, parse)]
+    assert lex.tokens == parse.tokens == len(
+        Lexer(code=code).generate_tokens())
+    assert parse.nodes == sum(1 for _ in walk(parser.ast))
+
+
+def test_instrumentation_does_not_change_the_ast():
+    code = SOURCE_FILE.format(name="Foo")
+    plain = Parser()
+    instrumented = Parser(instrumentation=Instrumentation())
+    plain.add_source_file("Foo", code)
+    instrumented.add_source_file("Foo", code)
+
+    assert plain.ast == instrumented.ast
+
+
+def test_summary():
+    instrumentation = Instrumentation(memory=True)
+    parser = Parser(instrumentation=instrumentation)
+    for name in ("Foo", "Bar"):
+        parser.add_source_file(name, SOURCE_FILE.format(name=name))
+
+    summary = instrumentation.summary()
+    lex_records = [record for record in instrumentation.records
+                   if record.stage == LEX]
+
+    assert set(summary) == {LEX, PARSE}
+    assert summary[LEX].file_name is None
+    assert summary[LEX].tokens == sum(record.tokens
+                                      for record in lex_records)
+    assert summary[LEX].seconds == pytest.approx(
+        sum(record.seconds for record in lex_records))
+    assert summary[PARSE].peak_memory == max(
+        record.peak_memory for record in instrumentation.records
+        if record.stage == PARSE)
+    assert summary[PARSE].peak_memory > 0
+
+
+def test_stage_context_manager():
+    received = []
+
+    class Observer(Instrumentation):
+        def on_record(self, record):
+            received.append(record)
+
+    observer = Observer()
+    with observer.stage(ANALYZE, nodes=3):
+        pass
+
+    assert not observer.records
+    assert received == [StageRecord(stage=ANALYZE, file_name=None,
+                                    seconds=received[0].seconds, nodes=3)]
+    assert received[0].as_dict() == {
+        "stage": ANALYZE, "file_name": None,
+        "seconds": received[0].seconds, "tokens": None, "nodes": 3,
+        "peak_memory": None}
+
+
+def test_tracing_stops_on_errors():
+    instrumentation = Instrumentation(memory=True)
+    parser = Parser(instrumentation=instrumentation)
+
+    with pytest.raises(ParsingError):
+        parser.add_source_file("Foo", "DEF Foo(\nEND\n")
+    with pytest.raises(KeyError):
+        with instrumentation.stage(ANALYZE):
+            raise KeyError("foo")
+
+    assert not tracemalloc.is_tracing()
+    assert [LEX] == [record.stage for record in instrumentation.records]
+
+
+def test_nested_timers_keep_their_peak():
+    instrumentation = Instrumentation(memory=True)
+
+    with instrumentation.stage("outer"):
+        data = bytearray(4 * 1024 * 1024)
+        del data
+        with instrumentation.stage("inner"):
+            pass
+
+    inner, outer = instrumentation.records
+    assert inner.peak_memory < 1024 * 1024
+    assert outer.peak_memory >= 4 * 1024 * 1024
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_project_parser(tmp_path, workers):
+    paths = []
+    for name in ("Foo", "Bar"):
+        path = tmp_path / f"{name}.src"
+        path.write_text(SOURCE_FILE.format(name=name))
+        paths.append(str(path))
+    path = tmp_path / "Foo.dat"
+    path.write_text(DATA_FILE.format(name="Foo"))
+    paths.append(str(path))
+
+    instrumentation = Instrumentation()
+    project = ProjectParser(workers=workers,
+                            instrumentation=instrumentation)
+    project.add_project(paths)
+
+    assert sorted((record.stage, record.file_name)
+                  for record in instrumentation.records) == [
+                      (ANALYZE, None),
+                      (LEX, "Bar.src"), (LEX, "Foo.dat"), (LEX, "Foo.src"),
+                      (PARSE, "Bar.src"), (PARSE, "Foo.dat"),
+                      (PARSE, "Foo.src"), (SCAN, "Foo.dat")]
+    assert instrumentation.records[-1].nodes == sum(
+        1 for _ in walk(project.ast))
@@ -4,7 +4,7 @@
 import os
 import pytest
 
-from krlparser.lexer import Lexer
+from krlparser.lexer import Lexer, SlicingLexer
 from krlparser.token import Token, TOKENS
 
 
@@ -27,6 +27,13 @@ def test_unknown_input():
             == tokens[1])
 
 
+def test_iter_tokens():
+    code = "DEF Foo()\nBar(foo)\nEND"
+    tokens = Lexer(code=code).iter_tokens()
+    assert not isinstance(tokens, list)
+    assert Lexer(code=code).generate_tokens() == list(tokens)
+
+
 def test_peek_at_eol():
     lexer = Lexer(code="foo =")
     tokens = lexer.generate_tokens()
@@ -410,3 +417,37 @@ def test_structure_declaration():
                   line_number=0,
                   column=12)
             == tokens[4])
+
+
+@pytest.mark.parametrize("code", [
+    "",
+    ";Test",
+    ";",
+    "foo ;Test\nbar",
+    "&ACCESS RVP\n&REL 1\n",
+    "&",
+    "\"Hello, World!\"",
+    "\"Hello, World!",
+    "\"Hello, World!\nfoo",
+    "\"\" \"\"",
+    "\"",
+    "'H1F'",
+    "'B1010' 'B12'",
+    "'H1F",
+    "'H",
+    "'",
+    "12345 1.1 1E3 1.3E-3 1.",
+    "1-2 1.2.3 1E",
+    "global def end $foo_1 _bar",
+    "foo[bar] = {X 1.0, Y -2.5E3} + \"baz\"",
+    "foo  \nbar",
+    ";" + "x" * 10000 + "\nfoo",
+    "\"" + "x" * 10000 + "\" bar",
+    "x" * 10000 + " = 1",
+])
+def test_slicing_lexer(code):
+    def tokens(lexer):
+        return [(token, token.offset, token.end)
+                for token in lexer(code=code).generate_tokens()]
+
+    assert tokens(Lexer) == tokens(SlicingLexer)
@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import pickle
+
 import pytest
 
+from krlparser.lexer import Lexer
+from krlparser.regex_lexer import RegexLexer
 from krlparser.parser import Parser
-from krlparser.ast import (Module, SourceFile, DataFile, FileAttribute,
-                           FunctionDefinition, DataDefinition, Parameter, Type,
-                           FunctionCall, VariableSymbol)
+from krlparser.ast import (Module, SourceFile, DataFile, SubmitFile,
+                           FileAttribute, FunctionDefinition, DataDefinition,
+                           Parameter, Type, FunctionCall, VariableSymbol, Loop,
+                           Aggregate, EnumValue, Assignment)
 from krlparser.exceptions import ParsingError
 
 
@@ -93,8 +98,136 @@ def test_data_parsing():
     assert awaited_ast == parser.ast
 
 
+def test_data_declarations():
+    data_file = (
+        "DEFDAT Foo PUBLIC\n"
+        "DECL E6POS XP1={X 1.0, Y -2.5, Z 3E2, S 6, T 27} ; Point\n"
+        "DECL GLOBAL FDAT FP1={E6POS: BASE_NO 1,IPO_FRAME #BASE,"
+        "POINT2[] \" \",TQ_STATE FALSE}\n"
+        "DECL INT counter=-5, limit=+7\n"
+        "BOOL flag=TRUE\n"
+        "DECL CHAR name[8]\n"
+        "name[]=\"abc\"\n"
+        "DECL E6POS points[2]\n"
+        "points[1]={}\n"
+        "ENDDAT\n"
+    )
+
+    awaited_ast = [DataFile(name="Foo", statements=[DataDefinition(
+        name="Foo", is_public=True, body=[
+            VariableSymbol(name="XP1", symbol_type="E6POS",
+                           value=Aggregate(names=["X", "Y", "Z", "S", "T"],
+                                           values=[1.0, -2.5, 300.0, 6, 27])),
+            VariableSymbol(name="FP1", symbol_type="FDAT", is_global=True,
+                           value=Aggregate(
+                               type_name="E6POS",
+                               names=["BASE_NO", "IPO_FRAME", "POINT2",
+                                      "TQ_STATE"],
+                               values=[1, EnumValue(name="BASE"), " ",
+                                       False])),
+            VariableSymbol(name="counter", symbol_type="INT", value=-5),
+            VariableSymbol(name="limit", symbol_type="INT", value=7),
+            VariableSymbol(name="flag", symbol_type="BOOL", value=True),
+            VariableSymbol(name="name", symbol_type="CHAR", dimensions=[8]),
+            Assignment(name="name", indices=[], value="abc"),
+            VariableSymbol(name="points", symbol_type="E6POS",
+                           dimensions=[2]),
+            Assignment(name="points", indices=[1], value=Aggregate())])])]
+
+    for lexer in (Lexer, RegexLexer):
+        parser = Parser(lexer=lexer)
+        parser.add_data_file("Foo", data_file)
+
+        assert awaited_ast == parser.ast
+        assert {"X": 1.0, "Y": -2.5, "Z": 300.0, "S": 6, "T": 27} == \
+            parser.ast[0].statements[0].body[0].value.fields
+
+
+@pytest.mark.parametrize("line, column", [
+    ("DECL INT foo=", 13),
+    ("DECL E6POS foo={X 1.0 Y 2.0}", 22),
+    ("DECL E6POS foo={X 1.0,}", 22),
+    ("DECL INT foo=bar", 13),
+    ("foo[1=2", 5),
+])
+def test_data_declaration_errors(line, column):
+    parser = Parser()
+    with pytest.raises(ParsingError) as error:
+        parser.add_data_file("Foo", f"DEFDAT Foo\n{line}\nENDDAT\n")
+
+    assert (1, column) == (error.value.line_number, error.value.column)
+
+
 def test_sub_parsing():
-    pass
+    submit_file = (
+        "&ACCESS RVP\n"
+        "DEF SPS()\n"
+        "DECL INT counter\n"
+        ";FOLD INI\n"
+        "Init()\n"
+        ";ENDFOLD\n"
+        "LOOP\n"
+        ";FOLD USER PLC\n"
+        "Watch(counter)\n"
+        "loop ; nested\n"
+        "Check()\n"
+        "EndLoop\n"
+        ";ENDFOLD\n"
+        "ENDLOOP\n"
+        "END\n"
+        "DEF Init()\n"
+        "END"
+    )
+
+    awaited_ast = [
+        SubmitFile(name="SPS",
+                   file_attributes=[FileAttribute(value="ACCESS RVP")],
+                   statements=[
+                       FunctionDefinition(name="SPS", body=[
+                           VariableSymbol(name="counter", symbol_type="INT"),
+                           FunctionCall(name="Init"),
+                           Loop(body=[
+                               FunctionCall(name="Watch",
+                                            parameters=["counter"]),
+                               Loop(body=[FunctionCall(name="Check")])])]),
+                       FunctionDefinition(name="Init")])]
+
+    parser = Parser()
+    parser.add_submit_file("SPS", submit_file)
+
+    assert awaited_ast == parser.ast
+
+
+def test_sub_parsing_errors():
+    parser = Parser(recover=True)
+    parser.add_submit_file("SPS", (
+        "DEF SPS()\n"
+        "LOOP\n"
+        "Foo(\n"
+        "Bar()\n"
+        "END"
+    ))
+
+    assert [SubmitFile(name="SPS", statements=[
+        FunctionDefinition(name="SPS", body=[
+            Loop(body=[FunctionCall(name="Bar")])])])] == parser.ast
+    assert [(2, "SPS.sub"), (4, "SPS.sub")] == \
+        [(error.line_number, error.file_name)
+         for error in parser.diagnostics]
+
+    with pytest.raises(ParsingError):
+        Parser().add_submit_file("SPS", "DEF SPS()\nENDLOOP\nEND")
+
+
+def test_sub_stray_endloop():
+    parser = Parser(recover=True)
+    parser.add_submit_file("SPS", "DEF SPS()\nENDLOOP\nFoo()\nEND")
+
+    assert [SubmitFile(name="SPS", statements=[
+        FunctionDefinition(name="SPS", body=[
+            FunctionCall(name="Foo")])])] == parser.ast
+    assert [(1, "Unexpected \"ENDLOOP\"")] == \
+        [(error.line_number, error.message) for error in parser.diagnostics]
 
 
 def test_mod_call():
@@ -370,3 +503,136 @@ def test_declarations_and_statements():
     parser.add_source_file("Foo", source_file)
 
     assert awaited_ast == parser.ast
+
+
+def test_tokens_are_streamed():
+    consumed = []
+
+    class RecordingLexer(Lexer):
+        def iter_tokens(self):
+            for token in super().iter_tokens():
+                consumed.append(token)
+                yield token
+
+    source_file = (
+        "DEF Foo(\n" +
+        "FooBar()\n" * 100 +
+        "END"
+    )
+
+    parser = Parser(lexer=RecordingLexer)
+    with pytest.raises(ParsingError):
+        parser.add_source_file("Foo", source_file)
+
+    assert len(consumed) < 10
+
+
+def test_recover_collects_all_errors():
+    source_file = (
+        "DEF Foo(\n"
+        "END\n"
+        "DEF Bar()\n"
+        "DECL INT bar[1, 2, 3, 4]\n"
+        "DECL INT foo\n"
+        "FooBar(foo\n"
+        "FooBar(foo)\n"
+        "END\n"
+        "~\n"
+        "DEF FooBar()\n"
+        "END"
+    )
+
+    parser = Parser(recover=True)
+    parser.add_source_file("Foo", source_file)
+
+    assert [
+        SourceFile(name="Foo", statements=[
+            FunctionDefinition(name="Bar", body=[
+                VariableSymbol(name="foo", symbol_type="INT"),
+                FunctionCall(name="FooBar", parameters=["foo"])]),
+            FunctionDefinition(name="FooBar")])] == parser.ast
+
+    assert [0, 3, 5, 8] == [error.line_number
+                            for error in parser.diagnostics]
+    assert all(error.file_name == "Foo.src" for error in parser.diagnostics)
+
+
+def test_recover_collects_lexer_errors():
+    source_file = (
+        "DEF Foo()\n"
+        "Bar(~foo)\n"
+        "\"Hello\n"
+        "END"
+    )
+
+    parser = Parser(recover=True)
+    parser.add_source_file("Foo", source_file)
+
+    assert [
+        SourceFile(name="Foo", statements=[
+            FunctionDefinition(name="Foo", body=[
+                FunctionCall(name="Bar", parameters=["foo"])])])] == parser.ast
+    assert [(1, 5), (2, 0), (2, 6)] == [
+        (error.line_number, error.column) for error in parser.diagnostics]
+
+
+@pytest.mark.parametrize("add, code, position", [
+    ("add_source_file", "DEF Foo()\nBar(1-2)\nEND\n", (1, 4)),
+    ("add_source_file", "DEF Foo()\nDECL INT a[1.2.3]\nEND\n", (1, 11)),
+    ("add_data_file", "DEFDAT Foo\nDECL INT x=1-2\nENDDAT\n", (1, 11)),
+])
+def test_recover_invalid_numbers(add, code, position):
+    parser = Parser(recover=True)
+    getattr(parser, add)("Foo", code)
+
+    assert position == (parser.diagnostics[0].line_number,
+                        parser.diagnostics[0].column)
+    assert "Invalid syntax!" == parser.diagnostics[0].message
+
+    with pytest.raises(ParsingError):
+        getattr(Parser(), add)("Foo", code)
+
+
+def test_recover_keeps_definition_before_error():
+    parser = Parser(recover=True)
+    parser.add_source_file("Foo", "DEF Foo()\nEND\nDEFFCT INT Bar(\nENDFCT\n")
+
+    assert [SourceFile(name="Foo", statements=[
+        FunctionDefinition(name="Foo")])] == parser.ast
+    assert [2] == [error.line_number for error in parser.diagnostics]
+
+
+def test_recover_data_file():
+    data_file = (
+        "DEFDAT Foo PUBLIC foo\n"
+        "ENDDAT\n"
+        "DEFDAT Bar\n"
+        "ENDDAT\n"
+    )
+
+    parser = Parser(recover=True)
+    parser.add_data_file("Foo", data_file)
+
+    assert [DataFile(name="Foo",
+                     statements=[DataDefinition(name="Bar")])] == parser.ast
+    assert 1 == len(parser.diagnostics)
+
+
+def test_recover_without_definition():
+    parser = Parser(recover=True)
+    parser.add_source_file("Foo", "&COMMENT Hello\n")
+
+    assert [SourceFile(name="Foo",
+                       file_attributes=[FileAttribute(value="COMMENT Hello")],
+                       statements=[])] == parser.ast
+    assert "No module or function definition found" == \
+        parser.diagnostics[0].message
+
+
+def test_parsing_error_is_picklable():
+    error = ParsingError(line_number=1, column=2, message="Foo",
+                         file_name="Foo.src")
+    copy = pickle.loads(pickle.dumps(error))
+
+    assert ((1, 2, "Foo", "Foo.src") ==
+            (copy.line_number, copy.column, copy.message, copy.file_name))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+
+import pytest
+
+from krlparser.parser import Parser
+from krlparser.points import (POINT_TYPES, export_points, load_points,
+                              nodes_to_points)
+
+numpy = pytest.importorskip("numpy")
+
+
+MAIN = (
+    "&ACCESS RVP\n"
+    "DEFDAT Main PUBLIC\n"
+    "DECL E6POS XP1={X 1.0,Y -2.5,Z 3E2,A 0.0,B 90.0,C 0.0,S 6,T 27,"
+    "E1 0.5}\n"
+    "decl global e6axis XA1={A1 1,A2 -90, A3 +90 } ; Axis\n"
+    "DECL FDAT FP1={TOOL_NO 1,BASE_NO 2}\n"
+    "DECL INT counter=5\n"
+    "DECL FRAME base={x 10,y 20}\n"
+    "DECL E6POS XP2={X 1.0,Y 1.0.0}\n"
+    "ENDDAT\n"
+)
+
+CELL = (
+    "DEFDAT Cell\n"
+    "DECL E6POS Home_Position={X 4,Y 5,Z 6}\n"
+    "ENDDAT\n"
+)
+
+
+@pytest.fixture(name="paths")
+def fixture_paths(tmp_path):
+    main = tmp_path / "Main.dat"
+    main.write_text(MAIN)
+    empty = tmp_path / "Empty.dat"
+    empty.write_text("")
+    cell = tmp_path / "Cell.dat"
+    cell.write_bytes(CELL.replace("\n", "\r\n").encode("cp1252"))
+    return [str(main), str(empty), str(cell)]
+
+
+def rows(points):
+    columns = ("X", "Y", "Z", "S", "A1", "A2", "A3", "E1")
+    return [(points.files[points["file"][index]], str(points["name"][index]),
+             POINT_TYPES[points["type"][index]],
+             tuple(None if math.isnan(points[column][index])
+                   else float(points[column][index]) for column in columns))
+            for index in range(len(points))]
+
+
+EXPECTED = [
+    ("Main", "XP1", "E6POS",
+     (1.0, -2.5, 300.0, 6.0, None, None, None, 0.5)),
+    ("Main", "XA1", "E6AXIS",
+     (None, None, None, None, 1.0, -90.0, 90.0, None)),
+    ("Main", "base", "FRAME",
+     (10.0, 20.0, None, None, None, None, None, None)),
+    ("Cell", "Home_Position", "E6POS",
+     (4.0, 5.0, 6.0, None, None, None, None, None)),
+]
+
+
+def with_paths(expected, paths):
+    files = {"Main": paths[0], "Cell": paths[2]}
+    return [(files[point[0]],) + point[1:] for point in expected]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 65536])
+def test_export_points(paths, chunk_size):
+    points = export_points(paths, chunk_size=chunk_size)
+
+    assert points.files == paths
+    assert len(points) == 4
+    assert points["name"].dtype == numpy.dtype("<U13")
+    assert rows(points) == with_paths(EXPECTED, paths)
+
+
+def test_memory_mapped_export(paths, tmp_path):
+    directory = tmp_path / "points"
+    exported = export_points(paths, str(directory))
+    loaded = load_points(str(directory))
+
+    assert isinstance(exported["X"], numpy.memmap)
+    assert (directory / "X.npy").exists()
+    assert loaded.files == paths
+    assert rows(loaded) == rows(exported)
+
+
+def test_nothing_to_export(tmp_path):
+    path = tmp_path / "Empty.dat"
+    path.write_text("DEFDAT Empty\nENDDAT\n")
+
+    points = export_points([str(path)], str(tmp_path / "points"))
+
+    assert len(points) == 0
+    assert len(load_points(str(tmp_path / "points"))) == 0
+
+
+def test_nodes_to_points():
+    parser = Parser()
+    parser.add_data_file("Main", MAIN.replace(
+        "DECL E6POS XP2={X 1.0,Y 1.0.0}\n", ""))
+    parser.add_data_file("Cell", CELL)
+
+    assert rows(nodes_to_points(parser.ast)) == EXPECTED
+    definition = parser.ast[1].statements[0]
+    assert [("Cell",) + EXPECTED[-1][1:]] == \
+        rows(nodes_to_points([definition]))
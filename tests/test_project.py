@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from krlparser.project import ProjectParser, group_files
+from krlparser.ast import Module, SourceFile, DataFile, SubmitFile
+
+
+SOURCE_FILE = (
+    "GLOBAL DEF {name}(bar:IN)\n"
+    "DECL INT foo\n"
+    "Bar(foo)\n"
+    "END\n"
+)
+
+DATA_FILE = (
+    "DEFDAT {name}\n"
+    "ENDDAT\n"
+)
+
+
+@pytest.fixture(name="project")
+def fixture_project(tmp_path):
+    paths = []
+    for index in range(4):
+        name = f"Module{index}"
+        source_path = tmp_path / f"{name}.src"
+        source_path.write_text(SOURCE_FILE.format(name=name))
+        paths.append(str(source_path))
+
+        if index % 2:
+            data_path = tmp_path / f"{name}.dat"
+            data_path.write_text(DATA_FILE.format(name=name))
+            paths.append(str(data_path))
+
+    data_path = tmp_path / "Config.dat"
+    data_path.write_text(DATA_FILE.format(name="Config"))
+    paths.append(str(data_path))
+
+    return paths
+
+
+def test_group_files():
+    units = group_files(["R1/Foo.src", "R1/Bar.dat", "R1/foo.DAT",
+                         "R2/Foo.src", "R1/Foo.sub"])
+    assert [("Foo", "R1/Foo.src", "R1/foo.DAT", None),
+            ("Bar", None, "R1/Bar.dat", None),
+            ("Foo", "R2/Foo.src", None, None),
+            ("Foo", None, None, "R1/Foo.sub")] == units
+
+
+def test_unsupported_file_type():
+    with pytest.raises(ValueError):
+        group_files(["Foo.txt"])
+
+
+def test_project_parsing(project):
+    parser = ProjectParser(workers=1)
+    parser.add_project(project)
+
+    assert [SourceFile, Module, SourceFile, Module, DataFile] == \
+        [type(node) for node in parser.ast]
+    assert parser.symbol_table.name == "GLOBAL"
+    assert parser.ast[1].source_file.symbol_table.lookup("Module1")
+
+
+def test_parallel_equals_serial(project):
+    serial = ProjectParser(workers=1)
+    serial.add_project(project)
+
+    parallel = ProjectParser(workers=2)
+    parallel.add_project(project)
+
+    assert serial.ast == parallel.ast
+
+
+def test_project_call_graph(project):
+    parser = ProjectParser(workers=1)
+    parser.add_project(project)
+
+    assert ["Module0.Module0", "Module1.Module1", "Module2.Module2",
+            "Module3.Module3"] == list(parser.analyzer.call_graph)
+    assert 4 == len(parser.analyzer.diagnostics)
+    assert "Unresolved call of \"Bar\"" == \
+        parser.analyzer.diagnostics[0].message
+
+
+def test_project_with_submit_file(project, tmp_path):
+    submit_path = tmp_path / "SPS.sub"
+    submit_path.write_text("DEF SPS()\nLOOP\nModule1(foo)\nENDLOOP\nEND\n")
+
+    parser = ProjectParser(workers=1)
+    parser.add_project(project + [str(submit_path)])
+
+    assert isinstance(parser.ast[-1], SubmitFile)
+    assert ["Module1.Module1"] == parser.analyzer.call_graph["SPS.SPS"]
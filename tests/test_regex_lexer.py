@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from krlparser.lexer import Lexer
+from krlparser.regex_lexer import RegexLexer
+from krlparser.parser import Parser
+from krlparser.token import TOKENS
+
+
+CODES = [
+    "",
+    "~foo",
+    "foo =",
+    ";Test",
+    "\"Hello, World!\"",
+    "\"Hello, World!",
+    "\"Hello, World!\nfoo",
+    "&Test",
+    "global def end",
+    "   IDdTest   ",
+    "\tIDdTest\t",
+    "'H1F",
+    "'H1FJ",
+    "'B1010'",
+    "'",
+    "12345",
+    "1.1 1E3 1.3E3 1.3E-3",
+    "1-2 1.2.3 1E",
+    "foo.bar",
+    "Test(foo, bar)",
+    "foo + - * / : = == <> > < >= <= bar",
+    "foo[bar] foo[1]",
+    "foo = #bar",
+    "foo = { bar }",
+    "foo  \nbar",
+    "DEF Foo()\n;comment\nDECL INT bar[1, 2]\nFooBar(bar)\nEND\n"
+]
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_same_tokens_as_lexer(code):
+    expected = Lexer(code=code).generate_tokens()
+    assert expected == RegexLexer(code=code).generate_tokens()
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_same_offsets_as_lexer(code):
+    def offsets(lexer):
+        return [(token.offset, token.end)
+                for token in lexer(code=code).generate_tokens()
+                if token.token_type != TOKENS.ERROR_TOKEN]
+
+    assert offsets(Lexer) == offsets(RegexLexer)
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_bytes_input(code):
+    expected = Lexer(code=code).generate_tokens()
+    assert expected == RegexLexer(code=code.encode("ascii")).generate_tokens()
+
+    # Whitespace before a line end swallows it, including any carriage return
+    if " \n" not in code:
+        assert expected == RegexLexer(
+            code=code.replace("\n", "\r\n").encode("ascii")).generate_tokens()
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        RegexLexer(code=None)
+
+    with pytest.raises(ValueError):
+        RegexLexer(code=0)
+
+
+def test_parser_with_regex_lexer():
+    source_file = (
+        "GLOBAL DEF Foo(bar:IN, foobar:OUT)\n"
+        "DECL INT foo\n"
+        "Bar(foo)\n"
+        "END"
+    )
+
+    expected = Parser()
+    expected.add_source_file("Foo", source_file)
+
+    parser = Parser(lexer=RegexLexer)
+    parser.add_source_file("Foo", source_file)
+
+    assert expected.ast == parser.ast
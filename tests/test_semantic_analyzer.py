@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from krlparser.semantic_analyzer import SemanticAnalyzer
+from krlparser.exceptions import SemanticError
+from krlparser.semantic_analyzer import SemanticAnalyzer, ProjectAnalyzer
 from krlparser.symbol_table import SymbolTable
 from krlparser.parser import Parser
 from krlparser.ast import (FunctionDefinition, Parameter, Module, SourceFile,
@@ -73,3 +74,209 @@ def test_simple_module_definition():
     analyzer.visit(parser.ast)
 
     assert awaited_ast == parser.ast
+
+
+def test_symbol_index():
+    source_file = (
+        "DEF Foo()\n"
+        "DECL INT bar\n"
+        "END\n"
+        "\n"
+        "DEF Bar()\n"
+        "END"
+    )
+
+    parser = Parser()
+    parser.add_source_file("Foo", source_file)
+
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(parser.ast)
+
+    index = analyzer.symbol_table.index
+    assert "Bar" == index.lookup("Foo.Bar").name
+    assert "INT" == index.lookup("Foo.Foo.bar").type
+    # KRL names ignore case, the variable bar hides the function Bar
+    assert ["Foo.Foo", "Foo"] == \
+        [scope.name for scope in index.scopes_defining("bar")]
+    assert ["Foo.Foo"] == \
+        [scope.name for scope in index.scopes_shadowing("BAR")]
+
+
+def test_project_analysis():
+    parser = Parser()
+    parser.add_module("Main", (
+        "DEF Main()\n"
+        "DECL INT foo\n"
+        "Helper()\n"
+        "Pick()\n"
+        "Local()\n"
+        "Missing(foo)\n"
+        "foo()\n"
+        "Pick()\n"
+        "END\n"
+        "DEF Local()\n"
+        "Local()\n"
+        "END"
+    ), "DEFDAT Main\nENDDAT")
+    parser.add_source_file("Tools", (
+        "DEF Tools()\n"
+        "END\n"
+        "GLOBAL DEF Pick()\n"
+        "Hidden()\n"
+        "END\n"
+        "DEF Hidden()\n"
+        "Tools()\n"
+        "END"
+    ))
+    parser.add_source_file("Helper", (
+        "DEF Helper()\n"
+        "Hidden()\n"
+        "END"
+    ))
+
+    analyzer = ProjectAnalyzer()
+    analyzer.analyze(parser.ast)
+
+    assert {"Main.Main": ["Helper.Helper", "Tools.Pick", "Main.Local"],
+            "Main.Local": ["Main.Local"],
+            "Tools.Tools": [],
+            "Tools.Pick": ["Tools.Hidden"],
+            "Tools.Hidden": ["Tools.Tools"],
+            "Helper.Helper": []} == analyzer.call_graph
+
+    assert [("Main.src", 5, 0, "Unresolved call of \"Missing\""),
+            ("Main.src", 6, 0, "\"foo\" is not a function"),
+            ("Helper.src", 1, 0, "Unresolved call of \"Hidden\"")] == \
+        [(error.file_name, error.line_number, error.column, error.message)
+         for error in analyzer.diagnostics]
+    assert all(isinstance(error, SemanticError)
+               for error in analyzer.diagnostics)
+
+    assert "Pick" == analyzer.symbol_table.lookup("Pick").name
+    assert analyzer.symbol_table.lookup("Hidden") is None
+
+
+def test_duplicate_global_definition():
+    parser = Parser()
+    parser.add_source_file("Foo", "GLOBAL DEF Bar()\nEND")
+    parser.add_source_file("Foobar", "GLOBAL DEF Bar()\nEND")
+
+    analyzer = ProjectAnalyzer()
+    analyzer.analyze(parser.ast)
+
+    assert ["Duplicate global definition of \"Bar\", already defined in "
+            "\"Foo.Bar\""] == [error.message
+                               for error in analyzer.diagnostics]
+
+
+def test_names_ignore_case():
+    parser = Parser()
+    parser.add_source_file("Main", (
+        "DEF Main()\n"
+        "tools()\n"
+        "PICK()\n"
+        "local()\n"
+        "END\n"
+        "DEF Local()\n"
+        "END"
+    ))
+    parser.add_source_file("Tools", (
+        "DEF Tools()\n"
+        "END\n"
+        "GLOBAL DEF Pick()\n"
+        "END"
+    ))
+    parser.add_source_file("Other", "GLOBAL DEF pick()\nEND")
+
+    analyzer = ProjectAnalyzer()
+    analyzer.analyze(parser.ast)
+
+    assert ["Tools.Tools", "Tools.Pick", "Main.Local"] == \
+        analyzer.call_graph["Main.Main"]
+    assert ["Duplicate global definition of \"pick\", already defined in "
+            "\"Tools.Pick\""] == [error.message
+                                   for error in analyzer.diagnostics]
+
+    analyzer.remove([parser.ast[1]])
+    assert ["Other.pick", "Main.Local"] == analyzer.call_graph["Main.Main"]
+    assert ["Unresolved call of \"tools\""] == \
+        [error.message for error in analyzer.diagnostics]
+
+
+def test_remove_and_reanalyze():
+    parser = Parser()
+    parser.add_source_file("Main", "DEF Main()\nPick()\nEND")
+    parser.add_source_file("Foo", "GLOBAL DEF Pick()\nEND")
+    parser.add_source_file("Bar", "GLOBAL DEF Pick()\nEND")
+    main, foo, bar = parser.ast
+
+    analyzer = ProjectAnalyzer()
+    analyzer.analyze(parser.ast)
+    assert ["Foo.Pick"] == analyzer.call_graph["Main.Main"]
+    assert 1 == len(analyzer.diagnostics)
+
+    analyzer.remove([foo])
+    assert ["Bar.Pick"] == analyzer.call_graph["Main.Main"]
+    assert not analyzer.diagnostics
+    assert "Foo.Pick" not in analyzer.call_graph
+    assert analyzer.symbol_table.index.lookup("Foo.Pick") is None
+
+    analyzer.remove([bar])
+    assert [] == analyzer.call_graph["Main.Main"]
+    assert ["Unresolved call of \"Pick\""] == \
+        [error.message for error in analyzer.diagnostics]
+    assert analyzer.symbol_table.lookup("Pick") is None
+
+    parser = Parser()
+    parser.add_source_file("Foo", "GLOBAL DEF Pick()\nEND")
+    analyzer.analyze(parser.ast)
+    assert ["Foo.Pick"] == analyzer.call_graph["Main.Main"]
+    assert not analyzer.diagnostics
+
+
+def test_submit_file_analysis():
+    parser = Parser()
+    parser.add_source_file("Tools", "GLOBAL DEF Pick()\nEND")
+    parser.add_submit_file("SPS", (
+        "DEF SPS()\n"
+        "LOOP\n"
+        "Pick()\n"
+        "LOOP\n"
+        "Missing()\n"
+        "ENDLOOP\n"
+        "ENDLOOP\n"
+        "END"
+    ))
+
+    analyzer = ProjectAnalyzer()
+    analyzer.analyze(parser.ast)
+
+    assert ["Tools.Pick"] == analyzer.call_graph["SPS.SPS"]
+    assert analyzer.symbol_table.lookup("SPS") is not None
+    assert [("SPS.sub", 4, "Unresolved call of \"Missing\"")] == \
+        [(error.file_name, error.line_number, error.message)
+         for error in analyzer.diagnostics]
+
+
+def test_data_file_analysis():
+    parser = Parser()
+    parser.add_module("Foo", "DEF Foo()\nDECL INT foo\nEND", (
+        "DEFDAT Foo\n"
+        "DECL E6POS XP1={X 1.0, Y 2.0}\n"
+        "DECL INT counter=5\n"
+        "DECL CHAR name[8]\n"
+        "name[]=\"abc\"\n"
+        "ENDDAT"
+    ))
+
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(parser.ast)
+
+    module = parser.ast[0]
+    module_table = module.data_file.statements[0].symbol_table
+    assert module_table is module.source_file.symbol_table
+    assert {"X": 1.0, "Y": 2.0} == module_table.lookup("XP1").value.fields
+    assert 5 == module_table.lookup("counter").value
+    assert module_table.lookup("name").is_array
+    assert module_table.lookup("XP1") is \
+        analyzer.symbol_table.index.lookup("Foo.XP1")
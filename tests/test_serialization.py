@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+from krlparser import serialization
+from krlparser.ast import (Module, SourceFile, DataFile, SubmitFile,
+                           FileAttribute, FunctionDefinition, DataDefinition,
+                           Parameter, FunctionCall, Type, VariableSymbol,
+                           FunctionSymbol, Loop, Aggregate, EnumValue,
+                           Assignment, walk)
+from krlparser.parser import Parser
+from krlparser.semantic_analyzer import SemanticAnalyzer
+from krlparser.span import make_span
+
+
+SOURCE_FILE = (
+    "&ACCESS RVP\n"
+    "GLOBAL DEF Foo(bar:IN, foobar:OUT)\n"
+    "DECL INT foo, bar[10, 2]\n"
+    "Bar(foo, bar)\n"
+    "END\n"
+    "DEFFCT REAL Bar()\n"
+    "DECL REAL foobar\n"
+    "ENDFCT"
+)
+
+DATA_FILE = (
+    "DEFDAT Foo PUBLIC\n"
+    "DECL E6POS XP1={X 1.0, Y 2.0}\n"
+    "ENDDAT"
+)
+
+
+def analyzed_module():
+    parser = Parser()
+    parser.add_module("Foo", SOURCE_FILE, DATA_FILE)
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(parser.ast)
+    return parser.ast
+
+
+@pytest.mark.parametrize("value", [
+    None, True, False, 0, 1, -1, 127, 128, -129, 2 ** 70, -2 ** 70, 1.5,
+    -0.0, "", "foo", "\0ä\U0001F916", (), [], (1, ("a", [None])),
+    Parameter.TYPE.OUT,
+    FunctionCall(name="Foo", parameters=["bar", "foobar"]),
+    VariableSymbol(name="foo", symbol_type="INT", dimensions=[1, 2]),
+    FunctionSymbol(name="Foo",
+                   parameters=[Parameter(name="bar",
+                                         parameter_type=Parameter.TYPE.IN)],
+                   returns=Type(name="INT")),
+    SubmitFile(name="Foo", file_attributes=[FileAttribute(value="foo")]),
+    Loop(body=[FunctionCall(name="Foo"), Loop()]),
+    VariableSymbol(name="XP1", symbol_type="E6POS", is_global=True,
+                   value=Aggregate(type_name="E6POS", names=["X", "IPO"],
+                                   values=[1.5, EnumValue(name="BASE")])),
+    Assignment(name="foo", indices=[], value="bar"),
+    Module(name="Foo",
+           source_file=SourceFile(name="Foo", statements=[
+               FunctionDefinition(name="Foo", body=[FunctionCall(name="Bar")],
+                                  is_global=True)]),
+           data_file=DataFile(name="Foo", statements=[
+               DataDefinition(name="Foo", is_public=True)]))
+])
+def test_round_trip(value):
+    result = serialization.loads(serialization.dumps(value))
+
+    assert value == result
+    assert type(value) is type(result)
+
+
+def test_round_trip_symbol_tables():
+    ast = analyzed_module()
+    result = serialization.loads(serialization.dumps(ast))
+
+    assert ast == result
+    assert [node.span for node in walk(ast)] == \
+        [node.span for node in walk(result)]
+
+    module = result[0]
+    module_table = module.source_file.symbol_table
+    function_table = module.source_file.statements[0].symbol_table
+    assert module_table is module.data_file.symbol_table
+    assert module_table is function_table.parent_scope
+    assert "INT" == function_table.lookup("bar").type
+    assert (10, 2) == function_table.lookup("bar").dimensions
+    assert module_table.lookup("Bar") is \
+        module_table.index.lookup("Foo.Bar")
+    assert module_table.index is function_table.index
+    assert any(node is function_table.lookup("bar") for node in walk(result))
+
+
+def test_spans_and_floats():
+    value = Aggregate(names=["X", "Y", "Z", "A"],
+                      values=[1.5, -0.0, 1e308, float("inf")])
+    value.span = make_span(2 ** 39, 2 ** 39 + 5, 2 ** 30, 7)
+    nodes = [value, FunctionCall(name="Foo"), EnumValue(name="BASE")]
+    nodes[1].span = make_span(0, 0, 0, 0)
+
+    result = serialization.loads(serialization.dumps(nodes))
+
+    assert nodes == result
+    assert [str(value) for value in result[0].values] == \
+        ["1.5", "-0.0", "1e+308", "inf"]
+    assert [node.span for node in nodes] == [node.span for node in result]
+
+
+def test_compact():
+    ast = analyzed_module() * 10
+    data = serialization.dumps(ast)
+
+    assert 1 == data.count(b"ACCESS RVP")
+    assert ast == serialization.loads(data)
+
+
+@pytest.mark.parametrize("data", [
+    b"", b"KRLA", b"pickle", serialization.dumps([1, 2])[:-1],
+    serialization.dumps([1, 2]) + b"\1",
+    serialization.MAGIC + bytes((serialization.VERSION + 1,)) + b"\0\0\0"
+])
+def test_invalid_data(data):
+    with pytest.raises(ValueError):
+        serialization.loads(data)
+
+
+def test_corrupt_data_raises_value_error():
+    data = serialization.dumps(analyzed_module())
+    generator = random.Random(0)
+
+    for _ in range(500):
+        corrupt = bytearray(data)
+        for _ in range(3):
+            corrupt[generator.randrange(len(corrupt))] = \
+                generator.randrange(256)
+        try:
+            serialization.loads(bytes(corrupt))
+        except ValueError:
+            pass
+
+
+def test_deep_tree():
+    node = Loop()
+    for _ in range(5000):
+        node = Loop(body=[node])
+
+    restored = serialization.loads(serialization.dumps(node))
+
+    assert 5001 == sum(1 for _ in walk(restored))
+    assert hash(node) == hash(restored)
+
+
+def test_unsupported_type():
+    with pytest.raises(ValueError):
+        serialization.dumps({"foo": "bar"})
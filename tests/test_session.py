@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import os
+
+import pytest
+
+from krlparser import session as session_module
+from krlparser.ast import Module
+from krlparser.project import read_file
+from krlparser.session import ProjectSession
+
+
+MAIN = (
+    "DEF Main()\n"
+    "DECL INT foo\n"
+    "Pick(foo)\n"
+    "END\n"
+)
+
+TOOLS = (
+    "DEF Tools()\n"
+    "END\n"
+    "GLOBAL DEF Pick(bar:IN)\n"
+    "END\n"
+)
+
+
+def write(path, text):
+    path.write_text(text)
+    # Make sure the change is seen even on coarse file system clocks
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture(name="root")
+def fixture_root(tmp_path):
+    (tmp_path / "R1").mkdir()
+    write(tmp_path / "R1" / "Main.src", MAIN)
+    write(tmp_path / "R1" / "Main.dat", "DEFDAT Main\nENDDAT\n")
+    write(tmp_path / "Tools.src", TOOLS)
+    write(tmp_path / "Cell.sub", (
+        "DEF Cell()\n"
+        "LOOP\n"
+        "Pick()\n"
+        "ENDLOOP\n"
+        "END\n"
+    ))
+    return tmp_path
+
+
+def test_initial_refresh(root):
+    session = ProjectSession(str(root))
+    result = session.refresh()
+
+    assert sorted(result["parsed"]) == ["Cell", "Main", "Tools"]
+    assert len(result["changed"]) == 4
+    assert not result["removed"]
+    assert sorted(type(node).__name__ for node in session.ast) == \
+        ["Module", "SourceFile", "SubmitFile"]
+    assert session.analyzer.call_graph["Main.Main"] == ["Tools.Pick"]
+    assert session.analyzer.call_graph["Cell.Cell"] == ["Tools.Pick"]
+    assert not session.analyzer.diagnostics
+
+    assert session.refresh() == {"changed": [], "removed": [], "parsed": []}
+
+
+def test_only_changed_modules_are_parsed(root):
+    session = ProjectSession(str(root))
+    session.refresh()
+    main = next(node for node in session.ast if isinstance(node, Module))
+
+    write(root / "Tools.src", TOOLS.replace("GLOBAL DEF Pick",
+                                            "GLOBAL DEF Place"))
+    result = session.refresh()
+
+    assert result["parsed"] == ["Tools"]
+    assert main in session.ast
+    assert session.symbol_table.lookup("Pick") is None
+    assert session.symbol_table.lookup("Place").name == "Place"
+    assert session.symbol_index.lookup("Tools.Pick") is None
+    assert session.symbol_index.lookup("Tools.Place") is not None
+    # The unchanged caller sees that its callee is gone
+    assert session.analyzer.call_graph["Main.Main"] == []
+    assert ["Unresolved call of \"Pick\""] * 2 == \
+        [error.message for error in session.analyzer.diagnostics]
+
+    write(root / "Tools.src", TOOLS)
+    session.refresh()
+    assert session.analyzer.call_graph["Main.Main"] == ["Tools.Pick"]
+    assert not session.analyzer.diagnostics
+
+
+def test_unchanged_content_is_not_parsed(root):
+    session = ProjectSession(str(root))
+    session.refresh()
+
+    write(root / "Tools.src", TOOLS)
+    assert session.refresh() == {"changed": [], "removed": [], "parsed": []}
+
+
+def test_removed_and_broken_files(root):
+    session = ProjectSession(str(root))
+    session.refresh()
+
+    os.remove(root / "R1" / "Main.dat")
+    result = session.refresh()
+    assert result["removed"] == [str(root / "R1" / "Main.dat")]
+    assert result["parsed"] == ["Main"]
+    assert sorted(type(node).__name__ for node in session.ast) == \
+        ["SourceFile", "SourceFile", "SubmitFile"]
+
+    write(root / "Tools.src", "DEF Tools(\n")
+    assert session.refresh()["parsed"] == []
+    assert sorted(node.name for node in session.ast) == ["Cell", "Main"]
+    assert len(session.errors) == 1
+    assert session.analyzer.call_graph["Main.Main"] == []
+
+    os.remove(root / "R1" / "Main.src")
+    session.refresh()
+    assert [node.name for node in session.ast] == ["Cell"]
+    assert list(session.analyzer.call_graph) == ["Cell.Cell"]
+
+
+def test_failed_refresh_is_repeated(root, monkeypatch):
+    session = ProjectSession(str(root))
+    session.refresh()
+    write(root / "Tools.src", TOOLS.replace("GLOBAL DEF Pick",
+                                            "GLOBAL DEF Place"))
+    write(root / "R1" / "Main.src", MAIN.replace("Pick(foo)", "Place(foo)"))
+
+    # Tools.src in the root is read before R1/Main.src
+    def unreadable(path):
+        if path.endswith("Main.src"):
+            raise PermissionError(path)
+        return read_file(path)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(session_module, "read_file", unreadable)
+        with pytest.raises(PermissionError):
+            session.refresh()
+
+    result = session.refresh()
+    assert sorted(result["parsed"]) == ["Main", "Tools"]
+    assert session.analyzer.call_graph["Main.Main"] == ["Tools.Place"]
+    assert session.analyzer.callers_of("Tools.Place") == ["Main.Main"]
+    assert session.analyzer.callers_of("Tools.Pick") == []
+
+
+def test_file_removed_during_refresh(root, monkeypatch):
+    session = ProjectSession(str(root))
+    session.refresh()
+    write(root / "Tools.src", TOOLS + "DEF Other()\nEND\n")
+    scan = session._scan
+
+    def scan_vanished():
+        paths = scan()
+        paths[str(root / "Vanished.src")] = None
+        return paths
+
+    monkeypatch.setattr(session, "_scan", scan_vanished)
+    result = session.refresh()
+
+    assert result["parsed"] == ["Tools"]
+    assert not result["removed"]
+    assert sorted(node.name for node in session.ast) == \
+        ["Cell", "Main", "Tools"]
+
+
+def test_protocol(root):
+    session = ProjectSession(str(root))
+    requests = io.StringIO("\n".join([
+        json.dumps({"command": "modules"}),
+        json.dumps({"command": "lookup", "name": "Tools.Pick"}),
+        json.dumps({"command": "calls", "name": "Main.Main"}),
+        json.dumps({"command": "callers", "name": "Tools.Pick"}),
+        json.dumps({"command": "diagnostics"}),
+        json.dumps({"command": "lookup"}),
+        "not json",
+        json.dumps({"command": "unknown"}),
+        json.dumps({"command": "shutdown"}),
+        json.dumps({"command": "modules"})
+    ]))
+    responses = io.StringIO()
+
+    session.serve(requests, responses)
+    responses = [json.loads(line)
+                 for line in responses.getvalue().splitlines()]
+
+    assert len(responses) == 9
+    assert sorted(responses[0]["result"]) == ["Cell", "Main", "Tools"]
+    assert responses[1]["result"]["kind"] == "function"
+    assert responses[1]["result"]["parameters"] == ["bar"]
+    assert responses[1]["result"]["line_number"] == 2
+    assert responses[2]["result"] == ["Tools.Pick"]
+    assert sorted(responses[3]["result"]) == ["Cell.Cell", "Main.Main"]
+    assert responses[4] == {"ok": True, "result": []}
+    assert [response["ok"] for response in responses[5:]] == \
+        [False, False, False, True]
+    assert len(session.ast) == 3
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import codecs
+
+from krlparser.lexer import Lexer
+from krlparser.parser import Parser
+from krlparser.regex_lexer import RegexLexer
+from krlparser.source import detect_encoding, open_source, module_name
+from krlparser.token import Token, TOKENS
+
+
+SOURCE_FILE = (
+    "&COMMENT Grüße\n"
+    "DEF Foo()\n"
+    "DECL INT bar\n"
+    "Bar(bar) ; Ölwechsel\n"
+    "END"
+)
+
+
+def test_detect_encoding():
+    assert "utf-8" == detect_encoding(b"DEF Foo()")
+    assert "utf-8" == detect_encoding("Grüße".encode("utf-8"))
+    assert "utf-8-sig" == detect_encoding(codecs.BOM_UTF8 + b"DEF Foo()")
+    assert "cp1252" == detect_encoding("Grüße".encode("cp1252"))
+
+
+def test_open_empty_file(tmp_path):
+    path = tmp_path / "Foo.src"
+    path.write_bytes(b"")
+
+    with open_source(str(path)) as source:
+        assert b"" == source
+
+
+def test_module_name():
+    assert "Foo" == module_name("R1/Program/Foo.src")
+
+
+def test_columns_count_characters():
+    code = "\"ä\" foo"
+    expected = Lexer(code=code).generate_tokens()
+
+    assert expected == RegexLexer(code=code.encode("utf-8")).generate_tokens()
+    assert expected == \
+        RegexLexer(code=code.encode("cp1252")).generate_tokens()
+
+
+def test_byte_order_mark():
+    tokens = RegexLexer(
+        code=codecs.BOM_UTF8 + "foo".encode("utf-8")).generate_tokens()
+    assert Token(token_type=TOKENS.NAME,
+                 value="foo",
+                 line_number=0,
+                 column=0) == tokens[0]
+
+
+def test_crlf_inside_string_and_comment():
+    tokens = RegexLexer(code=b";foo\r\n\"bar\r\n").generate_tokens()
+
+    assert "foo" == tokens[0].value
+    assert TOKENS.NEWLINE == tokens[1].token_type
+    assert "bar" == tokens[2].value
+    assert (TOKENS.ERROR_TOKEN, 1, 4) == \
+        (tokens[3].token_type, tokens[3].line_number, tokens[3].column)
+
+
+def test_add_paths(tmp_path):
+    for encoding in ("utf-8", "cp1252"):
+        source_path = tmp_path / f"Foo_{encoding}.src"
+        source_path.write_bytes(
+            SOURCE_FILE.replace("\n", "\r\n").encode(encoding))
+        data_path = tmp_path / f"Foo_{encoding}.dat"
+        data_path.write_bytes(b"DEFDAT Foo\r\nENDDAT\r\n")
+
+        expected = Parser()
+        expected.add_module("Foo", SOURCE_FILE, "DEFDAT Foo\nENDDAT\n")
+        expected.add_source_file("Foo", SOURCE_FILE)
+        expected.add_data_file("Foo", "DEFDAT Foo\nENDDAT\n")
+
+        parser = Parser()
+        parser.add_module_path(str(source_path), str(data_path), name="Foo")
+        parser.add_source_path(str(source_path), name="Foo")
+        parser.add_data_path(str(data_path), name="Foo")
+
+        assert expected.ast == parser.ast
+        assert "COMMENT Grüße" == \
+            parser.ast[1].file_attributes[0].value
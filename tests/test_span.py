@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from krlparser.ast import walk, FunctionCall, FunctionDefinition
+from krlparser.incremental import IncrementalParser
+from krlparser.parser import Parser
+from krlparser.span import (make_span, unpack_span, shift_span, span_start,
+                            span_end, SpanIndex)
+
+
+SOURCE_FILE = (
+    "&ACCESS RVP\n"
+    "GLOBAL DEF Foo(bar:IN)\n"
+    "DECL INT foo, bar[2]\n"
+    "  Bar(foo) ; comment\n"
+    "END\n"
+    "\n"
+    "GLOBAL DEFFCT INT Bar()\n"
+    "ENDFCT\n"
+)
+
+
+def parse(code=SOURCE_FILE, parser_class=Parser):
+    parser = parser_class()
+    parser.add_source_file("Foo", code)
+    return parser.ast[0]
+
+
+def source_of(node, code=SOURCE_FILE):
+    start, end, _, _ = unpack_span(node.span)
+    return code[start:end]
+
+
+def test_pack_span():
+    span = make_span(2 ** 35, 2 ** 36, 12, 2 ** 20)
+
+    assert (2 ** 35, 2 ** 36, 12, 2 ** 20) == unpack_span(span)
+    assert 2 ** 35 == span_start(span)
+    assert 2 ** 36 == span_end(span)
+    assert (2 ** 35 - 5, 2 ** 36 - 5, 10, 2 ** 20) == \
+        unpack_span(shift_span(span, -5, -2))
+
+
+def test_node_spans():
+    source_file = parse()
+    sources = [(type(node).__name__, source_of(node))
+               for node in walk(source_file.statements)]
+
+    assert SOURCE_FILE == source_of(source_file)
+    assert "&ACCESS RVP" == source_of(source_file.file_attributes[0])
+    assert [("FunctionDefinition",
+             "GLOBAL DEF Foo(bar:IN)\n"
+             "DECL INT foo, bar[2]\n"
+             "  Bar(foo) ; comment\n"
+             "END"),
+            ("Parameter", "bar:IN"),
+            ("VariableSymbol", "foo"),
+            ("VariableSymbol", "bar[2]"),
+            ("FunctionCall", "Bar(foo)"),
+            ("FunctionDefinition", "GLOBAL DEFFCT INT Bar()\nENDFCT"),
+            ("Type", "INT")] == sources
+
+    call = source_file.statements[0].body[2]
+    assert (3, 2) == unpack_span(call.span)[2:]
+
+
+def test_global_function_definition():
+    definition = parse().statements[1]
+    assert definition.is_global
+
+
+def test_spans_are_not_compared():
+    first = FunctionCall(name="Foo")
+    second = FunctionCall(name="Foo")
+    second.span = make_span(1, 2, 3, 4)
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert second.span == second.replace(name="Bar").span
+
+
+def test_spans_from_bytes():
+    code = SOURCE_FILE.replace("comment", "Größe")
+    data = code.replace("\n", "\r\n").encode("utf-8")
+    parser = Parser()
+    parser.add_source_file("Foo", data)
+
+    definition = parser.ast[0].statements[1]
+    start, end, line_number, column = unpack_span(definition.span)
+    assert b"GLOBAL DEFFCT INT Bar()\r\nENDFCT" == data[start:end]
+    assert (6, 0) == (line_number, column)
+
+
+def test_span_index():
+    source_file = parse()
+    index = SpanIndex(source_file)
+    call = SOURCE_FILE.index("Bar(foo)")
+
+    assert len(list(walk(source_file))) == len(index)
+    assert FunctionCall(name="Bar", parameters=["foo"]) == \
+        index.node_at(call + 4)
+    assert ["FunctionCall", "FunctionDefinition", "SourceFile"] == \
+        [type(node).__name__ for node in index.nodes_at(call)]
+    assert source_file is index.node_at(SOURCE_FILE.index("\n\n") + 1)
+    assert isinstance(index.node_at(SOURCE_FILE.index("comment")),
+                      FunctionDefinition)
+    assert index.node_at(len(SOURCE_FILE)) is None
+    assert index.node_at(-1) is None
+
+    parameter = index.node_at(SOURCE_FILE.index("bar:IN") + 5)
+    assert "bar" == parameter.name
+
+
+def test_span_index_from_unsorted_nodes():
+    source_file = parse()
+    first, second = source_file.statements
+    index = SpanIndex([second, first])
+
+    assert first is index.node_at(span_start(first.span))
+    assert isinstance(index.node_at(span_start(second.span)),
+                      FunctionDefinition)
+    assert index.node_at(span_end(first.span)) is None
+
+
+def test_incremental_spans():
+    parser = IncrementalParser()
+    parser.add_source_file("Foo", SOURCE_FILE)
+
+    offset = SOURCE_FILE.index("DECL")
+    inserted = "DECL INT foobar\n"
+    code = SOURCE_FILE[:offset] + inserted + SOURCE_FILE[offset:]
+    updated = parser.update_source_file(parser.ast[0], offset, 0, inserted)
+
+    expected = [node.span for node in walk(parse(code))]
+    assert expected == [node.span for node in walk(updated)]
+
+    offset = code.index("GLOBAL DEFFCT")
+    code = code[:offset] + code[offset + len("GLOBAL "):]
+    updated = parser.update_source_file(updated, offset, len("GLOBAL "), "")
+
+    expected = [node.span for node in walk(parse(code))]
+    assert expected == [node.span for node in walk(updated)]
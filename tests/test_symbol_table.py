@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from krlparser.symbol_table import SymbolTable
-from krlparser.ast import VariableSymbol
+from krlparser.ast import VariableSymbol, FunctionSymbol
 
 
 def test_create_table_and_get_symbol():
@@ -27,3 +27,102 @@ def test_get_symbol_from_parent():
 
     result = sub_scope.lookup("foo")
     assert symbol == result
+
+
+def test_index_qualified_lookup():
+    global_scope = SymbolTable(name="GLOBAL", parent_scope=None)
+    module_scope = SymbolTable(name="Foo", parent_scope=global_scope)
+    function = FunctionSymbol(name="Bar")
+    module_scope.add(function)
+
+    assert global_scope.index is module_scope.index
+    assert function == global_scope.index.lookup("Foo.Bar")
+    assert global_scope.index.lookup("Bar") is None
+    assert global_scope.index.lookup("Foo.Foo") is None
+
+
+def test_index_reverse_lookup():
+    global_scope = SymbolTable(name="GLOBAL", parent_scope=None)
+    module_scope = SymbolTable(name="Foo", parent_scope=global_scope)
+    function_scope = SymbolTable(name="Foo.Bar", parent_scope=module_scope)
+    other_scope = SymbolTable(name="Baz", parent_scope=global_scope)
+
+    global_scope.add(VariableSymbol(name="foo", symbol_type="INT"))
+    function_scope.add(VariableSymbol(name="foo", symbol_type="REAL"))
+    other_scope.add(VariableSymbol(name="bar", symbol_type="INT"))
+    function_scope.add(VariableSymbol(name="foo", symbol_type="BOOL"))
+
+    index = global_scope.index
+    assert (global_scope, function_scope) == index.scopes_defining("foo")
+    assert (function_scope,) == index.scopes_shadowing("foo")
+    assert () == index.scopes_shadowing("bar")
+    assert () == index.scopes_defining("foobar")
+    assert "BOOL" == index.lookup("Foo.Bar.foo").type
+
+
+def test_index_resolve_many():
+    global_scope = SymbolTable(name="GLOBAL", parent_scope=None)
+    module_scope = SymbolTable(name="Foo", parent_scope=global_scope)
+    other_scope = SymbolTable(name="Bar", parent_scope=global_scope)
+
+    foo = VariableSymbol(name="foo", symbol_type="INT")
+    bar = VariableSymbol(name="bar", symbol_type="INT")
+    global_scope.add(foo)
+    module_scope.add(bar)
+    other_scope.add(VariableSymbol(name="foobar", symbol_type="INT"))
+
+    names = ["foo", "bar", "foobar", "unknown"]
+    resolved = global_scope.index.resolve_many(names, module_scope)
+
+    assert {"foo": foo, "bar": bar, "foobar": None, "unknown": None} == \
+        resolved
+    for name in names:
+        assert module_scope.lookup(name) == resolved[name]
+
+
+def test_remove_symbol():
+    global_scope = SymbolTable(name="GLOBAL", parent_scope=None)
+    module_scope = SymbolTable(name="Foo", parent_scope=global_scope)
+    foo = VariableSymbol(name="foo", symbol_type="INT")
+    module_scope.add(foo)
+    global_scope.add(VariableSymbol(name="foo", symbol_type="REAL"))
+
+    assert foo is module_scope.remove("foo")
+    assert module_scope.remove("foo") is None
+    assert module_scope.lookup("foo").type == "REAL"
+
+    index = global_scope.index
+    assert index.lookup("Foo.foo") is None
+    assert (global_scope,) == index.scopes_defining("foo")
+
+
+def test_add_many_symbols():
+    global_scope = SymbolTable(name="GLOBAL", parent_scope=None)
+    module_scope = SymbolTable(name="Foo", parent_scope=global_scope)
+    global_scope.add(VariableSymbol(name="foo", symbol_type="REAL"))
+    symbols = [VariableSymbol(name=f"XP{index}", symbol_type="E6POS")
+               for index in range(3)]
+
+    module_scope.add_many(iter(symbols + [
+        VariableSymbol(name="foo", symbol_type="INT")]))
+
+    assert symbols[1] is module_scope.lookup("XP1")
+    assert "INT" == module_scope.lookup("foo").type
+
+    index = global_scope.index
+    assert symbols[2] is index.lookup("Foo.XP2")
+    assert (global_scope, module_scope) == index.scopes_defining("foo")
+    assert (module_scope,) == index.scopes_shadowing("foo")
+
+
+def test_local_symbols():
+    global_scope = SymbolTable(name="GLOBAL", parent_scope=None)
+    module_scope = SymbolTable(name="Foo", parent_scope=global_scope)
+    foo = VariableSymbol(name="foo", symbol_type="REAL")
+    bar = VariableSymbol(name="bar", symbol_type="INT")
+    global_scope.add(foo)
+    module_scope.add(bar)
+
+    assert module_scope.get_local("foo") is None
+    assert foo is global_scope.get_local("foo")
+    assert (bar,) == module_scope.symbols()
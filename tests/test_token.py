@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from krlparser.ast import FunctionCall, VariableSymbol
+from krlparser.lexer import Lexer
+from krlparser.regex_lexer import RegexLexer
+from krlparser.parser import Parser
+from krlparser.token import (Token, TokenBuffer, TOKENS, KEYWORDS,
+                             KEYWORD_TYPES, TOKEN_TYPES, KIND_CODES)
+
+
+CODE = (
+    "&COMMENT Hello\n"
+    "GLOBAL DEF Foo(bar:IN)\n"
+    ";comment\n"
+    "DECL INT bar[1, 'H1F'], foo  \n"
+    "foo = {X 1.5, Y \"text\"} ~\n"
+    "Bar(bar)\n"
+    "END"
+)
+
+
+def test_token_has_no_dict():
+    token = Token(token_type=TOKENS.NAME, value="foo",
+                  line_number=0, column=0)
+    assert not hasattr(token, "__dict__")
+
+
+def test_kind_codes():
+    for token_type in (TOKENS.NAME, TOKENS.LEFT_BRACE, KEYWORDS.DEFFCT):
+        token = Token(token_type=token_type, value=None,
+                      line_number=0, column=0)
+        assert TOKEN_TYPES[token.kind] == token_type
+        assert KIND_CODES[token_type] == token.kind
+
+
+def test_keyword_types_are_case_insensitive():
+    assert KEYWORD_TYPES["deffct"] == KEYWORDS.DEFFCT
+    assert KEYWORD_TYPES["EndFct"] == KEYWORDS.ENDFCT
+    assert KEYWORD_TYPES["Global"] == KEYWORDS.GLOBAL
+    assert "Foo" not in KEYWORD_TYPES
+    assert len(KEYWORD_TYPES) == sum(2 ** len(keyword)
+                                     for keyword in set(
+                                         KEYWORD_TYPES.values()))
+
+
+@pytest.mark.parametrize("lexer", [Lexer, RegexLexer])
+def test_keywords_keep_their_spelling(lexer):
+    tokens = lexer(code="Def foo()\nend").generate_tokens()
+
+    assert tokens[0].token_type == KEYWORDS.DEF
+    assert tokens[0].value == "Def"
+    assert tokens[1].token_type == TOKENS.NAME
+    assert tokens[-3].token_type == KEYWORDS.END
+
+
+@pytest.mark.parametrize("lexer, code", [
+    (Lexer, "PTP(P1)\nPTP(P1)\nLIN(P1)"),
+    (RegexLexer, "PTP(P1)\nPTP(P1)\nLIN(P1)"),
+    (RegexLexer, b"PTP(P1)\nPTP(P1)\nLIN(P1)")
+])
+def test_names_are_interned(lexer, code):
+    names = [token.value for token in lexer(code=code).iter_tokens()
+             if token.token_type == TOKENS.NAME]
+
+    assert names[0] is names[2]
+    assert names[1] is names[3] is names[5]
+
+
+def test_nodes_intern_names():
+    name = "".join(["P", "1"])
+    symbol = VariableSymbol(name=name, symbol_type="".join(["E6", "POS"]))
+    call = FunctionCall(name="".join(["P", "1"]))
+
+    assert symbol.name is call.name
+    assert symbol.type is VariableSymbol(name="P2",
+                                         symbol_type="E6POS").type
+
+
+def test_token_buffer_round_trip():
+    tokens = Lexer(code=CODE).generate_tokens()
+    buffer = TokenBuffer.from_tokens(CODE, tokens)
+
+    assert len(tokens) == len(buffer)
+    assert tokens == list(buffer)
+    assert tokens[-1] == buffer[-1]
+    assert tokens[3].kind == buffer.kind(3)
+
+
+def test_token_buffer_slices_values():
+    buffer = TokenBuffer.from_tokens(CODE, Lexer(code=CODE).iter_tokens())
+    values = [buffer.value(index) for index in range(len(buffer))]
+
+    assert "COMMENT Hello" in values
+    assert "text" in values
+    assert 0x1F in values
+    assert buffer.nbytes < len(buffer) * 20
+
+
+@pytest.mark.parametrize("code", ["", "DEF Foo()\nEND", "'H1FJ"])
+def test_token_buffer_as_parser_input(code):
+    tokens = Lexer(code=code).generate_tokens()
+    assert tokens == list(TokenBuffer.from_tokens(code, tokens))
+
+
+def test_parse_from_token_buffer():
+    code = "DEF Foo()\nBar()\nEND"
+    buffer = TokenBuffer.from_tokens(code, Lexer(code=code).iter_tokens())
+
+    class BufferedLexer(Lexer):
+        def iter_tokens(self):
+            return iter(buffer)
+
+    expected = Parser()
+    expected.add_source_file("Foo", code)
+
+    parser = Parser(lexer=BufferedLexer)
+    parser.add_source_file("Foo", code)
+
+    assert expected.ast == parser.ast